@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Time PDFParser text parsing against the substring/split implementation it replaced.
+
+Usage: python benchmarks/bench_line_classifier.py [--pages 2000] [--repeat 5]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import generate_tariff_text
+from src.parsers.pdf_parser import PDFParser
+
+
+def legacy_extract_prices(line: str) -> list:
+    prices = []
+    for part in line.split():
+        if '€' in part:
+            price = part.replace('€', '').replace(',', '.').strip()
+            try:
+                float(price)
+                prices.append(price)
+            except ValueError:
+                continue
+    return prices
+
+
+def legacy_parse_text_content(text: str) -> dict:
+    """PDFParser._parse_text_content before the compiled classifier (parser version 1)"""
+    toll_data = {}
+    current_location = None
+
+    for line in text.split('\n'):
+        line = line.strip()
+
+        if any(highway in line for highway in ['A1', 'A2', 'A3', 'A4', 'A5', 'A6', 'A7', 'A8', 'A9']):
+            current_location = line
+            if current_location not in toll_data:
+                toll_data[current_location] = []
+
+        elif '€' in line and current_location:
+            for i, price in enumerate(legacy_extract_prices(line)):
+                toll_data[current_location].append({
+                    'route': current_location,
+                    'vehicle_class': f'Class {i+1}',
+                    'price': price,
+                    'currency': 'EUR'
+                })
+
+    return toll_data
+
+
+def best_of(func, text: str, repeat: int):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--pages', type=int, default=2000)
+    arg_parser.add_argument('--rows-per-page', type=int, default=25)
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    args = arg_parser.parse_args()
+
+    logging.disable(logging.INFO)
+    text = generate_tariff_text(args.pages, args.rows_per_page)
+    line_count = text.count('\n') + 1
+
+    legacy_time, legacy_result = best_of(legacy_parse_text_content, text, args.repeat)
+    compiled_time, compiled_result = best_of(PDFParser()._parse_text_content, text, args.repeat)
+
+    print(f"corpus: {line_count:,} lines, {len(text) / 1024 / 1024:.1f} MiB")
+    print(f"legacy:   {legacy_time:.3f}s  ({line_count / legacy_time:,.0f} lines/s)")
+    print(f"compiled: {compiled_time:.3f}s  ({line_count / compiled_time:,.0f} lines/s, "
+          f"speedup {legacy_time / compiled_time:.2f}x)")
+    print(f"identical output: {legacy_result == compiled_result}")
+
+
+if __name__ == '__main__':
+    main()
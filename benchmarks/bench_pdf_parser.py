@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Compare serial and parallel PDFParser.parse_brisa_pdf wall time.
+
+Usage: python benchmarks/bench_pdf_parser.py [--pages 40] [--workers 4] [--chunk-size 4]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import write_tariff_pdf
+from src.parsers.pdf_parser import PDFParser
+
+
+def timed(parser: PDFParser, pdf_path: str, repeat: int):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = parser.parse_brisa_pdf(pdf_path)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--pages', type=int, default=40)
+    arg_parser.add_argument('--rows-per-page', type=int, default=25)
+    arg_parser.add_argument('--workers', type=int, default=os.cpu_count())
+    arg_parser.add_argument('--chunk-size', type=int, default=4)
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    args = arg_parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = write_tariff_pdf(os.path.join(tmp_dir, 'tariffs.pdf'), args.pages, args.rows_per_page)
+
+        serial_time, serial_result = timed(PDFParser(), pdf_path, args.repeat)
+        parallel = PDFParser(parallel=True, workers=args.workers, chunk_size=args.chunk_size)
+        parallel_time, parallel_result = timed(parallel, pdf_path, args.repeat)
+
+    print(f"pages={args.pages} rows_per_page={args.rows_per_page} "
+          f"workers={args.workers} chunk_size={args.chunk_size}")
+    print(f"serial:   {serial_time:.3f}s")
+    print(f"parallel: {parallel_time:.3f}s  (speedup {serial_time / parallel_time:.2f}x)")
+    print(f"identical output: {serial_result == parallel_result}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Peak RSS of PDFParser.parse_brisa_pdf against the streaming iter_tariffs path.
+
+Each mode runs in its own subprocess so ru_maxrss is not shared between them.
+
+Usage: python benchmarks/bench_pdf_streaming.py [--pages 300] [--rows-per-page 40]
+"""
+
+import argparse
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import write_tariff_pdf
+
+MODES = {
+    'dict, pages kept': 'dict-noflush',
+    'dict': 'dict',
+    'stream -> JSON Lines': 'stream'
+}
+
+
+def run_child(mode: str, pdf_path: str, out_dir: str):
+    logging.disable(logging.INFO)
+    from src.parsers import pdf_parser
+    from src.parsers.pdf_parser import PDFParser
+    from src.utils.data_exporter import DataExporter
+
+    if mode == 'dict-noflush':
+        # What parse_brisa_pdf did before pages released their caches
+        pdf_parser.release_page = lambda page: None
+
+    parser = PDFParser()
+    start = time.perf_counter()
+    if mode == 'stream':
+        exporter = DataExporter(out_dir)
+        with open(os.devnull, 'w') as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                exporter.stream_to_jsonl(parser.iter_tariffs(pdf_path), 'tariffs.jsonl')
+            finally:
+                sys.stdout = stdout
+        with open(os.path.join(out_dir, 'tariffs.jsonl'), encoding='utf-8') as f:
+            records = sum(1 for _ in f)
+    else:
+        records = sum(len(rows) for rows in parser.parse_brisa_pdf(pdf_path).values())
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        'records': records,
+        'seconds': elapsed,
+        'max_rss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    }))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--pages', type=int, default=300)
+    arg_parser.add_argument('--rows-per-page', type=int, default=40)
+    arg_parser.add_argument('--child', nargs=3, metavar=('MODE', 'PDF', 'OUT_DIR'), help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = write_tariff_pdf(os.path.join(tmp_dir, 'tariffs.pdf'), args.pages, args.rows_per_page)
+        print(f"pages={args.pages} rows_per_page={args.rows_per_page} "
+              f"size={os.path.getsize(pdf_path) / 1024 / 1024:.1f} MiB")
+
+        for label, mode in MODES.items():
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--child', mode, pdf_path, tmp_dir],
+                capture_output=True, text=True, check=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{label:<22} peak RSS {result['max_rss_kib'] / 1024:7.1f} MiB  "
+                  f"{result['seconds']:6.2f}s  {result['records']} records")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Compare per-cell WebDriver extraction with the single-shot table extraction.
+
+Serves a generated tariff page from a local file server, loads it in the same
+headless browser PortugalTollsScraper uses and counts WebDriver round trips.
+Requires a local Chrome/Chromium or Firefox.
+
+Usage: python benchmarks/bench_portugal_tolls.py [--tables 4] [--rows 250]
+"""
+
+import argparse
+import functools
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from selenium.webdriver.common.by import By
+
+from benchmarks.fixtures import write_tariff_html
+from src.scrapers.portugal_tolls_scraper import PortugalTollsScraper
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def per_cell_extraction(scraper):
+    """The previous extraction: one WebDriver call per table, row and cell"""
+    tables = []
+    for table in scraper.driver.find_elements(By.CSS_SELECTOR, scraper.TABLE_SELECTOR):
+        rows = []
+        for row in table.find_elements(By.TAG_NAME, "tr"):
+            rows.append([cell.text for cell in row.find_elements(By.TAG_NAME, "td")])
+        tables.append(rows)
+    return tables
+
+
+def page_source_extraction(scraper):
+    return scraper._parse_tables_html(scraper.driver.page_source)
+
+
+def measure(scraper, extract, counter):
+    counter['calls'] = 0
+    start = time.perf_counter()
+    tariffs = scraper._tables_to_tariffs(extract())
+    return time.perf_counter() - start, counter['calls'], len(tariffs)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--tables', type=int, default=4)
+    arg_parser.add_argument('--rows', type=int, default=250)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        write_tariff_html(os.path.join(tmp_dir, 'tarifarios.html'), args.tables, args.rows)
+        server = ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(QuietHandler, directory=tmp_dir))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        scraper = PortugalTollsScraper()
+        try:
+            if not scraper.initialize_driver():
+                print("No usable browser found; this benchmark needs Chrome/Chromium or Firefox.")
+                return 1
+            scraper.navigate_to_page(f"http://127.0.0.1:{server.server_address[1]}/tarifarios.html")
+
+            counter = {'calls': 0}
+            execute = scraper.driver.execute
+
+            def counting_execute(*a, **kw):
+                counter['calls'] += 1
+                return execute(*a, **kw)
+
+            scraper.driver.execute = counting_execute
+
+            results = [
+                ('per-cell', measure(scraper, lambda: per_cell_extraction(scraper), counter)),
+                ('execute_script', measure(scraper, scraper._extract_tables, counter)),
+                ('page_source', measure(scraper, lambda: page_source_extraction(scraper), counter)),
+            ]
+        finally:
+            scraper.cleanup()
+            server.shutdown()
+
+    print(f"tables={args.tables} rows_per_table={args.rows}")
+    for name, (elapsed, calls, rows) in results:
+        print(f"{name:15s} {elapsed:8.3f}s  round_trips={calls:6d}  tariffs={rows}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
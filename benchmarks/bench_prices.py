@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Throughput of parse_prices against the per-row price parsers it replaced.
+
+Usage: python benchmarks/bench_prices.py [--count 2000000] [--repeat 3] [--odd-share 0.01]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils import prices
+from src.utils.prices import parse_prices
+
+LEGACY_CELL_PATTERN = re.compile(r'\s*€?\s*(\d+(?:[.,]\d+)?)\s*€?\s*')
+LEGACY_SEARCH_PATTERN = re.compile(r'(\d+[.,]\d+|\d+)')
+
+
+def legacy_api_price(value) -> float:
+    """TollAPIClient._parse_price / TariffTable._to_price"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).replace('€', '').replace('EUR', '').replace(',', '.').strip())
+    except ValueError:
+        return 0.0
+
+
+def legacy_scraper_price(value) -> float:
+    """PortugalTollsScraper._clean_price followed by a float conversion"""
+    match = LEGACY_SEARCH_PATTERN.search(str(value).replace('€', '').replace('EUR', '').strip())
+    return float(match.group(1).replace(',', '.')) if match else 0.0
+
+
+def legacy_pdf_cell_price(value) -> float:
+    """PDFParser._parse_table_content cell match"""
+    match = LEGACY_CELL_PATTERN.fullmatch(str(value))
+    return float(match.group(1).replace(',', '.')) if match else 0.0
+
+
+def generate_prices(count: int, odd_share: float = 0.01, seed: int = 7) -> list:
+    """Tariff cells as the sources print them; odd_share of them carry digit groups or no price"""
+    rng = random.Random(seed)
+    plain = (
+        lambda euros, cents: f"{euros},{cents:02d} €",
+        lambda euros, cents: f"€{euros}.{cents:02d}",
+        lambda euros, cents: f"{euros},{cents:02d} EUR",
+        lambda euros, cents: str(euros)
+    )
+    odd = (
+        lambda euros, cents: f"1.{euros:03d},{cents:02d} €",
+        lambda euros, cents: "n/a"
+    )
+    column = []
+    for _ in range(count):
+        formats = odd if rng.random() < odd_share else plain
+        column.append(rng.choice(formats)(rng.randint(0, 60), rng.randint(0, 99)))
+    return column
+
+
+def best_of(func, repeat: int):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--count', type=int, default=2_000_000)
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    arg_parser.add_argument('--odd-share', type=float, default=0.01,
+                            help="Share of digit-grouped or non-price cells")
+    args = arg_parser.parse_args()
+
+    column = generate_prices(args.count, args.odd_share)
+    print(f"corpus: {len(column):,} price strings, {args.odd_share:.0%} digit-grouped or invalid")
+
+    runs = [
+        ('legacy api/tariff', lambda: [legacy_api_price(value) for value in column]),
+        ('legacy scraper', lambda: [legacy_scraper_price(value) for value in column]),
+        ('legacy pdf cell', lambda: [legacy_pdf_cell_price(value) for value in column]),
+        ('parse_prices', lambda: parse_prices(column, use_numpy=False)[0].tolist()),
+        ('parse_prices cents', lambda: parse_prices(column, cents=True, use_numpy=False)[0].tolist())
+    ]
+    if prices.np is not None:
+        runs.append(('parse_prices numpy', lambda: parse_prices(column, use_numpy=True)[0].tolist()))
+
+    results = {}
+    for name, func in runs:
+        elapsed, results[name] = best_of(func, args.repeat)
+        print(f"{name:<20} {elapsed:.3f}s  ({len(column) / elapsed / 1e6:.2f} M values/s)")
+
+    reference = results['parse_prices']
+    for name in ('legacy api/tariff', 'legacy scraper', 'legacy pdf cell'):
+        disagree = sum(1 for old, new in zip(results[name], reference) if abs(old - new) > 1e-9)
+        print(f"{name} disagrees with parse_prices on {disagree:,} values")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Time TollRouter graph build and bulk quotes on a synthetic national network.
+
+Usage: python benchmarks/bench_routing.py [--highways 40] [--plazas 30] [--quotes 10000]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import generate_location_data
+from src.parsers.od_index import ODIndex
+from src.parsers.routing import TollRouter
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--highways', type=int, default=40)
+    arg_parser.add_argument('--plazas', type=int, default=30)
+    arg_parser.add_argument('--quotes', type=int, default=10000)
+    arg_parser.add_argument('--entries', type=int, default=50, help="Distinct entry plazas in the batch")
+    arg_parser.add_argument('--seed', type=int, default=1)
+    args = arg_parser.parse_args()
+
+    logging.disable(logging.INFO)
+    rng = random.Random(args.seed)
+
+    toll_data = generate_location_data(args.highways, args.plazas)
+    index, index_time = timed(ODIndex.from_parsed, toll_data)
+    router, build_time = timed(TollRouter, index)
+
+    plazas = sorted({plaza for _, entry, exit_, _, _ in index.entries() for plaza in (entry, exit_)})
+    entries = rng.sample(plazas, min(args.entries, len(plazas)))
+    queries = [(rng.choice(entries), rng.choice(plazas), rng.randint(1, 5)) for _ in range(args.quotes)]
+
+    batched, batch_time = timed(router.cheapest_many, queries)
+    sample = queries[:max(1, args.quotes // 20)]
+    _, single_time = timed(lambda: [router.cheapest(*query) for query in sample])
+    single_time *= len(queries) / len(sample)
+
+    routes = []
+    for quote in batched[:1000]:
+        if quote and quote['legs']:
+            routes.append(([quote['legs'][0]['from']] + [leg['to'] for leg in quote['legs']], quote['vehicle_class']))
+    _, canonical_time = timed(router.canonical_many, routes)
+
+    print(f"network: {args.highways} highways x {args.plazas} plazas, {len(plazas)} plazas, {len(index)} tariffs")
+    print(f"index build:  {index_time:.3f}s")
+    print(f"graph build:  {build_time:.3f}s")
+    print(f"cheapest, {len(queries)} quotes from {len(entries)} entries:")
+    print(f"  batched:    {batch_time:.3f}s ({len(queries) / batch_time:,.0f} quotes/s)")
+    print(f"  one by one: {single_time:.3f}s (extrapolated from {len(sample)})")
+    print(f"  reachable:  {sum(1 for quote in batched if quote)}/{len(queries)}")
+    print(f"canonical, {len(routes)} routes: {canonical_time:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
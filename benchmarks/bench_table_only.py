@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Per-page time of the full text+tables pass against the cropped table-only mode.
+
+Usage: python benchmarks/bench_table_only.py [--pages 40] [--rows-per-page 25]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import write_tariff_pdf
+from src.parsers.layout_cache import TableLayoutCache
+from src.parsers.pdf_parser import PDFParser
+
+
+def summarize(label: str, parser: PDFParser):
+    by_mode = defaultdict(list)
+    for timing in parser.page_timings:
+        by_mode[timing['mode']].append(timing['seconds'])
+    total = sum(timing['seconds'] for timing in parser.page_timings)
+    modes = ', '.join(f"{mode} x{len(times)} {sum(times) / len(times) * 1000:.1f} ms"
+                      for mode, times in by_mode.items())
+    print(f"{label:<24} {total / len(parser.page_timings) * 1000:6.1f} ms/page  ({modes})")
+    return total
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--pages', type=int, default=40)
+    arg_parser.add_argument('--rows-per-page', type=int, default=25)
+    args = arg_parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = write_tariff_pdf(os.path.join(tmp_dir, 'tariffs.pdf'), args.pages, args.rows_per_page)
+        layout_path = os.path.join(tmp_dir, 'table_layouts.json')
+
+        full = PDFParser()
+        full_result = full.parse_brisa_pdf(pdf_path)
+        cold = PDFParser(table_only=True, layout_cache=TableLayoutCache(layout_path))
+        cold_result = cold.parse_brisa_pdf(pdf_path)
+        warm = PDFParser(table_only=True, layout_cache=TableLayoutCache(layout_path))
+        warm.parse_brisa_pdf(pdf_path)
+
+    print(f"pages={args.pages} rows_per_page={args.rows_per_page}")
+    full_total = summarize('text + tables', full)
+    summarize('table-only, cold cache', cold)
+    warm_total = summarize('table-only, warm cache', warm)
+    print(f"speedup (warm): {full_total / warm_total:.2f}x")
+    print(f"table rows identical to full pass: {all(full_result.get(k) == v for k, v in cold_result.items())}")
+
+
+if __name__ == '__main__':
+    main()
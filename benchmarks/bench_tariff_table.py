@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Compare the memory held by a list of tariff dicts and by a TariffTable.
+
+Usage: python benchmarks/bench_tariff_table.py [--rows 100000 1000000] [--segments 500]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.tariff_table import TariffTable
+
+def generate_rows(count: int, segments: int):
+    """Rows shaped like scraper output: parsed cells are fresh string objects, constants are shared"""
+    scraped_at = datetime.now().isoformat()
+    for i in range(count):
+        yield {
+            'route_segment': f"A{i % 40 + 1} Node {i % segments:04d}-Node {(i + 1) % segments:04d}",
+            'vehicle_type': f"Class {i % 4 + 1}",
+            'price': round(0.35 + (i % 997) * 0.05, 2),
+            'currency': 'EUR',
+            'validity_period': str(2025),
+            'source': 'Portugal Tolls',
+            'scraped_at': scraped_at
+        }
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    arg_parser.add_argument('--segments', type=int, default=500)
+    args = arg_parser.parse_args()
+
+    mib = 1024 * 1024
+    for count in args.rows:
+        dicts, dicts_current, _ = measure(lambda: list(generate_rows(count, args.segments)))
+        del dicts
+        table, table_current, table_peak = measure(lambda: TariffTable.from_dicts(generate_rows(count, args.segments)))
+
+        print(f"rows={count}")
+        print(f"  list of dicts: {dicts_current / mib:8.1f} MiB")
+        print(f"  TariffTable:   {table_current / mib:8.1f} MiB  (peak while building {table_peak / mib:.1f} MiB, "
+              f"{dicts_current / max(table_current, 1):.1f}x smaller)")
+        del table
+
+
+if __name__ == '__main__':
+    main()
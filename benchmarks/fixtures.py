@@ -0,0 +1,207 @@
+"""Synthetic fixtures for the offline benchmarks and tests.
+
+The PDF writer below emits a minimal, dependency-free PDF whose pages look
+like the Brisa tariff booklet as far as PDFParser is concerned: a highway
+header line, euro price lines and a ruled table of plaza prices.
+"""
+
+import os
+from typing import List
+
+HIGHWAYS = ['A1', 'A2', 'A3', 'A4', 'A5', 'A6', 'A7', 'A8', 'A9']
+PLAZAS = ['Lisboa', 'Porto', 'Coimbra', 'Leiria', 'Aveiro', 'Braga', 'Setubal', 'Evora', 'Faro', 'Viseu']
+
+
+def _escape(text: str) -> bytes:
+    raw = text.encode('cp1252')
+    return raw.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+def _price(seed: int, vehicle_class: int, separator: str = ' ') -> str:
+    cents = 100 + (seed * 37 + vehicle_class * 113) % 4000
+    return f"{cents // 100},{cents % 100:02d}{separator}€"
+
+
+def _page_stream(page_num: int, rows_per_page: int, with_table: bool) -> bytes:
+    ops: List[bytes] = []
+    y = 800
+
+    def text(x: int, y_pos: int, value: str, size: int = 9):
+        ops.append(b'BT /F1 %d Tf %d %d Td (' % (size, x, y_pos) + _escape(value) + b') Tj ET')
+
+    text(40, y, f"Página {page_num + 1} Dominio Brisa", 8)
+    y -= 20
+
+    for row in range(rows_per_page):
+        seed = page_num * rows_per_page + row
+        highway = HIGHWAYS[seed % len(HIGHWAYS)]
+        origin = PLAZAS[seed % len(PLAZAS)]
+        destination = PLAZAS[(seed + 3) % len(PLAZAS)]
+        text(40, y, f"{highway} {seed:04d}: {origin}-{destination}")
+        y -= 12
+        text(60, y, ' '.join(_price(seed, c, '') for c in range(1, 6)))
+        y -= 14
+
+    if with_table:
+        table_rows = 6
+        col_widths = [160, 70, 70, 70, 70, 70]
+        row_height = 16
+        top = y - 10
+        left = 40
+        width = sum(col_widths)
+        height = table_rows * row_height
+
+        for r in range(table_rows + 1):
+            line_y = top - r * row_height
+            ops.append(b'%d %d m %d %d l S' % (left, line_y, left + width, line_y))
+        x = left
+        for w in [0] + col_widths:
+            x += w
+            ops.append(b'%d %d m %d %d l S' % (x, top, x, top - height))
+
+        header = ['Plaza'] + [f'Classe {c}' for c in range(1, 6)]
+        for r in range(table_rows):
+            cell_y = top - (r + 1) * row_height + 5
+            if r == 0:
+                cells = header
+            else:
+                seed = page_num * table_rows + r
+                highway = HIGHWAYS[seed % 5]
+                cells = [f"{highway} {PLAZAS[seed % len(PLAZAS)]}"] + [_price(seed, c) for c in range(1, 6)]
+            x = left
+            for cell, w in zip(cells, col_widths):
+                text(x + 4, cell_y, cell, 8)
+                x += w
+
+    return b'\n'.join(ops)
+
+
+def write_tariff_pdf(path: str, pages: int = 20, rows_per_page: int = 25, with_table: bool = True) -> str:
+    """Write a multi-page Brisa-like tariff PDF to ``path``."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    objects: List[bytes] = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'',  # page tree, filled in once page ids are known
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+    ]
+    page_ids = []
+
+    for page_num in range(pages):
+        stream = _page_stream(page_num, rows_per_page, with_table)
+        objects.append(b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+        content_id = len(objects)
+        objects.append(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+            b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % content_id
+        )
+        page_ids.append(len(objects))
+
+    kids = b' '.join(b'%d 0 R' % pid for pid in page_ids)
+    objects[1] = b'<< /Type /Pages /Kids [' + kids + b'] /Count %d >>' % pages
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for index, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n' % index + body + b'\nendobj\n'
+
+    xref_offset = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for offset in offsets:
+        out += b'%010d 00000 n \n' % offset
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref_offset)
+
+    with open(path, 'wb') as f:
+        f.write(bytes(out))
+
+    return path
+
+
+def write_tariff_html(path: str, tables: int = 4, rows_per_table: int = 250) -> str:
+    """Write a Portugal Tolls-like tariff page with ``tables`` tables of 4-column rows."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    parts = ['<!DOCTYPE html><html><head><meta charset="utf-8"><title>Tarifários</title></head><body>']
+    for t in range(tables):
+        parts.append('<table class="tariff-table"><tr><th>Lanço</th><th>Classe</th><th>Preço</th><th>Validade</th></tr>')
+        for row in range(rows_per_table):
+            seed = t * rows_per_table + row
+            highway = HIGHWAYS[seed % len(HIGHWAYS)]
+            segment = f"{highway} {PLAZAS[seed % len(PLAZAS)]} - {PLAZAS[(seed + 1) % len(PLAZAS)]}"
+            parts.append(
+                f'<tr><td>{segment}</td><td>Classe {seed % 5 + 1}</td>'
+                f'<td>{_price(seed, seed % 5 + 1)}</td><td>Valid until 31/12/2025</td></tr>'
+            )
+        parts.append('</table>')
+    parts.append('</body></html>')
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(parts))
+
+    return path
+
+
+def generate_location_data(highways: int = 40, plazas_per_highway: int = 30, classes: int = 5) -> dict:
+    """Parsed-PDF style {location: [price rows]} for a synthetic national network.
+
+    Every highway lists O-D tariffs between all its plazas; the first plaza of each
+    highway is a plaza of an earlier one, which makes it a junction.
+    """
+    toll_data = {}
+    for h in range(highways):
+        name = f"A{h + 1}"
+        plazas = [f"Node {h:02d}.{p:02d}" for p in range(plazas_per_highway)]
+        if h:
+            parent = (h * 7) % h
+            plazas[0] = f"Node {parent:02d}.{(h * 11) % plazas_per_highway:02d}"
+        segment = [0.35 + ((h * 31 + p * 17) % 90) / 100 for p in range(plazas_per_highway)]
+
+        for i in range(plazas_per_highway):
+            for j in range(i + 1, plazas_per_highway):
+                location = f"{name} {plazas[i]}-{plazas[j]}"
+                # Longer trips get a small discount over the sum of their segments
+                base = sum(segment[i:j]) * (0.97 if j - i > 3 else 1.0)
+                toll_data[location] = [
+                    {'route': location, 'vehicle_class': f'Class {c}', 'price': f"{base * (1 + 0.5 * (c - 1)):.2f}",
+                     'currency': 'EUR'}
+                    for c in range(1, classes + 1)
+                ]
+    return toll_data
+
+
+def generate_tariff_text(pages: int = 200, rows_per_page: int = 25) -> str:
+    """Text the way pdfplumber returns it for the tariff booklet, page after page."""
+    lines = []
+    for page_num in range(pages):
+        lines.append(f"Página {page_num + 1} Dominio Brisa")
+        lines.append("Tarifas de portagem 2025 - Classes 1 a 5")
+        for row in range(rows_per_page):
+            seed = page_num * rows_per_page + row
+            highway = HIGHWAYS[seed % len(HIGHWAYS)]
+            origin = PLAZAS[seed % len(PLAZAS)]
+            destination = PLAZAS[(seed + 3) % len(PLAZAS)]
+            lines.append(f"{highway} {seed:04d}: {origin}-{destination}")
+            if row % 5 == 0:
+                lines.append(f"{origin} Norte / {destination} Sul")
+            lines.append(' '.join(_price(seed, c, '') for c in range(1, 6)))
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def generate_tariff_rows(count: int) -> List[dict]:
+    """``count`` export-ready tariff rows with the TARIFF_FIELDS columns"""
+    rows = []
+    for seed in range(count):
+        highway = HIGHWAYS[seed % len(HIGHWAYS)]
+        vehicle_class = seed % 5 + 1
+        rows.append({
+            'route_segment': f"{highway} {PLAZAS[seed % len(PLAZAS)]} - {PLAZAS[(seed // 7 + 1) % len(PLAZAS)]}",
+            'vehicle_type': f"Class {vehicle_class}",
+            'price': _price(seed, vehicle_class, ''),
+            'currency': 'EUR',
+            'validity_period': '2025',
+            'source': 'Brisa PDF',
+            'scraped_at': '2025-01-01T00:00:00'
+        })
+    return rows
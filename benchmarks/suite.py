@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""Offline benchmark suite for the scrape -> parse -> export -> upload pipeline.
+
+Stages run on generated data, each in its own subprocess so peak RSS is per stage:
+
+  pdf_parse    PDFParser.parse_brisa_pdf on a multi-page tariff PDF
+  html_tables  PortugalTollsScraper table extraction on a saved tariff page (no browser)
+  export_csv   DataExporter.stream_to_csv
+  export_json  DataExporter.stream_to_json
+  api_upload   TollAPIClient.send_toll_data against a local stand-in for the Laravel API
+
+Results (best-of-repeat wall time, peak RSS, throughput) go to a JSON file. With
+--baseline the run is compared against a stored results file and any stage that got
+slower or bigger than --tolerance allows is flagged; the exit status is then 1.
+
+Usage: python benchmarks/suite.py [--size small|medium|large] [--stages pdf_parse,api_upload]
+                                  [--repeat 3] [--output results.json]
+                                  [--baseline baseline.json [--update-baseline]] [--tolerance 0.25]
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import generate_tariff_rows, write_tariff_html, write_tariff_pdf
+
+STAGES = ['pdf_parse', 'html_tables', 'export_csv', 'export_json', 'api_upload']
+
+# Data sizes per preset; any of them can be overridden on the command line
+SIZES = {
+    'small': {'pdf_pages': 10, 'pdf_rows_per_page': 25, 'html_tables': 4, 'html_rows_per_table': 250,
+              'export_rows': 20_000, 'upload_rows': 5_000, 'upload_batch_size': 1_000},
+    'medium': {'pdf_pages': 60, 'pdf_rows_per_page': 40, 'html_tables': 10, 'html_rows_per_table': 1_000,
+               'export_rows': 200_000, 'upload_rows': 50_000, 'upload_batch_size': 5_000},
+    'large': {'pdf_pages': 300, 'pdf_rows_per_page': 40, 'html_tables': 40, 'html_rows_per_table': 2_500,
+              'export_rows': 1_000_000, 'upload_rows': 200_000, 'upload_batch_size': 10_000}
+}
+
+# Parameters that change what a stage measures; results are only comparable when they match
+STAGE_PARAMS = {
+    'pdf_parse': ('pdf_pages', 'pdf_rows_per_page'),
+    'html_tables': ('html_tables', 'html_rows_per_table'),
+    'export_csv': ('export_rows',),
+    'export_json': ('export_rows',),
+    'api_upload': ('upload_rows', 'upload_batch_size')
+}
+
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+class StandInAPIHandler(BaseHTTPRequestHandler):
+    """Accepts PUT /api/tolls/update and acknowledges every record"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_PUT(self):
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        response = json.dumps({'success': True, 'records_updated': len(payload['tolls'])}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _quiet(func):
+    """Run func with stdout discarded (the exporters print a line per file)"""
+    with open(os.devnull, 'w') as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            return func()
+        finally:
+            sys.stdout = stdout
+
+
+def _stage_runner(stage: str, params: dict, work_dir: str):
+    """Return a callable that runs the stage once and returns the number of items it handled"""
+    if stage == 'pdf_parse':
+        from src.parsers.pdf_parser import PDFParser
+
+        pdf_path = os.path.join(work_dir, 'tariffs.pdf')
+        return lambda: sum(len(rows) for rows in PDFParser().parse_brisa_pdf(pdf_path).values())
+
+    if stage == 'html_tables':
+        from src.scrapers.portugal_tolls_scraper import PortugalTollsScraper
+
+        with open(os.path.join(work_dir, 'tariffs.html'), encoding='utf-8') as f:
+            html = f.read()
+        scraper = PortugalTollsScraper()
+        return lambda: len(scraper._tables_to_tariffs(scraper._parse_tables_html(html)))
+
+    if stage in ('export_csv', 'export_json'):
+        from src.utils.data_exporter import DataExporter
+
+        rows = generate_tariff_rows(params['export_rows'])
+        exporter = DataExporter(os.path.join(work_dir, 'exports'))
+
+        def export():
+            if stage == 'export_csv':
+                path = _quiet(lambda: exporter.stream_to_csv(rows, 'tariffs.csv'))
+            else:
+                path = _quiet(lambda: exporter.stream_to_json(rows, 'tariffs.json', total=len(rows)))
+            if not path:
+                raise RuntimeError(f"{stage} did not write a file")
+            return len(rows)
+        return export
+
+    if stage == 'api_upload':
+        from src.utils.api_client import TollAPIClient
+
+        client = TollAPIClient(batch_size=params['upload_batch_size'], max_retries=0)
+        rows = client.format_toll_data(generate_tariff_rows(params['upload_rows']))
+
+        def upload():
+            result = client.send_toll_data(rows)
+            if not result.get('success'):
+                raise RuntimeError(f"stand-in upload failed: {result}")
+            return len(rows)
+        return upload
+
+    raise ValueError(f"Unknown stage: {stage}")
+
+
+def run_child(stage: str, params_json: str, work_dir: str, repeat: str):
+    logging.disable(logging.CRITICAL)
+    params = json.loads(params_json)
+    run = _stage_runner(stage, params, work_dir)
+
+    best, items = None, 0
+    for _ in range(int(repeat)):
+        start = time.perf_counter()
+        items = run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    print(json.dumps({
+        'items': items,
+        'seconds': best,
+        'max_rss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    }))
+
+
+def run_stage(stage: str, params: dict, work_dir: str, repeat: int, env: dict = None) -> dict:
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', stage, json.dumps(params), work_dir, str(repeat)],
+        capture_output=True, text=True, env=env
+    )
+    if output.returncode != 0:
+        raise RuntimeError(f"{stage} failed:\n{output.stderr.strip()}")
+    child = json.loads(output.stdout.strip().splitlines()[-1])
+
+    return {
+        'params': {name: params[name] for name in STAGE_PARAMS[stage]},
+        'items': child['items'],
+        'seconds': round(child['seconds'], 6),
+        'items_per_second': round(child['items'] / child['seconds'], 1) if child['seconds'] else None,
+        'peak_rss_mib': round(child['max_rss_kib'] / 1024, 1)
+    }
+
+
+def run_suite(stages: list, params: dict, repeat: int) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        if 'pdf_parse' in stages:
+            write_tariff_pdf(os.path.join(work_dir, 'tariffs.pdf'), params['pdf_pages'], params['pdf_rows_per_page'])
+        if 'html_tables' in stages:
+            write_tariff_html(os.path.join(work_dir, 'tariffs.html'), params['html_tables'],
+                              params['html_rows_per_table'])
+
+        server = None
+        env = dict(os.environ)
+        if 'api_upload' in stages:
+            server = ThreadingHTTPServer(('127.0.0.1', 0), StandInAPIHandler)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            env['LARAVEL_API_URL'] = f"http://127.0.0.1:{server.server_address[1]}/api"
+            env['LARAVEL_API_TOKEN'] = 'benchmark-token'
+
+        try:
+            for stage in stages:
+                results[stage] = run_stage(stage, params, work_dir, repeat, env)
+                result = results[stage]
+                print(f"{stage:<12} {result['seconds']:8.3f}s  peak RSS {result['peak_rss_mib']:7.1f} MiB  "
+                      f"{result['items']:>9,} items  ({result['items_per_second'] or 0:,.0f}/s)")
+        finally:
+            if server:
+                server.shutdown()
+                server.server_close()
+
+    return results
+
+
+def compare_results(results: dict, baseline: dict, tolerance: float) -> list:
+    """Stages of results that are slower or use more memory than baseline by more than tolerance.
+
+    Returns (stage, metric, baseline value, current value) tuples; stages missing from the
+    baseline or measured with different parameters are skipped.
+    """
+    regressions = []
+    for stage, current in results['stages'].items():
+        previous = baseline.get('stages', {}).get(stage)
+        if not previous or previous.get('params') != current['params']:
+            continue
+        for metric in ('seconds', 'peak_rss_mib'):
+            if previous[metric] and current[metric] > previous[metric] * (1 + tolerance):
+                regressions.append((stage, metric, previous[metric], current[metric]))
+    return regressions
+
+
+def _write_json(path: str, document: dict):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2)
+    os.replace(temp_path, path)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--size', choices=sorted(SIZES), default='small')
+    arg_parser.add_argument('--stages', default=','.join(STAGES),
+                            help=f"Comma-separated subset of {', '.join(STAGES)}")
+    arg_parser.add_argument('--repeat', type=int, default=3, help="Runs per stage; the fastest is kept")
+    for name, value in SIZES['small'].items():
+        arg_parser.add_argument(f"--{name.replace('_', '-')}", type=int, help=f"Override the preset {name}")
+    arg_parser.add_argument('--output', help="Results file (default: benchmarks/results/suite_<size>_<time>.json)")
+    arg_parser.add_argument('--baseline', help="Results file to compare against")
+    arg_parser.add_argument('--update-baseline', action='store_true', help="Store this run as --baseline")
+    arg_parser.add_argument('--tolerance', type=float, default=0.25,
+                            help="Allowed slowdown or RSS growth over the baseline (0.25 = 25%%)")
+    arg_parser.add_argument('--child', nargs=4, metavar=('STAGE', 'PARAMS', 'WORK_DIR', 'REPEAT'),
+                            help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = sorted(set(stages) - set(STAGES))
+    if unknown:
+        arg_parser.error(f"unknown stages: {', '.join(unknown)}")
+    if args.update_baseline and not args.baseline:
+        arg_parser.error("--update-baseline needs --baseline")
+
+    params = dict(SIZES[args.size])
+    for name in params:
+        override = getattr(args, name)
+        if override is not None:
+            params[name] = override
+
+    print(f"size={args.size} repeat={args.repeat} " + ' '.join(f"{name}={value}" for name, value in params.items()))
+    created_at = datetime.now()
+    results = {
+        'created_at': created_at.isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'size': args.size,
+        'repeat': args.repeat,
+        'stages': run_suite(stages, params, args.repeat)
+    }
+
+    output = args.output or os.path.join(DEFAULT_OUTPUT_DIR,
+                                         f"suite_{args.size}_{created_at.strftime('%Y%m%d_%H%M%S')}.json")
+    _write_json(output, results)
+    print(f"✓ Results written: {output}")
+
+    regressions = []
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.tolerance)
+        for stage, metric, previous, current in regressions:
+            print(f"REGRESSION {stage} {metric}: {previous} -> {current} (+{current / previous - 1:.0%})")
+        if not regressions:
+            print(f"✓ No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    elif args.baseline and not args.update_baseline:
+        print(f"No baseline at {args.baseline}; run with --update-baseline to store one")
+
+    if args.update_baseline:
+        _write_json(args.baseline, results)
+        print(f"✓ Baseline updated: {args.baseline}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -8,12 +8,90 @@ PDF_DIR = os.path.join(DATA_DIR, 'pdfs')
 PARSED_DIR = os.path.join(DATA_DIR, 'parsed')
 EXPORTS_DIR = os.path.join(DATA_DIR, 'exports')
 
+PDF_PARSER_SETTINGS = {
+    'parallel': os.getenv('PDF_PARSER_PARALLEL', 'false').lower() == 'true',
+    'workers': int(os.getenv('PDF_PARSER_WORKERS', '0')) or None,
+    'chunk_size': int(os.getenv('PDF_PARSER_CHUNK_SIZE', '4')),
+    # Crop to cached table boxes and skip the text pass when the tables carry the tariffs
+    'table_only': os.getenv('PDF_PARSER_TABLE_ONLY', 'false').lower() == 'true'
+}
+
+# Table bounding boxes per page layout, reused by the table-only mode across runs
+TABLE_LAYOUT_CACHE_PATH = os.path.join(PARSED_DIR, 'table_layouts.json')
+
+PARSE_CACHE_SETTINGS = {
+    'cache_dir': os.path.join(PARSED_DIR, 'cache'),
+    'max_bytes': 50 * 1024 * 1024,
+    'max_age_days': 400
+}
+
 SCRAPER_SETTINGS = {
     'headless': True,
     'timeout': 15,
     'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
 }
 
+DRIVER_SETTINGS = {
+    # Offline mode never calls webdriver-manager; a local or cached driver is required
+    'offline': os.getenv('SCRAPER_OFFLINE', 'false').lower() == 'true',
+    'discovery_cache_path': os.path.join(DATA_DIR, 'driver_cache.json')
+}
+
+# Origin-destination price index rebuilt from every Brisa parse
+OD_INDEX_PATH = os.path.join(PARSED_DIR, 'od_index.pickle')
+
+# Sources run in priority order; policy is 'fallback', 'primary' or 'merge'
+SOURCE_SETTINGS = {
+    'policy': os.getenv('SOURCE_POLICY', 'fallback'),
+    'timeouts': {
+        'brisa': int(os.getenv('BRISA_TIMEOUT', '300')),
+        'portugal_tolls': int(os.getenv('PORTUGAL_TOLLS_TIMEOUT', '180'))
+    }
+}
+
+# Batch mode splits uploads into batch_size chunks (0 = single request)
+API_SETTINGS = {
+    'batch_size': int(os.getenv('API_BATCH_SIZE', '0')),
+    'max_workers': int(os.getenv('API_MAX_WORKERS', '4')),
+    'compress': os.getenv('API_GZIP', 'false').lower() == 'true',
+    'timeout': int(os.getenv('API_TIMEOUT', '60')),
+    'max_retries': int(os.getenv('API_MAX_RETRIES', '3'))
+}
+
+# Unacknowledged API payloads, replayed at the start of the next run
+OUTBOX_PATH = os.path.join(DATA_DIR, 'outbox', 'outbox.jsonl')
+
+# Delta sync sends only rows changed since the last acknowledged upload
+SYNC_SETTINGS = {
+    'delta': os.getenv('API_DELTA_SYNC', 'false').lower() == 'true',
+    'full_sync': os.getenv('API_FULL_SYNC', 'false').lower() == 'true',
+    'snapshot_path': os.path.join(DATA_DIR, 'api_snapshot.json')
+}
+
+# Run log: one JSON line per run, rotated by size or age into gzipped segments
+RUN_LEDGER_SETTINGS = {
+    'enabled': os.getenv('RUN_LEDGER', 'true').lower() == 'true',
+    'ledger_dir': os.path.join(DATA_DIR, 'logs', 'ledger'),
+    'max_bytes': int(os.getenv('RUN_LEDGER_MAX_BYTES', str(5 * 1024 * 1024))),
+    'max_age_days': int(os.getenv('RUN_LEDGER_MAX_AGE_DAYS', '7'))
+}
+
+# Per-stage spans (time, rows, bytes, RSS) logged with each run; optionally also written
+# as a Prometheus file for the node_exporter textfile collector (path must end in .prom)
+INSTRUMENTATION_SETTINGS = {
+    'enabled': os.getenv('RUN_SPANS', 'true').lower() == 'true',
+    'prometheus_textfile': os.getenv('PROMETHEUS_TEXTFILE', '')
+}
+
+# Opt-in profiling (main.py --profile overrides): PROFILE is cpu, memory or both; empty = off.
+# PROFILE_STAGES picks run, scrape, parse, export and/or upload
+PROFILING_SETTINGS = {
+    'mode': os.getenv('PROFILE', ''),
+    'stages': [stage.strip() for stage in os.getenv('PROFILE_STAGES', 'run').split(',') if stage.strip()],
+    'output_dir': os.path.join(LOGS_DIR, 'profiles'),
+    'top_n': int(os.getenv('PROFILE_TOP_N', '25'))
+}
+
 URLS = {
     'brisa': 'https://www.brisaconcessao.pt/en/clients/tolls/toll-rates',
     'portugal_tolls': 'https://www.portugaltolls.com/en/web/portal-de-portagens/tarifarios',
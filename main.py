@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 
+import argparse
+import functools
 import logging.config
 import os
 import sys
-from datetime import datetime
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -11,13 +12,29 @@ load_dotenv()
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from config.settings import LOGGING_CONFIG, DATA_DIR, LOGS_DIR
+from config.settings import (
+    LOGGING_CONFIG, DATA_DIR, LOGS_DIR, PDF_PARSER_SETTINGS, PARSE_CACHE_SETTINGS, DRIVER_SETTINGS,
+    SOURCE_SETTINGS, API_SETTINGS, SYNC_SETTINGS, OUTBOX_PATH, OD_INDEX_PATH, TABLE_LAYOUT_CACHE_PATH,
+    RUN_LEDGER_SETTINGS, INSTRUMENTATION_SETTINGS, PROFILING_SETTINGS
+)
 from src.scrapers.brisa_scraper import BrisaScraper
 from src.scrapers.portugal_tolls_scraper import PortugalTollsScraper
+from src.scrapers.driver_pool import DriverPool
+from src.scrapers.driver_discovery import DriverDiscoveryCache
+from src.scrapers.orchestrator import ScraperOrchestrator
 from src.parsers.pdf_parser import PDFParser
+from src.parsers.parse_cache import ParseCache
+from src.parsers.layout_cache import TableLayoutCache
+from src.parsers.od_index import ODIndex
 from src.utils.data_exporter import DataExporter
 from src.utils.api_client import TollAPIClient
+from src.utils.delta_sync import DeltaSync
+from src.utils.outbox import Outbox
+from src.utils.profiling import StageProfiler
+from src.utils.instrumentation import Tracer
 from src.utils.json_logger import TollJSONLogger
+from src.utils.run_ledger import RunLedger
+from src.utils.tariff_table import TariffTable
 
 
 def setup_directories():
@@ -26,76 +43,142 @@ def setup_directories():
         os.makedirs(directory, exist_ok=True)
 
 
-def main():
+def collect_brisa(driver_options, pdf_parser, exporter, source_info, profiler, cancel_event) -> TariffTable:
+    logger = logging.getLogger(__name__)
+    tariffs = TariffTable()
+    
+    logger.info("Attempting Brisa scraper...")
+    brisa_scraper = BrisaScraper(cancel_event=cancel_event, **driver_options)
+    brisa_data = brisa_scraper.scrape()
+    # An abandoned source leaves the exports to the sources still running
+    if cancel_event.is_set():
+        return tariffs
+    source_info['brisa_discovery'] = brisa_scraper.discovery_method
+    source_info['brisa_startup_timings'] = brisa_scraper.startup_timings
+    logger.info(f"Brisa PDF link discovery path: {brisa_scraper.discovery_method}")
+    
+    if brisa_data and any('pdf_path' in item for item in brisa_data):
+        pdf_path = next(item['pdf_path'] for item in brisa_data if 'pdf_path' in item)
+        logger.info(f"Parsing PDF: {pdf_path}")
+        
+        with profiler.stage('parse'):
+            location_data = pdf_parser.parse_brisa_pdf(pdf_path, cancel_event)
+        if cancel_event.is_set():
+            return tariffs
+        source_info['pdf_page_timings'] = pdf_parser.page_timings
+        if location_data:
+            pdf_parser.save_parsed_data(location_data)
+            exporter.export_location_data(location_data)
+            try:
+                ODIndex.from_parsed(location_data).save(OD_INDEX_PATH)
+            except Exception as e:
+                # The index only serves route lookups; the tariffs are still good
+                logger.warning(f"Could not rebuild the O-D index, keeping the previous one: {e}")
+            
+            for location, routes in location_data.items():
+                if 'Página' not in location and 'Dominio' not in location:
+                    tariffs.append(location, 'Class 1', 0.0, 'EUR', '2025', 'Brisa PDF')
+    
+    logger.info(f"Brisa scraper completed: {len(tariffs)} records")
+    return tariffs
+
+
+def collect_portugal_tolls(driver_options, cancel_event) -> TariffTable:
+    logger = logging.getLogger(__name__)
+    
+    logger.info("Attempting Portugal Tolls scraper...")
+    portugal_data = TariffTable.from_dicts(PortugalTollsScraper(cancel_event=cancel_event, **driver_options).scrape())
+    if cancel_event.is_set():
+        return TariffTable()
+    logger.info(f"Portugal Tolls scraper completed: {len(portugal_data)} records")
+    return portugal_data
+
+
+def main(profiler: StageProfiler = None):
     setup_directories()
     logging.config.dictConfig(LOGGING_CONFIG)
     logger = logging.getLogger(__name__)
     
     logger.info("Starting Portuguese Toll Scraper with API integration")
+    profiler = profiler or StageProfiler()
     
     # Initialize components
-    exporter = DataExporter()
-    pdf_parser = PDFParser()
-    json_logger = TollJSONLogger()
-    all_tariffs = []
+    tracer = Tracer(enabled=INSTRUMENTATION_SETTINGS['enabled'])
+    exporter = DataExporter(tracer=tracer)
+    parse_cache = ParseCache(parser_version=PDFParser.VERSION, **PARSE_CACHE_SETTINGS)
+    pdf_parser = PDFParser(cache=parse_cache, layout_cache=TableLayoutCache(TABLE_LAYOUT_CACHE_PATH),
+                           tracer=tracer, **PDF_PARSER_SETTINGS)
+    ledger_settings = dict(RUN_LEDGER_SETTINGS)
+    json_logger = TollJSONLogger(RunLedger(**ledger_settings) if ledger_settings.pop('enabled') else None, tracer)
+    driver_pool = DriverPool()
+    driver_options = {
+        'driver_pool': driver_pool,
+        'discovery_cache': DriverDiscoveryCache(DRIVER_SETTINGS['discovery_cache_path']),
+        'offline': DRIVER_SETTINGS['offline'],
+        'tracer': tracer
+    }
+    all_tariffs = TariffTable()
     api_result = {'success': False}
+    run_info = {}
+    # Details each source records on its own thread, merged into run_info once it is done
+    source_info = {'brisa': {}}
+    if profiler.enabled:
+        run_info['profiles'] = profiler.reports
     
     try:
         # Initialize API client
-        api_client = TollAPIClient()
+        api_client = TollAPIClient(outbox=Outbox(OUTBOX_PATH), tracer=tracer, **API_SETTINGS)
         logger.info(f"API client initialized for: {api_client.api_url}")
         
-        logger.info("Attempting Brisa scraper...")
-        brisa_scraper = BrisaScraper()
-        brisa_data = brisa_scraper.scrape()
+        # Deliver anything a previous run failed to send before scraping anew
+        with tracer.span('outbox.replay'):
+            run_info['outbox_replay'] = api_client.replay_outbox()
         
-        if brisa_data and any('pdf_path' in item for item in brisa_data):
-            pdf_path = next(item['pdf_path'] for item in brisa_data if 'pdf_path' in item)
-            logger.info(f"Parsing PDF: {pdf_path}")
-            
-            location_data = pdf_parser.parse_brisa_pdf(pdf_path)
-            if location_data:
-                pdf_parser.save_parsed_data(location_data)
-                exporter.export_location_data(location_data)
-                
-                for location, routes in location_data.items():
-                    if 'Página' not in location and 'Dominio' not in location:
-                        all_tariffs.append({
-                            'route_segment': location,
-                            'vehicle_type': 'Class 1',
-                            'price': 0.0,
-                            'currency': 'EUR',
-                            'validity_period': '2025',
-                            'source': 'Brisa PDF',
-                            'scraped_at': datetime.now().isoformat()
-                        })
+        orchestrator = ScraperOrchestrator(SOURCE_SETTINGS['policy'], tracer)
+        # Sources run on orchestrator threads; wrap() lets an open 'run'/'scrape' CPU profile follow them
+        orchestrator.register(
+            'brisa',
+            profiler.wrap(functools.partial(collect_brisa, driver_options, pdf_parser, exporter,
+                                            source_info['brisa'], profiler)),
+            SOURCE_SETTINGS['timeouts']['brisa']
+        )
+        orchestrator.register(
+            'portugal_tolls',
+            profiler.wrap(functools.partial(collect_portugal_tolls, driver_options)),
+            SOURCE_SETTINGS['timeouts']['portugal_tolls']
+        )
         
-        logger.info(f"Brisa scraper completed: {len(all_tariffs)} records")
-        
-        # Fallback to Portugal Tolls scraper if no data
-        if not all_tariffs:
-            try:
-                logger.info("Using fallback: Portugal Tolls scraper...")
-                portugal_scraper = PortugalTollsScraper()
-                portugal_data = portugal_scraper.scrape()
-                all_tariffs.extend(portugal_data)
-                logger.info(f"Portugal Tolls scraper completed: {len(portugal_data)} records")
-                
-            except Exception as e:
-                logger.error(f"Portugal Tolls scraper failed: {e}")
+        logger.info(f"Running sources with '{orchestrator.policy}' policy")
+        # The merge policy hands back row views from several tables
+        with tracer.span('scrape') as span, profiler.stage('scrape'):
+            all_tariffs = TariffTable.from_dicts(orchestrator.run())
+            span.set(rows=len(all_tariffs))
+        run_info['sources'] = orchestrator.report
+        # A cancelled or timed-out source may still be writing its details; they are left out
+        for name, info in source_info.items():
+            if orchestrator.report[name]['status'] not in ('cancelled', 'timeout'):
+                run_info.update(info)
         
         # Process results
         if all_tariffs:
             # Export to local files (for logging)
-            exporter.export_to_csv(all_tariffs)
-            exporter.export_to_json(all_tariffs)
+            with tracer.span('export'), profiler.stage('export'):
+                exporter.export_to_csv(all_tariffs)
+                exporter.export_to_json(all_tariffs)
             
             # Format and send to API
-            formatted_data = api_client.format_toll_data(all_tariffs)
-            api_result = api_client.send_toll_data(formatted_data)
+            with tracer.span('upload', rows=len(all_tariffs)) as span, profiler.stage('upload'):
+                formatted_data = api_client.format_toll_data(all_tariffs)
+                if SYNC_SETTINGS['delta']:
+                    delta_sync = DeltaSync(SYNC_SETTINGS['snapshot_path'], api_client.api_url)
+                    api_result = delta_sync.sync(api_client, formatted_data, full=SYNC_SETTINGS['full_sync'])
+                    run_info['delta_sync'] = delta_sync.summary
+                else:
+                    api_result = api_client.send_toll_data(formatted_data)
+                span.set(success=api_result['success'])
             
             # Log everything to JSON
-            log_file = json_logger.log_scraping_result(all_tariffs, api_result)
+            log_file = json_logger.log_scraping_result(all_tariffs, api_result, run_info)
             
             if api_result['success']:
                 logger.info(f"✓ Successfully sent {len(all_tariffs)} records to API")
@@ -121,7 +204,30 @@ def main():
         logger.error(error_msg)
         log_file = json_logger.log_error(error_msg, {'error_type': 'unexpected'})
         print(f"✗ {error_msg}. Log: {log_file}")
+        
+    finally:
+        driver_pool.close()
+        if INSTRUMENTATION_SETTINGS['prometheus_textfile']:
+            try:
+                tracer.write_prometheus(INSTRUMENTATION_SETTINGS['prometheus_textfile'])
+            except OSError as e:
+                logger.warning(f"Could not write Prometheus textfile: {e}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Scrape Portuguese toll tariffs and send them to the API")
+    parser.add_argument('--profile', choices=StageProfiler.MODES, default=PROFILING_SETTINGS['mode'] or None,
+                        help="Profile with cProfile (cpu), tracemalloc (memory) or both (default: $PROFILE)")
+    parser.add_argument('--profile-stage', action='append', choices=StageProfiler.STAGES,
+                        help="Stage to profile, repeatable (default: $PROFILE_STAGES or the whole run)")
+    parser.add_argument('--profile-top', type=int, default=PROFILING_SETTINGS['top_n'],
+                        help="Entries in the cumulative-time and allocation reports")
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    profiler = StageProfiler(args.profile or '', args.profile_stage or PROFILING_SETTINGS['stages'],
+                             PROFILING_SETTINGS['output_dir'], args.profile_top)
+    with profiler.stage('run'):
+        main(profiler)
\ No newline at end of file
@@ -2,6 +2,9 @@
 
 # Portuguese Toll Scraper - Production Runner
 # This script activates venv and runs the scraper
+# Arguments are passed to main.py, e.g. to profile one stage:
+#   ./run_scraper.sh --profile cpu --profile-stage parse
+# (or set PROFILE / PROFILE_STAGES in the environment or .env)
 
 # Set script directory
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
@@ -32,7 +35,7 @@ fi
 
 # Run the scraper
 echo "$(date): Running toll scraper..." >> "$LOG_FILE"
-python "$SCRIPT_DIR/main.py" >> "$LOG_FILE" 2>&1
+python "$SCRIPT_DIR/main.py" "$@" >> "$LOG_FILE" 2>&1
 
 # Check exit status
 if [ $? -eq 0 ]; then
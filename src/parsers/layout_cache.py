@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Optional
+
+BBox = List[float]
+
+
+class TableLayoutCache:
+    """Tariff table bounding boxes per page layout fingerprint.
+
+    A fingerprint covers the page size, rotation and ruling lines, so every page printed
+    from the same template shares one entry. With a path the entries survive between
+    runs; without one the cache lives only as long as the parser.
+    """
+
+    def __init__(self, path: str = None, entries: Dict[str, List[BBox]] = None):
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self.entries: Dict[str, List[BBox]] = dict(entries or {})
+        if path and entries is None:
+            self.entries = self._load()
+
+    @staticmethod
+    def fingerprint(page) -> str:
+        """Hash of the page geometry and its ruling lines, rounded to whole points"""
+        edges = sorted(
+            (round(obj['x0']), round(obj['top']), round(obj['x1']), round(obj['bottom']))
+            for obj in page.lines + page.rects
+        )
+        layout = [round(page.width), round(page.height), page.rotation, edges]
+        return hashlib.sha1(json.dumps(layout).encode('utf-8')).hexdigest()[:16]
+
+    def get(self, fingerprint: str) -> Optional[List[BBox]]:
+        return self.entries.get(fingerprint)
+
+    def put(self, fingerprint: str, bboxes: List[BBox]):
+        bboxes = [[round(value, 2) for value in bbox] for bbox in bboxes]
+        with self._lock:
+            if self.entries.get(fingerprint) == bboxes:
+                return
+            self.entries[fingerprint] = bboxes
+        self.save()
+
+    def update(self, entries: Dict[str, List[BBox]]):
+        """Merge entries found elsewhere (e.g. by parser worker processes)"""
+        with self._lock:
+            changed = any(self.entries.get(key) != value for key, value in entries.items())
+            self.entries.update(entries)
+        if changed:
+            self.save()
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with self._lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+    def invalidate(self):
+        with self._lock:
+            self.entries = {}
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _load(self) -> Dict[str, List[BBox]]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable table layout cache {self.path}: {e}")
+            return {}
+        return entries if isinstance(entries, dict) else {}
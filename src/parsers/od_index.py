@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+
+import argparse
+import bisect
+import itertools
+import json
+import logging
+import os
+import pickle
+import re
+import unicodedata
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..utils.prices import parse_price
+
+# "A1 0000: Lisboa-Leiria", "A3 Porto-Valença", "A2 Lisboa - Algarve"
+LOCATION_PATTERN = re.compile(r'^(A\d+)\b\s*(?:[^:\s]+:\s*)?(.+)$')
+CLASS_PATTERN = re.compile(r'(\d+)')
+
+# (highway, entry plaza, exit plaza, vehicle class)
+Query = Tuple[Optional[str], str, str, object]
+
+
+@lru_cache(maxsize=4096)
+def normalize_plaza(name: str) -> str:
+    """Case- and accent-insensitive plaza key ('Valença' and 'valenca' match)"""
+    decomposed = unicodedata.normalize('NFKD', name)
+    return ' '.join(''.join(c for c in decomposed if not unicodedata.combining(c)).casefold().split())
+
+
+def vehicle_class_number(vehicle_class) -> Optional[int]:
+    if isinstance(vehicle_class, int):
+        return vehicle_class
+    match = CLASS_PATTERN.search(str(vehicle_class))
+    return int(match.group(1)) if match else None
+
+
+def split_location(location: str) -> Optional[Tuple[str, str, str]]:
+    """Split a parsed location heading into (highway, entry, exit), or None if it names no plaza pair"""
+    match = LOCATION_PATTERN.match(location.strip())
+    if not match:
+        return None
+    highway, plazas = match.groups()
+    separator = ' - ' if ' - ' in plazas else '-'
+    entry, _, exit_ = plazas.partition(separator)
+    if not entry.strip() or not exit_.strip():
+        return None
+    return highway, entry.strip(), exit_.strip()
+
+
+class ODIndex:
+    """Origin-destination price index over PDFParser.parse_brisa_pdf output.
+
+    Prices are keyed by (highway, entry, exit, class) for O(1) lookups; plaza names are
+    matched case- and accent-insensitively. Lookups may omit the highway, which resolves
+    when the plaza pair has a single price across highways. Keys are packed into ints
+    (plaza and highway ids plus the class) so the saved index unpickles quickly.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.built_at = None
+        self.skipped = 0
+        self._prices: Dict[int, float] = {}
+        self._pairs: Dict[int, Optional[float]] = {}
+        self._highway_ids: Dict[str, int] = {}
+        self._plaza_ids: Dict[str, int] = {}
+        self._plaza_names: List[str] = []
+        self._sorted_keys: List[str] = []
+
+    @classmethod
+    def from_parsed(cls, toll_data: Dict[str, List[Dict]]) -> 'ODIndex':
+        index = cls()
+        for location, rows in toll_data.items():
+            parts = split_location(location)
+            if not parts:
+                index.skipped += 1
+                continue
+            highway, entry, exit_ = parts
+            for row in rows:
+                index.add(highway, entry, exit_, row.get('vehicle_class'), row.get('price'))
+
+        index.built_at = datetime.now().isoformat()
+        index._sorted_keys = sorted(index._plaza_ids)
+        index.logger.info(f"Built O-D index: {len(index._prices)} prices, {len(index._plaza_ids)} plazas, "
+                          f"{index.skipped} locations without a plaza pair")
+        return index
+
+    def add(self, highway: str, entry: str, exit_: str, vehicle_class, price):
+        number = vehicle_class_number(vehicle_class)
+        price = parse_price(price)
+        if number is None or price is None:
+            return
+
+        highway_id = self._highway_ids.setdefault(highway.upper(), len(self._highway_ids))
+        entry_id, exit_id = self._plaza_id(entry), self._plaza_id(exit_)
+        self._prices[self._pack(highway_id, entry_id, exit_id, number)] = price
+
+        pair = self._pack(0, entry_id, exit_id, number)
+        if pair not in self._pairs:
+            self._pairs[pair] = price
+        elif self._pairs[pair] != price:
+            # Same pair priced differently on two highways: the highway must be given
+            self._pairs[pair] = None
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    def lookup(self, entry: str, exit_: str, vehicle_class, highway: str = None) -> Optional[float]:
+        return self.lookup_many([(highway, entry, exit_, vehicle_class)])[0]
+
+    def lookup_many(self, queries: Iterable[Query]) -> List[Optional[float]]:
+        """Prices for (highway, entry, exit, class) tuples, None where unknown; highway may be None"""
+        prices, pairs = self._prices, self._pairs
+        highway_ids, plaza_ids = self._highway_ids, self._plaza_ids
+        results = []
+        for highway, entry, exit_, vehicle_class in queries:
+            entry_id = plaza_ids.get(normalize_plaza(entry))
+            exit_id = plaza_ids.get(normalize_plaza(exit_))
+            number = vehicle_class_number(vehicle_class)
+            if entry_id is None or exit_id is None or number is None:
+                results.append(None)
+            elif highway:
+                highway_id = highway_ids.get(highway.upper())
+                results.append(None if highway_id is None
+                               else prices.get(self._pack(highway_id, entry_id, exit_id, number)))
+            else:
+                results.append(pairs.get(self._pack(0, entry_id, exit_id, number)))
+        return results
+
+    def entries(self) -> Iterator[Tuple[str, str, str, int, float]]:
+        """Every indexed price as (highway, entry, exit, class, price)"""
+        highways = {highway_id: highway for highway, highway_id in self._highway_ids.items()}
+        for key, price in self._prices.items():
+            highway_id, entry_id, exit_id, number = self._unpack(key)
+            yield highways[highway_id], self._plaza_names[entry_id], self._plaza_names[exit_id], number, price
+
+    def search_plazas(self, prefix: str, limit: int = 20) -> List[str]:
+        """Plaza names starting with prefix, in alphabetical order"""
+        key = normalize_plaza(prefix)
+        start = bisect.bisect_left(self._sorted_keys, key)
+        matches = []
+        for name in itertools.islice(self._sorted_keys, start, None):
+            if not name.startswith(key) or len(matches) >= limit:
+                break
+            matches.append(self._plaza_names[self._plaza_ids[name]])
+        return matches
+
+    def save(self, path: str) -> str:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        state = {
+            'format_version': self.FORMAT_VERSION,
+            'built_at': self.built_at,
+            'skipped': self.skipped,
+            'prices': self._prices,
+            'pairs': self._pairs,
+            'highway_ids': self._highway_ids,
+            'plaza_names': self._plaza_names
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.logger.info(f"O-D index saved: {path}")
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> Optional['ODIndex']:
+        """Load an index written by save(); None if missing, unreadable or from another format version"""
+        logger = logging.getLogger(__name__)
+        try:
+            with open(path, 'rb') as f:
+                state = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, pickle.UnpicklingError, EOFError) as e:
+            logger.warning(f"Ignoring unreadable O-D index {path}: {e}")
+            return None
+
+        if not isinstance(state, dict) or state.get('format_version') != cls.FORMAT_VERSION:
+            logger.info(f"O-D index {path} has an unknown format, rebuild required")
+            return None
+
+        index = cls()
+        index.built_at = state['built_at']
+        index.skipped = state['skipped']
+        index._prices = state['prices']
+        index._pairs = state['pairs']
+        index._highway_ids = state['highway_ids']
+        index._plaza_names = state['plaza_names']
+        index._plaza_ids = {normalize_plaza(name): i for i, name in enumerate(index._plaza_names)}
+        index._sorted_keys = sorted(index._plaza_ids)
+        return index
+
+    def _plaza_id(self, name: str) -> int:
+        key = normalize_plaza(name)
+        plaza_id = self._plaza_ids.get(key)
+        if plaza_id is None:
+            plaza_id = self._plaza_ids[key] = len(self._plaza_names)
+            self._plaza_names.append(name)
+        return plaza_id
+
+    @staticmethod
+    def _unpack(key: int) -> Tuple[int, int, int, int]:
+        return key >> 48, (key >> 28) & 0xFFFFF, (key >> 8) & 0xFFFFF, key & 0xFF
+
+    @staticmethod
+    def _pack(highway_id: int, entry_id: int, exit_id: int, vehicle_class: int) -> int:
+        return (highway_id << 48) | (entry_id << 28) | (exit_id << 8) | (vehicle_class & 0xFF)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the origin-destination toll price index")
+    parser.add_argument('--index', default="data/parsed/od_index.pickle")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help="Build the index from a parsed Brisa JSON file")
+    build.add_argument('parsed_json')
+
+    price = subparsers.add_parser('price', help="Price from one plaza to another")
+    price.add_argument('entry')
+    price.add_argument('exit')
+    price.add_argument('--vehicle-class', default='1')
+    price.add_argument('--highway')
+
+    search = subparsers.add_parser('search', help="Plaza names starting with a prefix")
+    search.add_argument('prefix')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        with open(args.parsed_json, 'r', encoding='utf-8') as f:
+            index = ODIndex.from_parsed(json.load(f))
+        index.save(args.index)
+        print(f"Indexed {len(index)} prices ({index.skipped} locations skipped) into {args.index}")
+        return
+
+    index = ODIndex.load(args.index)
+    if index is None:
+        parser.error(f"No usable index at {args.index}; run the build command first")
+
+    if args.command == 'price':
+        result = index.lookup(args.entry, args.exit, args.vehicle_class, args.highway)
+        print(f"{result:.2f} EUR" if result is not None else "No price found")
+    else:
+        print('\n'.join(index.search_plazas(args.prefix)) or "No plazas found")
+
+
+if __name__ == "__main__":
+    main()
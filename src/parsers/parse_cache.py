@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Dict, Optional
+
+
+class ParseCache:
+    """On-disk cache of parsed PDF results keyed by content hash and parser version"""
+
+    def __init__(self, cache_dir: str = "data/parsed/cache", parser_version: str = "1",
+                 max_bytes: int = 50 * 1024 * 1024, max_age_days: int = 400):
+        self.cache_dir = cache_dir
+        self.parser_version = parser_version
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.logger = logging.getLogger(__name__)
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def file_digest(path: str, chunk_size: int = 1024 * 1024) -> str:
+        """SHA-256 of a file, read in chunks"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _entry_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, f"{digest}_v{self.parser_version}.json")
+
+    def get(self, digest: str) -> Optional[Dict]:
+        """Return the cached parse result for a digest, or None on a miss"""
+        entry_path = self._entry_path(digest)
+        if not os.path.exists(entry_path):
+            return None
+
+        if self._is_expired(entry_path):
+            self._remove(entry_path)
+            return None
+
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Discarding unreadable cache entry {entry_path}: {e}")
+            self._remove(entry_path)
+            return None
+
+        # Touch on hit so eviction drops the least recently used entries first
+        os.utime(entry_path)
+        self.logger.info(f"Parse cache hit: {digest[:12]}")
+        return data
+
+    def put(self, digest: str, data: Dict) -> str:
+        """Store a parse result atomically and apply the eviction policy"""
+        entry_path = self._entry_path(digest)
+        tmp_path = f"{entry_path}.tmp"
+
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, entry_path)
+
+        self.logger.info(f"Parse cache stored: {digest[:12]}")
+        self.evict()
+        return entry_path
+
+    def evict(self) -> int:
+        """Drop expired entries, then the oldest ones until the cache fits in max_bytes"""
+        entries = []
+        removed = 0
+
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            if self._is_expired(path):
+                removed += self._remove(path)
+            else:
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        entries.sort(reverse=True)
+        total = 0
+        for _, size, path in entries:
+            total += size
+            if total > self.max_bytes:
+                removed += self._remove(path)
+
+        if removed:
+            self.logger.info(f"Parse cache evicted {removed} entries")
+        return removed
+
+    def invalidate(self, digest: str = None) -> int:
+        """Remove the entries for one digest (any parser version), or everything"""
+        removed = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            if digest is None or name.startswith(f"{digest}_"):
+                removed += self._remove(os.path.join(self.cache_dir, name))
+
+        self.logger.info(f"Parse cache invalidated {removed} entries")
+        return removed
+
+    def _is_expired(self, path: str) -> bool:
+        return time.time() - os.path.getmtime(path) > self.max_age_days * 86400
+
+    def _remove(self, path: str) -> int:
+        try:
+            os.remove(path)
+            return 1
+        except OSError:
+            return 0
+
+
+def main():
+    # The cache the parser writes to, with the same limits evict applies after each put
+    from config.settings import PARSE_CACHE_SETTINGS
+
+    parser = argparse.ArgumentParser(description="Manage the parsed PDF cache")
+    parser.add_argument('command', choices=['invalidate', 'evict'])
+    parser.add_argument('pdf_path', nargs='?', help="Only invalidate the entry for this PDF")
+    parser.add_argument('--cache-dir', default=PARSE_CACHE_SETTINGS['cache_dir'])
+    args = parser.parse_args()
+
+    cache = ParseCache(**dict(PARSE_CACHE_SETTINGS, cache_dir=args.cache_dir))
+
+    if args.command == 'invalidate':
+        digest = ParseCache.file_digest(args.pdf_path) if args.pdf_path else None
+        print(f"Removed {cache.invalidate(digest)} cache entries")
+    else:
+        print(f"Evicted {cache.evict()} cache entries")
+
+
+if __name__ == "__main__":
+    main()
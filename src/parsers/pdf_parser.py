@@ -1,17 +1,118 @@
 import json
 import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
 from datetime import datetime
-from typing import Dict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ..utils.instrumentation import Tracer
+from ..utils.prices import find_price_tokens, normalize_prices
+from .layout_cache import TableLayoutCache
+from .parse_cache import ParseCache
 
 try:
     import pdfplumber
 except ImportError:
     pdfplumber = None
 
+# Highway codes A1-A99; find_highway() also rejects a code glued to a preceding letter ("CA15")
+HIGHWAY_PATTERN = re.compile(r'A\d{1,2}(?!\d)')
+NOISE_PATTERN = re.compile(r'P[áa]gina|Dominio')
+CLASS_LABELS = tuple(f'Class {i}' for i in range(1, 11))
+
+
+def find_highway(line: str):
+    """First highway code in line standing on its own, or None"""
+    match = HIGHWAY_PATTERN.search(line)
+    while match and match.start() and line[match.start() - 1].isalnum():
+        match = HIGHWAY_PATTERN.search(line, match.end())
+    return match
+
+
+# Checked in order; the first rule that matches decides the line kind
+LINE_RULES = (
+    ('noise', NOISE_PATTERN.search),
+    ('highway', find_highway),
+    ('prices', re.compile('€').search)
+)
+
+
+def classify_line(line: str) -> str:
+    """Kind of a stripped text line: noise, highway, prices, plaza or blank"""
+    if not line:
+        return 'blank'
+    for kind, test in LINE_RULES:
+        if test(line):
+            return kind
+    return 'plaza'
+
+
+def class_labels(count: int) -> tuple:
+    """'Class 1', 'Class 2', ... for the price columns of a row"""
+    if count <= len(CLASS_LABELS):
+        return CLASS_LABELS
+    return tuple(f'Class {i}' for i in range(1, count + 1))
+
+
+def release_page(page):
+    """Drop a parsed page's cached layout objects and text maps so memory stays per-page"""
+    page.flush_cache()
+    get_textmap = getattr(page, 'get_textmap', None)
+    if hasattr(get_textmap, 'cache_clear'):
+        get_textmap.cache_clear()
+
+
+def _parse_page_range(pdf_path: str, start: int, end: int, table_only: bool = False,
+                      layouts: Dict = None) -> Tuple[List[Tuple[int, List[Dict]]], List[Dict], Dict]:
+    """Worker entry point: open the PDF independently and parse pages [start, end).
+
+    Returns the page results plus the worker's page timings and table layouts.
+    """
+    parser = PDFParser(table_only=table_only, layout_cache=TableLayoutCache(entries=layouts))
+    results = []
+
+    with pdfplumber.open(pdf_path, pages=list(range(start + 1, end + 1))) as pdf:
+        for offset, page in enumerate(pdf.pages):
+            page_num = start + offset
+            parser.logger.info(f"Processing page {page_num + 1}")
+            results.append((page_num, parser._parse_page(page)))
+            release_page(page)
+
+    return results, parser.page_timings, parser.layout_cache.entries
+
 
 class PDFParser:
     
-    def __init__(self):
+    # Bump whenever parsing output changes so cached results are not reused
+    VERSION = "4"
+    
+    # Ruled tariff tables: cell borders are drawn, so line strategies with tight snapping suffice
+    TABLE_SETTINGS = {
+        'vertical_strategy': 'lines',
+        'horizontal_strategy': 'lines',
+        'snap_tolerance': 2,
+        'join_tolerance': 2,
+        'intersection_tolerance': 2
+    }
+    # Margin added around a cached table box before cropping (points)
+    CROP_MARGIN = 2
+    # Seconds between cancellation checks while waiting for a parallel page chunk
+    CANCEL_POLL_INTERVAL = 0.2
+    
+    def __init__(self, parallel: bool = False, workers: int = None, chunk_size: int = 4,
+                 cache: ParseCache = None, table_only: bool = False,
+                 layout_cache: TableLayoutCache = None, table_settings: Dict = None, tracer: Tracer = None):
+        self.parallel = parallel
+        self.workers = workers
+        self.chunk_size = max(1, chunk_size)
+        self.cache = cache
+        self.table_only = table_only
+        self.layout_cache = layout_cache or TableLayoutCache()
+        self.table_settings = table_settings or self.TABLE_SETTINGS
+        self.page_timings: List[Dict] = []
+        self.tracer = tracer or Tracer(enabled=False)
         self.logger = self._setup_logging()
         
     def _setup_logging(self):
@@ -27,7 +128,14 @@ class PDFParser:
             
         return logger
         
-    def parse_brisa_pdf(self, pdf_path: str) -> Dict:
+    def parse_brisa_pdf(self, pdf_path: str, cancel_event: threading.Event = None) -> Dict:
+        """Locations -> tariff rows; an empty dict if cancel_event is set before the last page"""
+        with self.tracer.span('pdf.parse', bytes=os.path.getsize(pdf_path) if os.path.exists(pdf_path) else 0) as span:
+            toll_data = self._parse_brisa_pdf(pdf_path, span, cancel_event)
+            span.set(locations=len(toll_data), rows=sum(len(rows) for rows in toll_data.values()))
+            return toll_data
+        
+    def _parse_brisa_pdf(self, pdf_path: str, span, cancel_event: threading.Event = None) -> Dict:
         if not pdfplumber:
             self.logger.warning("pdfplumber not available. Install with: pip install pdfplumber")
             return self._get_sample_data()
@@ -36,56 +144,265 @@ class PDFParser:
             self.logger.error(f"PDF file not found: {pdf_path}")
             return self._get_sample_data()
             
+        digest = None
+        if self.cache:
+            # Table-only results differ from full ones, so they are cached separately
+            digest = self.cache.file_digest(pdf_path) + ('_tables' if self.table_only else '')
+            cached = self.cache.get(digest)
+            if cached:
+                self.logger.info(f"Using cached parse result for {pdf_path} ({len(cached)} locations)")
+                span.set(cached=True)
+                return cached
+            
         toll_data = {}
+        self.page_timings = []
         
         try:
             with pdfplumber.open(pdf_path) as pdf:
-                for page_num, page in enumerate(pdf.pages):
-                    self.logger.info(f"Processing page {page_num + 1}")
-                    
-                    text = page.extract_text()
-                    if text:
-                        toll_data.update(self._parse_text_content(text))
-                    
-                    tables = page.extract_tables()
-                    for table in tables:
-                        if table:
-                            toll_data.update(self._parse_table_content(table))
+                page_count = len(pdf.pages)
+                span.set(pages=page_count)
+                
+                if not self.parallel or page_count <= self.chunk_size:
+                    for page_num, page in enumerate(pdf.pages):
+                        if cancel_event is not None and cancel_event.is_set():
+                            self.logger.info(f"Parse cancelled before page {page_num + 1}")
+                            span.set(cancelled=True)
+                            return {}
+                        self.logger.info(f"Processing page {page_num + 1}")
+                        with self.tracer.span('pdf.page', page=page_num + 1) as page_span:
+                            partials = self._parse_page(page)
+                            for partial in partials:
+                                toll_data.update(partial)
+                            release_page(page)
+                            page_span.set(mode=self.page_timings[-1]['mode'],
+                                          rows=sum(len(rows) for partial in partials for rows in partial.values()))
+            
+            if self.parallel and page_count > self.chunk_size:
+                partials = self._parse_pages_parallel(pdf_path, page_count, cancel_event)
+                if partials is None:
+                    span.set(cancelled=True)
+                    return {}
+                for partial in partials:
+                    toll_data.update(partial)
             
             self.logger.info(f"Extracted data for {len(toll_data)} locations")
+            self._log_page_timings()
+            if toll_data and digest:
+                self.cache.put(digest, toll_data)
             return toll_data if toll_data else self._get_sample_data()
             
         except Exception as e:
             self.logger.error(f"Error parsing PDF: {e}")
             return self._get_sample_data()
             
+    def iter_brisa_pdf(self, pdf_path: str, cancel_event: threading.Event = None) -> Iterator[Dict]:
+        """Yield parsed price records page by page instead of building one dict.
+        
+        Each page's layout cache is dropped once the page is parsed, so memory does not
+        grow with the document. Within a page, a location found by both the text and the
+        table pass is yielded once, with the rows parse_brisa_pdf would keep. Unlike
+        parse_brisa_pdf, a location repeated on a later page is yielded again rather than
+        replacing the earlier rows. Iteration stops before the next page once cancel_event is set.
+        """
+        if not pdfplumber or not os.path.exists(pdf_path):
+            self.logger.warning(f"Cannot read {pdf_path} (pdfplumber installed: {bool(pdfplumber)}), "
+                                f"streaming sample data")
+            for rows in self._get_sample_data().values():
+                yield from rows
+            return
+        
+        with pdfplumber.open(pdf_path) as pdf:
+            for page_num, page in enumerate(pdf.pages):
+                if cancel_event is not None and cancel_event.is_set():
+                    self.logger.info(f"Streaming cancelled before page {page_num + 1}")
+                    return
+                self.logger.info(f"Processing page {page_num + 1}")
+                try:
+                    partials = self._parse_page(page)
+                finally:
+                    release_page(page)
+                page_data = {}
+                for partial in partials:
+                    page_data.update(partial)
+                for rows in page_data.values():
+                    yield from rows
+        
+    def iter_tariffs(self, pdf_path: str, validity_period: str = '2025',
+                     source: str = 'Brisa PDF', cancel_event: threading.Event = None) -> Iterator[Dict]:
+        """iter_brisa_pdf records as tariff rows for DataExporter.stream_* and TollAPIClient.send_toll_stream"""
+        scraped_at = datetime.now().isoformat()
+        for record in self.iter_brisa_pdf(pdf_path, cancel_event):
+            yield {
+                'route_segment': record['route'],
+                'vehicle_type': record['vehicle_class'],
+                'price': record['price'],
+                'currency': record['currency'],
+                'validity_period': validity_period,
+                'source': source,
+                'scraped_at': scraped_at
+            }
+        
+    def _parse_pages_parallel(self, pdf_path: str, page_count: int,
+                              cancel_event: threading.Event = None) -> Optional[List[Dict]]:
+        """Parse page chunks in worker processes and return partial results in page order (None if cancelled)"""
+        ranges = [(start, min(start + self.chunk_size, page_count))
+                  for start in range(0, page_count, self.chunk_size)]
+        self.logger.info(f"Parsing {page_count} pages in {len(ranges)} chunks "
+                         f"(workers={self.workers or os.cpu_count()}, chunk_size={self.chunk_size})")
+        
+        pages = {}
+        cancelled = False
+        # Not a with block: its exit would wait for the chunks still running after a cancel
+        executor = ProcessPoolExecutor(max_workers=self.workers)
+        try:
+            futures = [executor.submit(_parse_page_range, pdf_path, start, end,
+                                       self.table_only, self.layout_cache.entries)
+                       for start, end in ranges]
+            for future in futures:
+                if not self._chunk_done(future, cancel_event):
+                    self.logger.info("Parse cancelled, dropping the remaining page chunks")
+                    cancelled = True
+                    return None
+                results, timings, layouts = future.result()
+                for page_num, partials in results:
+                    pages[page_num] = partials
+                self.page_timings.extend(timings)
+                self.layout_cache.update(layouts)
+                rows = {page_num + 1: sum(len(page_rows) for partial in partials for page_rows in partial.values())
+                        for page_num, partials in results}
+                for timing in timings:
+                    self.tracer.record('pdf.page', timing['seconds'], page=timing['page'], mode=timing['mode'],
+                                       rows=rows.get(timing['page'], 0))
+        finally:
+            executor.shutdown(wait=not cancelled, cancel_futures=cancelled)
+        
+        return [partial for page_num in sorted(pages) for partial in pages[page_num]]
+        
+    def _chunk_done(self, future, cancel_event: threading.Event = None) -> bool:
+        """Wait for a page chunk; False as soon as cancel_event is set instead"""
+        if cancel_event is None:
+            return True
+        while not cancel_event.is_set():
+            if wait([future], timeout=self.CANCEL_POLL_INTERVAL).done:
+                return True
+        return False
+        
+    def _parse_page(self, page) -> List[Dict]:
+        """Parse a single page into partial results and record how long it took"""
+        start = time.perf_counter()
+        if self.table_only:
+            partials, mode = self._parse_page_tables(page)
+        else:
+            partials, mode = self._parse_page_full(page), 'full'
+        
+        self.page_timings.append({
+            'page': page.page_number,
+            'mode': mode,
+            'seconds': round(time.perf_counter() - start, 4)
+        })
+        return partials
+        
+    def _parse_page_full(self, page) -> List[Dict]:
+        """Text first then each table, both over the whole page"""
+        partials = []
+        
+        text = page.extract_text()
+        if text:
+            partials.append(self._parse_text_content(text))
+        
+        tables = page.extract_tables()
+        for table in tables:
+            if table:
+                partials.append(self._parse_table_content(table))
+        
+        return partials
+        
+    def _parse_page_tables(self, page) -> Tuple[List[Dict], str]:
+        """Table-only pass: crop to cached table boxes, detect them on a layout miss.
+        
+        The text pass runs only when no table on the page yields tariff rows.
+        """
+        fingerprint = TableLayoutCache.fingerprint(page)
+        bboxes = self.layout_cache.get(fingerprint)
+        
+        if bboxes:
+            partials = [partial for partial in (self._parse_cropped_table(page, bbox) for bbox in bboxes) if partial]
+            if partials:
+                return partials, 'cropped'
+        
+        tables = page.find_tables(self.table_settings)
+        partials = [partial for partial in (self._parse_table_content(table.extract()) for table in tables)
+                    if partial]
+        if partials:
+            self.layout_cache.put(fingerprint, [list(table.bbox) for table in tables])
+            return partials, 'detected'
+        
+        text = page.extract_text()
+        return ([self._parse_text_content(text)] if text else []), 'text'
+        
+    def _parse_cropped_table(self, page, bbox: list) -> Dict:
+        x0, top, x1, bottom = page.bbox
+        region = (
+            max(x0, bbox[0] - self.CROP_MARGIN),
+            max(top, bbox[1] - self.CROP_MARGIN),
+            min(x1, bbox[2] + self.CROP_MARGIN),
+            min(bottom, bbox[3] + self.CROP_MARGIN)
+        )
+        table = page.crop(region).extract_table(self.table_settings)
+        return self._parse_table_content(table) if table else {}
+        
+    def _log_page_timings(self):
+        if not self.page_timings:
+            return
+        by_mode = {}
+        for timing in self.page_timings:
+            by_mode.setdefault(timing['mode'], []).append(timing['seconds'])
+        summary = ', '.join(f"{mode}: {len(times)} pages, {sum(times) / len(times) * 1000:.1f} ms/page"
+                            for mode, times in by_mode.items())
+        self.logger.info(f"Page timings - {summary}")
+        
     def _parse_text_content(self, text: str) -> Dict:
         toll_data = {}
-        lines = text.split('\n')
         current_location = None
+        price_lines = []
+        tokens = []
         
-        for line in lines:
+        for line in text.split('\n'):
             line = line.strip()
+            kind = classify_line(line)
             
-            if any(highway in line for highway in ['A1', 'A2', 'A3', 'A4', 'A5', 'A6', 'A7', 'A8', 'A9']):
+            if kind == 'highway':
                 current_location = line
                 if current_location not in toll_data:
                     toll_data[current_location] = []
             
-            elif '€' in line and current_location:
-                prices = self._extract_prices_from_line(line)
-                for i, price in enumerate(prices):
-                    toll_data[current_location].append({
-                        'route': current_location,
-                        'vehicle_class': f'Class {i+1}',
-                        'price': price,
-                        'currency': 'EUR'
-                    })
+            elif kind == 'prices' and current_location:
+                line_tokens = find_price_tokens(line)
+                price_lines.append((current_location, len(line_tokens)))
+                tokens.extend(line_tokens)
+        
+        # Every amount on the page is normalised in one batch, then dealt back to its line
+        prices = normalize_prices(tokens)
+        end = 0
+        for location, count in price_lines:
+            start, end = end, end + count
+            line_prices = prices[start:end]
+            if None in line_prices:
+                line_prices = [price for price in line_prices if price is not None]
+            rows = toll_data[location]
+            for label, price in zip(class_labels(len(line_prices)), line_prices):
+                rows.append({
+                    'route': location,
+                    'vehicle_class': label,
+                    'price': price,
+                    'currency': 'EUR'
+                })
         
         return toll_data
         
     def _parse_table_content(self, table: list) -> Dict:
         toll_data = {}
+        price_cells = []
         
         if len(table) <= 1:
             return toll_data
@@ -96,40 +413,25 @@ class PDFParser:
                 
             location = str(row[0]).strip() if row[0] else None
             
-            if location and any(highway in location for highway in ['A1', 'A2', 'A3', 'A4', 'A5']):
+            if location and find_highway(location):
                 if location not in toll_data:
                     toll_data[location] = []
                 
                 for i, cell in enumerate(row[1:]):
                     if cell and '€' in str(cell):
-                        price = str(cell).replace('€', '').replace(',', '.').strip()
-                        try:
-                            float(price)
-                            toll_data[location].append({
-                                'route': location,
-                                'vehicle_class': f'Class {i+1}',
-                                'price': price,
-                                'currency': 'EUR'
-                            })
-                        except ValueError:
-                            continue
-        
-        return toll_data
+                        price_cells.append((location, i, cell))
         
-    def _extract_prices_from_line(self, line: str) -> list:
-        prices = []
-        parts = line.split()
+        prices = normalize_prices(cell for _, _, cell in price_cells)
+        for (location, i, _), price in zip(price_cells, prices):
+            if price is not None:
+                toll_data[location].append({
+                    'route': location,
+                    'vehicle_class': f'Class {i+1}',
+                    'price': price,
+                    'currency': 'EUR'
+                })
         
-        for part in parts:
-            if '€' in part:
-                price = part.replace('€', '').replace(',', '.').strip()
-                try:
-                    float(price)
-                    prices.append(price)
-                except ValueError:
-                    continue
-        
-        return prices
+        return toll_data
         
     def _get_sample_data(self) -> Dict:
         return {
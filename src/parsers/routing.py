@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+
+import argparse
+import heapq
+import json
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .od_index import ODIndex, normalize_plaza, vehicle_class_number
+
+# (entry plaza, exit plaza, vehicle class)
+QuoteQuery = Tuple[str, str, object]
+
+
+class TollRouter:
+    """Toll totals for trips that cross several highways.
+
+    Plazas are graph nodes and every O-D tariff in the index is an edge, so a plaza that
+    appears on two highways is the junction between them. cheapest() runs Dijkstra per
+    vehicle class; canonical() prices a caller-chosen sequence of plazas leg by leg.
+    Tariffs are treated as symmetric unless the reverse direction has its own price.
+    """
+
+    def __init__(self, index: ODIndex, symmetric: bool = True):
+        self.index = index
+        self.symmetric = symmetric
+        self.logger = logging.getLogger(__name__)
+        self._names: Dict[str, str] = {}
+        self._graphs: Dict[int, Dict[str, List[Tuple[str, float, str]]]] = {}
+        self._build()
+
+    def _build(self):
+        edges: Dict[int, Dict[Tuple[str, str], Tuple[float, str]]] = defaultdict(dict)
+        reverse: Dict[int, Dict[Tuple[str, str], Tuple[float, str]]] = defaultdict(dict)
+
+        for highway, entry, exit_, number, price in self.index.entries():
+            entry_key, exit_key = normalize_plaza(entry), normalize_plaza(exit_)
+            self._names.setdefault(entry_key, entry)
+            self._names.setdefault(exit_key, exit_)
+            self._keep_cheapest(edges[number], (entry_key, exit_key), price, highway)
+            if self.symmetric:
+                self._keep_cheapest(reverse[number], (exit_key, entry_key), price, highway)
+
+        for number, class_edges in edges.items():
+            for pair, edge in reverse[number].items():
+                class_edges.setdefault(pair, edge)
+            graph = defaultdict(list)
+            for (entry_key, exit_key), (price, highway) in class_edges.items():
+                graph[entry_key].append((exit_key, price, highway))
+            self._graphs[number] = dict(graph)
+
+        self.logger.info(f"Route graph: {len(self._names)} plazas, vehicle classes {sorted(self._graphs)}")
+
+    @staticmethod
+    def _keep_cheapest(edges: Dict, pair: Tuple[str, str], price: float, highway: str):
+        if pair not in edges or price < edges[pair][0]:
+            edges[pair] = (price, highway)
+
+    def cheapest(self, entry: str, exit_: str, vehicle_class) -> Optional[Dict]:
+        """Lowest total toll from entry to exit, with the legs taken; None if unreachable"""
+        return self.cheapest_many([(entry, exit_, vehicle_class)])[0]
+
+    def cheapest_many(self, queries: Iterable[QuoteQuery]) -> List[Optional[Dict]]:
+        """Batch cheapest(); Dijkstra runs once per (entry, class) and serves every exit asked for"""
+        queries = list(queries)
+        results: List[Optional[Dict]] = [None] * len(queries)
+        grouped: Dict[Tuple[str, int], List[Tuple[int, str]]] = defaultdict(list)
+
+        for position, (entry, exit_, vehicle_class) in enumerate(queries):
+            number = vehicle_class_number(vehicle_class)
+            grouped[(normalize_plaza(entry), number)].append((position, normalize_plaza(exit_)))
+
+        for (source, number), targets in grouped.items():
+            graph = self._graphs.get(number)
+            if graph is None or source not in self._names:
+                continue
+            distances, previous = self._shortest_paths(graph, source, {target for _, target in targets})
+            for position, target in targets:
+                if target in distances:
+                    results[position] = self._quote(source, target, number, distances, previous)
+
+        return results
+
+    def canonical(self, plazas: Sequence[str], vehicle_class, highways: Sequence[str] = None) -> Optional[Dict]:
+        """Total toll along plazas in the given order, using each leg's published tariff.
+
+        highways, if given, names the highway of each leg; otherwise a leg must have a
+        single price across highways. None if any leg has no tariff.
+        """
+        if len(plazas) < 2:
+            return None
+        if highways is not None and len(highways) != len(plazas) - 1:
+            raise ValueError("highways must name one highway per leg")
+
+        legs = []
+        for i, (entry, exit_) in enumerate(zip(plazas, plazas[1:])):
+            highway = highways[i] if highways else None
+            price = self.index.lookup(entry, exit_, vehicle_class, highway)
+            if price is None and self.symmetric:
+                price = self.index.lookup(exit_, entry, vehicle_class, highway)
+            if price is None:
+                return None
+            legs.append({'highway': highway, 'from': entry, 'to': exit_, 'price': price})
+
+        return {
+            'vehicle_class': vehicle_class_number(vehicle_class),
+            'total': round(sum(leg['price'] for leg in legs), 2),
+            'legs': legs
+        }
+
+    def canonical_many(self, routes: Iterable[Tuple[Sequence[str], object]]) -> List[Optional[Dict]]:
+        return [self.canonical(plazas, vehicle_class) for plazas, vehicle_class in routes]
+
+    @staticmethod
+    def _shortest_paths(graph: Dict, source: str, targets: set) -> Tuple[Dict[str, float], Dict]:
+        """Dijkstra from source, stopping once every target is settled"""
+        distances = {source: 0.0}
+        previous = {}
+        settled = set()
+        remaining = set(targets)
+        heap = [(0.0, source)]
+
+        while heap and remaining:
+            distance, node = heapq.heappop(heap)
+            if node in settled:
+                continue
+            settled.add(node)
+            remaining.discard(node)
+            for neighbour, price, highway in graph.get(node, ()):
+                candidate = distance + price
+                if candidate < distances.get(neighbour, float('inf')):
+                    distances[neighbour] = candidate
+                    previous[neighbour] = (node, highway, price)
+                    heapq.heappush(heap, (candidate, neighbour))
+
+        return {node: distances[node] for node in settled}, previous
+
+    def _quote(self, source: str, target: str, number: int, distances: Dict, previous: Dict) -> Dict:
+        legs = []
+        node = target
+        while node != source:
+            parent, highway, price = previous[node]
+            legs.append({'highway': highway, 'from': self._names[parent], 'to': self._names[node], 'price': price})
+            node = parent
+        legs.reverse()
+
+        return {
+            'vehicle_class': number,
+            'total': round(distances[target], 2),
+            'legs': legs
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quote the toll for a trip across highways")
+    parser.add_argument('plazas', nargs='+', help="Entry and exit plaza, or every plaza of a canonical route")
+    parser.add_argument('--vehicle-class', default='1')
+    parser.add_argument('--index', default="data/parsed/od_index.pickle")
+    parser.add_argument('--parsed', help="Build the graph from a parsed/exported location JSON file instead")
+    parser.add_argument('--canonical', action='store_true', help="Price the plazas in the given order")
+    args = parser.parse_args()
+
+    if args.parsed:
+        with open(args.parsed, 'r', encoding='utf-8') as f:
+            index = ODIndex.from_parsed(json.load(f))
+    else:
+        index = ODIndex.load(args.index)
+        if index is None:
+            parser.error(f"No usable index at {args.index}; pass --parsed <tolls_by_location.json>")
+
+    router = TollRouter(index)
+    if args.canonical:
+        quote = router.canonical(args.plazas, args.vehicle_class)
+    elif len(args.plazas) == 2:
+        quote = router.cheapest(args.plazas[0], args.plazas[1], args.vehicle_class)
+    else:
+        parser.error("Give exactly two plazas, or use --canonical for a longer route")
+
+    if quote is None:
+        print("No route found")
+        return
+    for leg in quote['legs']:
+        print(f"  {leg['highway'] or '-':>4}  {leg['from']} -> {leg['to']}: {leg['price']:.2f} EUR")
+    print(f"Total (class {quote['vehicle_class']}): {quote['total']:.2f} EUR")
+
+
+if __name__ == "__main__":
+    main()
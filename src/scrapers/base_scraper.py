@@ -1,7 +1,9 @@
 import logging
 import os
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
@@ -12,13 +14,32 @@ from selenium.webdriver.support.ui import WebDriverWait
 from webdriver_manager.chrome import ChromeDriverManager
 from webdriver_manager.firefox import GeckoDriverManager
 from selenium.webdriver.firefox.options import Options as FirefoxOptions
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from ..utils.instrumentation import Tracer
+from .driver_discovery import DriverDiscoveryCache
+from .driver_pool import DriverPool
 
 
 class BaseScraper(ABC):
     
-    def __init__(self, headless: bool = True, timeout: int = 10):
+    # Readiness checks run after navigation, as (strategy, argument) pairs.
+    # Strategies: 'selector', 'network_idle', 'stable_count', 'js'
+    READY_CONDITIONS: List[Tuple[str, Optional[str]]] = [('network_idle', None)]
+    POLL_INTERVAL = 0.25
+    
+    def __init__(self, headless: bool = True, timeout: int = 10, driver_pool: DriverPool = None,
+                 discovery_cache: DriverDiscoveryCache = None, offline: bool = False, tracer: Tracer = None,
+                 cancel_event: threading.Event = None):
         self.headless = headless
         self.timeout = timeout
+        self.driver_pool = driver_pool
+        self.discovery_cache = discovery_cache
+        self.offline = offline
+        self.tracer = tracer or Tracer(enabled=False)
+        # Set by the orchestrator when it abandons this source; checked between slow steps
+        self.cancel_event = cancel_event
+        self.startup_timings = {}
         self.driver = None
         self.wait = None
         self.logger = self._setup_logging()
@@ -35,8 +56,13 @@ class BaseScraper(ABC):
             
         return logger
         
-    def initialize_driver(self) -> bool:
-        try:
+    def _create_driver(self):
+        start = time.monotonic()
+        browser = self._discover_browser()
+        self.startup_timings['discovery'] = time.monotonic() - start
+        
+        start = time.monotonic()
+        if browser['browser'] == 'chrome':
             chrome_options = Options()
             if self.headless:
                 chrome_options.add_argument('--headless=new')
@@ -44,89 +70,205 @@ class BaseScraper(ABC):
             chrome_options.add_argument('--disable-dev-shm-usage')
             chrome_options.add_argument('--disable-gpu')
             chrome_options.add_argument('--window-size=1920,1080')
+            chrome_options.binary_location = browser['binary']
             
-            chrome_paths = [
-                '/usr/bin/google-chrome',
-                '/usr/bin/google-chrome-stable', 
-                '/usr/bin/chromium',
-                '/usr/bin/chromium-browser',
-                '/snap/bin/chromium',
-                '/opt/google/chrome/chrome'
-            ]
+            driver = webdriver.Chrome(service=Service(browser['driver_path']), options=chrome_options)
+        else:
+            firefox_options = FirefoxOptions()
+            if self.headless:
+                firefox_options.add_argument('--headless')
+            firefox_options.binary_location = browser['binary']
             
-            chrome_binary = None
-            for chrome_path in chrome_paths:
-                if os.path.exists(chrome_path):
-                    chrome_binary = chrome_path
-                    chrome_options.binary_location = chrome_path
-                    self.logger.info(f"Found Chrome at: {chrome_path}")
+            driver = webdriver.Firefox(service=Service(browser['driver_path']), options=firefox_options)
+        
+        self.startup_timings['driver_spawn'] = time.monotonic() - start
+        return driver
+        
+    def _discover_browser(self) -> Dict:
+        """Resolve browser binary and driver path, from the discovery cache when it is still valid"""
+        if self.discovery_cache:
+            cached = self.discovery_cache.load()
+            if cached:
+                self.logger.info(f"Using cached {cached['browser']} at {cached['binary']} "
+                                 f"with driver {cached['driver_path']} ({cached.get('driver_version')})")
+                return cached
+        
+        browser = self._probe_browser()
+        if self.discovery_cache:
+            browser = self.discovery_cache.store(browser)
+        return browser
+        
+    def _probe_browser(self) -> Dict:
+        chrome_paths = [
+            '/usr/bin/google-chrome',
+            '/usr/bin/google-chrome-stable', 
+            '/usr/bin/chromium',
+            '/usr/bin/chromium-browser',
+            '/snap/bin/chromium',
+            '/opt/google/chrome/chrome'
+        ]
+        
+        chrome_binary = None
+        for chrome_path in chrome_paths:
+            if os.path.exists(chrome_path):
+                chrome_binary = chrome_path
+                self.logger.info(f"Found Chrome at: {chrome_path}")
+                break
+        
+        if chrome_binary:
+            system_drivers = ['/usr/bin/chromedriver', '/usr/local/bin/chromedriver']
+            driver_path = None
+            
+            for sys_driver in system_drivers:
+                if os.path.exists(sys_driver):
+                    driver_path = sys_driver
+                    self.logger.info(f"Using system ChromeDriver: {sys_driver}")
                     break
             
-            if chrome_binary:
-                system_drivers = ['/usr/bin/chromedriver', '/usr/local/bin/chromedriver']
-                driver_path = None
-                
-                for sys_driver in system_drivers:
-                    if os.path.exists(sys_driver):
-                        driver_path = sys_driver
-                        self.logger.info(f"Using system ChromeDriver: {sys_driver}")
-                        break
-                
-                if driver_path:
-                    service = Service(driver_path)
+            if not driver_path:
+                if 'chromium' in chrome_binary:
+                    driver_path = self._install_driver(lambda: ChromeDriverManager(chrome_type="chromium").install())
+                else:
+                    driver_path = self._install_driver(lambda: ChromeDriverManager().install())
+            
+            return {'browser': 'chrome', 'binary': chrome_binary, 'driver_path': driver_path}
+        
+        firefox_paths = ['/usr/bin/firefox', '/usr/bin/firefox-esr']
+        firefox_binary = None
+        
+        for firefox_path in firefox_paths:
+            if os.path.exists(firefox_path):
+                firefox_binary = firefox_path
+                self.logger.info(f"Found Firefox at: {firefox_path}")
+                break
+        
+        if firefox_binary:
+            driver_path = next((path for path in ['/usr/bin/geckodriver', '/usr/local/bin/geckodriver']
+                                if os.path.exists(path)), None)
+            if not driver_path:
+                driver_path = self._install_driver(lambda: GeckoDriverManager().install())
+            
+            return {'browser': 'firefox', 'binary': firefox_binary, 'driver_path': driver_path}
+        
+        raise Exception("Neither Chrome/Chromium nor Firefox found. Please install a browser.")
+        
+    def _install_driver(self, install) -> str:
+        if self.offline:
+            raise Exception("No local WebDriver found and offline mode is on; install chromedriver/geckodriver "
+                            "or run once online to populate the driver cache")
+        return install()
+        
+    def cancelled(self) -> bool:
+        return self.cancel_event is not None and self.cancel_event.is_set()
+        
+    def initialize_driver(self) -> bool:
+        with self.tracer.span('driver.init', pooled=bool(self.driver_pool)) as span:
+            try:
+                self.startup_timings = {}
+                if self.driver_pool:
+                    self.driver = self.driver_pool.acquire(self._create_driver)
                 else:
-                    if 'chromium' in chrome_binary:
-                        service = Service(ChromeDriverManager(chrome_type="chromium").install())
-                    else:
-                        service = Service(ChromeDriverManager().install())
+                    self.driver = self._create_driver()
                 
-                self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            else:
-                firefox_paths = ['/usr/bin/firefox', '/usr/bin/firefox-esr']
-                firefox_binary = None
+                self.wait = WebDriverWait(self.driver, self.timeout)
+                self.logger.info("WebDriver initialized successfully")
+                span.set(**{f"{stage}_seconds": round(seconds, 3) for stage, seconds in self.startup_timings.items()})
+                return True
                 
-                for firefox_path in firefox_paths:
-                    if os.path.exists(firefox_path):
-                        firefox_binary = firefox_path
-                        self.logger.info(f"Found Firefox at: {firefox_path}")
-                        break
+            except Exception as e:
+                self.logger.error(f"Failed to initialize WebDriver: {e}")
+                span.set(error=str(e))
+                return False
+            
+    def navigate_to_page(self, url: str) -> bool:
+        with self.tracer.span('navigate', url=url) as span:
+            try:
+                start = time.monotonic()
+                self.driver.get(url)
+                self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+                self.logger.info(f"Successfully navigated to {url}")
                 
-                if firefox_binary:
-                    firefox_options = FirefoxOptions()
-                    if self.headless:
-                        firefox_options.add_argument('--headless')
-                    firefox_options.binary_location = firefox_binary
-                    
-                    service = Service(GeckoDriverManager().install())
-                    self.driver = webdriver.Firefox(service=service, options=firefox_options)
-                else:
-                    raise Exception("Neither Chrome/Chromium nor Firefox found. Please install a browser.")
+                if 'first_navigation' not in self.startup_timings:
+                    self.startup_timings['first_navigation'] = time.monotonic() - start
+                    breakdown = ', '.join(f"{stage}={seconds:.2f}s" for stage, seconds in self.startup_timings.items())
+                    self.logger.info(f"Startup timing: {breakdown}")
+                return True
+            except Exception as e:
+                self.logger.error(f"Error navigating to {url}: {e}")
+                span.set(error=str(e))
+                return False
             
-            self.wait = WebDriverWait(self.driver, self.timeout)
-            self.logger.info("WebDriver initialized successfully")
-            return True
+    def wait_until_ready(self, conditions: List[Tuple[str, Optional[str]]] = None) -> bool:
+        """Run readiness checks in order; a timed-out check is logged and the scrape continues"""
+        ready = True
+        for strategy, argument in (conditions if conditions is not None else self.READY_CONDITIONS):
+            wait = getattr(self, f"wait_for_{strategy}")
+            ready = (wait(argument) if argument is not None else wait()) and ready
+        return ready
+        
+    def wait_for_selector(self, css_selector: str, timeout: float = None) -> bool:
+        return self._timed_wait(
+            f"selector {css_selector!r}",
+            lambda driver: driver.find_elements(By.CSS_SELECTOR, css_selector),
+            timeout
+        )
+        
+    def wait_for_network_idle(self, idle_time: float = 0.5, timeout: float = None) -> bool:
+        """Wait for document.readyState == 'complete' and no new resource loads for idle_time"""
+        state = {'count': None, 'since': None}
+        
+        def idle(driver):
+            ready_state, resources = driver.execute_script(
+                "return [document.readyState, performance.getEntriesByType('resource').length];"
+            )
+            now = time.monotonic()
+            if ready_state != 'complete' or resources != state['count']:
+                state['count'], state['since'] = resources, now
+                return False
+            return now - state['since'] >= idle_time
             
-        except Exception as e:
-            self.logger.error(f"Failed to initialize WebDriver: {e}")
-            return False
+        return self._timed_wait("network idle", idle, timeout)
+        
+    def wait_for_stable_count(self, css_selector: str, polls: int = 3, timeout: float = None) -> bool:
+        """Wait until a non-zero element count is unchanged across `polls` consecutive polls"""
+        history = []
+        
+        def stable(driver):
+            history.append(len(driver.find_elements(By.CSS_SELECTOR, css_selector)))
+            recent = history[-polls:]
+            return len(recent) == polls and recent[0] > 0 and len(set(recent)) == 1
             
-    def navigate_to_page(self, url: str) -> bool:
+        return self._timed_wait(f"stable count of {css_selector!r}", stable, timeout)
+        
+    def wait_for_js(self, predicate: str, timeout: float = None) -> bool:
+        """Wait for a JavaScript expression (a `return ...` statement) to be truthy"""
+        return self._timed_wait("js predicate", lambda driver: driver.execute_script(predicate), timeout)
+        
+    def _timed_wait(self, description: str, condition, timeout: float = None) -> bool:
+        start = time.monotonic()
         try:
-            self.driver.get(url)
-            self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            self.logger.info(f"Successfully navigated to {url}")
+            WebDriverWait(self.driver, timeout or self.timeout, poll_frequency=self.POLL_INTERVAL).until(condition)
+            self.logger.info(f"Wait for {description} satisfied in {time.monotonic() - start:.2f}s")
             return True
-        except Exception as e:
-            self.logger.error(f"Error navigating to {url}: {e}")
+        except TimeoutException:
+            self.logger.warning(f"Wait for {description} timed out after {time.monotonic() - start:.2f}s")
+            return False
+        except WebDriverException as e:
+            self.logger.warning(f"Wait for {description} failed after {time.monotonic() - start:.2f}s: {e}")
             return False
             
     def cleanup(self):
-        if self.driver:
+        if self.driver and self.driver_pool:
+            self.driver_pool.release(self.driver)
+            self.logger.info("WebDriver returned to pool")
+        elif self.driver:
             try:
                 self.driver.quit()
                 self.logger.info("WebDriver closed successfully")
             except Exception as e:
                 self.logger.error(f"Error closing WebDriver: {e}")
+        self.driver = None
+        self.wait = None
                 
     @abstractmethod
     def scrape(self) -> List[Dict]:
@@ -1,40 +1,79 @@
+import hashlib
 import os
-import time
 from datetime import datetime
-from typing import Dict, List
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
 
 import requests
 from selenium.webdriver.common.by import By
 
 from .base_scraper import BaseScraper
+from .download_manifest import DownloadManifest
+
+
+class _AnchorCollector(HTMLParser):
+    """Collect (href, text) pairs for every <a href> in a static HTML page"""
+    
+    def __init__(self):
+        super().__init__()
+        self.links: List[Tuple[str, str]] = []
+        self._href = None
+        self._text = []
+        
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            self._href = dict(attrs).get('href')
+            self._text = []
+            
+    def handle_data(self, data):
+        if self._href is not None:
+            self._text.append(data)
+            
+    def handle_endtag(self, tag):
+        if tag == 'a' and self._href is not None:
+            self.links.append((self._href, ' '.join(''.join(self._text).split())))
+            self._href = None
 
 
 class BrisaScraper(BaseScraper):
     
-    def __init__(self, headless: bool = True, timeout: int = 15):
-        super().__init__(headless, timeout)
+    LINK_TEXTS = ["Click here to download the rates for 2025"]
+    FALLBACK_LINK_TEXTS = ["download", "2025"]
+    READY_CONDITIONS = [
+        ('network_idle', None),
+        ('js', "return Array.from(document.links).some(a => /download|2025/.test(a.textContent));")
+    ]
+    
+    def __init__(self, headless: bool = True, timeout: int = 15, pdf_dir: str = 'data/pdfs',
+                 static_discovery: bool = True, **driver_options):
+        super().__init__(headless, timeout, **driver_options)
         self.base_url = "https://www.brisaconcessao.pt/en/clients/tolls/toll-rates"
+        self.pdf_dir = pdf_dir
+        self.download_chunk_size = 64 * 1024
+        self.static_discovery = static_discovery
+        self.discovery_method = None
         
     def scrape(self) -> List[Dict]:
         try:
-            if not self.initialize_driver():
-                return []
-                
-            self.logger.info(f"Navigating to {self.base_url}")
-            if not self.navigate_to_page(self.base_url):
+            pdf_url = None
+            if self.static_discovery:
+                pdf_url = self._discover_pdf_url_static()
+                if pdf_url:
+                    self.discovery_method = 'static'
+                else:
+                    self.logger.info("Static discovery found no PDF link, falling back to browser")
+                    
+            if self.cancelled():
                 return []
                 
-            time.sleep(3)
-            
-            download_links = self.driver.find_elements(By.PARTIAL_LINK_TEXT, "Click here to download the rates for 2025")
-            
-            if not download_links:
-                download_links = self.driver.find_elements(By.PARTIAL_LINK_TEXT, "download")
-                download_links.extend(self.driver.find_elements(By.PARTIAL_LINK_TEXT, "2025"))
+            if not pdf_url:
+                pdf_url = self._discover_pdf_url_browser()
+                if pdf_url:
+                    self.discovery_method = 'browser'
                 
-            if download_links:
-                pdf_url = download_links[0].get_attribute('href')
-                self.logger.info(f"Found PDF URL: {pdf_url}")
+            if pdf_url and not self.cancelled():
+                self.logger.info(f"Found PDF URL via {self.discovery_method} discovery: {pdf_url}")
                 
                 pdf_path = self._download_pdf(pdf_url)
                 if pdf_path:
@@ -45,7 +84,8 @@ class BrisaScraper(BaseScraper):
                         'validity_period': '2025',
                         'source': f'Brisa PDF: {os.path.basename(pdf_path)}',
                         'scraped_at': datetime.now().isoformat(),
-                        'pdf_path': pdf_path
+                        'pdf_path': pdf_path,
+                        'discovery': self.discovery_method
                     }]
                     
             return []
@@ -56,20 +96,138 @@ class BrisaScraper(BaseScraper):
         finally:
             self.cleanup()
             
-    def _download_pdf(self, pdf_url: str) -> str:
-        try:
-            response = requests.get(pdf_url)
+    def _discover_pdf_url_static(self) -> Optional[str]:
+        """Find the rates PDF link in the static HTML, without starting a browser"""
+        with self.tracer.span('navigate.static', url=self.base_url) as span:
+            try:
+                response = requests.get(self.base_url, timeout=self.timeout,
+                                        headers={'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64)'})
+                response.raise_for_status()
+                span.set(bytes=len(response.text.encode('utf-8')))
+            except requests.exceptions.RequestException as e:
+                self.logger.warning(f"Static discovery request failed: {e}")
+                span.set(error=str(e))
+                return None
+            
+        collector = _AnchorCollector()
+        collector.feed(response.text)
+        
+        # Only the exact link text or a direct .pdf link; the loose FALLBACK_LINK_TEXTS would also
+        # match navigation and news links and hide a JS-rendered PDF link from the browser path
+        for link_text in self.LINK_TEXTS:
+            for href, text in collector.links:
+                if href and link_text in text:
+                    return urljoin(response.url or self.base_url, href)
+        for href, text in collector.links:
+            if href and urlparse(href).path.lower().endswith('.pdf'):
+                return urljoin(response.url or self.base_url, href)
+                    
+        return None
+        
+    def _discover_pdf_url_browser(self) -> Optional[str]:
+        if not self.initialize_driver():
+            return None
+            
+        self.logger.info(f"Navigating to {self.base_url}")
+        if self.cancelled() or not self.navigate_to_page(self.base_url):
+            return None
+            
+        self.wait_until_ready()
+        if self.cancelled():
+            return None
+        
+        download_links = []
+        for link_text in self.LINK_TEXTS:
+            download_links.extend(self.driver.find_elements(By.PARTIAL_LINK_TEXT, link_text))
+        
+        if not download_links:
+            for link_text in self.FALLBACK_LINK_TEXTS:
+                download_links.extend(self.driver.find_elements(By.PARTIAL_LINK_TEXT, link_text))
+                
+        if download_links:
+            return download_links[0].get_attribute('href')
+            
+        return None
             
-            pdf_dir = 'data/pdfs'
-            os.makedirs(pdf_dir, exist_ok=True)
+    def _download_pdf(self, pdf_url: str) -> str:
+        with self.tracer.span('pdf.download', url=pdf_url) as span:
+            pdf_path = self._fetch_pdf(pdf_url, span)
+            if pdf_path is None:
+                span.set(error="download failed")
+            return pdf_path
             
-            pdf_filename = f"brisa_toll_rates_2025_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-            pdf_path = os.path.join(pdf_dir, pdf_filename)
+    def _fetch_pdf(self, pdf_url: str, span) -> str:
+        try:
+            os.makedirs(self.pdf_dir, exist_ok=True)
+            manifest = DownloadManifest(os.path.join(self.pdf_dir, 'download_manifest.json'))
+            cached = manifest.get(pdf_url)
             
-            with open(pdf_path, 'wb') as f:
-                f.write(response.content)
+            response = requests.get(pdf_url, headers=manifest.conditional_headers(pdf_url),
+                                    stream=True, timeout=self.timeout)
+            if response.status_code == 304 and not manifest.get(pdf_url):
+                # Nothing to reuse (the cached file is gone): ask for the full body instead
+                response.close()
+                self.logger.warning("PDF not modified but no cached copy exists, downloading it unconditionally")
+                response = requests.get(pdf_url, stream=True, timeout=self.timeout)
+            try:
+                if response.status_code == 304:
+                    cached = manifest.get(pdf_url)
+                    if not cached:
+                        raise requests.exceptions.HTTPError("304 Not Modified without a cached PDF to reuse")
+                    manifest.touch(pdf_url)
+                    span.set(bytes=0, reused='not_modified')
+                    self.logger.info(f"PDF not modified, reusing: {cached['path']}")
+                    return cached['path']
+                    
+                response.raise_for_status()
+                
+                pdf_filename = f"brisa_toll_rates_2025_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+                pdf_path = os.path.join(self.pdf_dir, pdf_filename)
+                tmp_path = f"{pdf_path}.part"
+                digest = hashlib.sha256()
+                size = 0
+                
+                try:
+                    with open(tmp_path, 'wb') as f:
+                        for chunk in response.iter_content(chunk_size=self.download_chunk_size):
+                            if self.cancelled():
+                                break
+                            if chunk:
+                                f.write(chunk)
+                                digest.update(chunk)
+                                size += len(chunk)
+                except BaseException:
+                    # A failed read or write must not leave a partial file behind
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    raise
+            finally:
+                response.close()
+                
+            if self.cancelled():
+                os.remove(tmp_path)
+                span.set(cancelled=True)
+                return None
+                
+            sha256 = digest.hexdigest()
+            if cached and cached.get('sha256') == sha256:
+                # Server ignored the validators but the content is identical
+                os.remove(tmp_path)
+                pdf_path = cached['path']
+                span.set(reused='same_hash')
+                self.logger.info(f"PDF unchanged (same hash), reusing: {pdf_path}")
+            else:
+                os.replace(tmp_path, pdf_path)
+                self.logger.info(f"PDF downloaded: {pdf_path} ({size} bytes)")
+            span.set(bytes=size)
                 
-            self.logger.info(f"PDF downloaded: {pdf_path}")
+            manifest.record(
+                pdf_url, pdf_path,
+                etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified'),
+                size=size,
+                sha256=sha256
+            )
             return pdf_path
             
         except Exception as e:
@@ -0,0 +1,64 @@
+import json
+import os
+from datetime import datetime
+from typing import Dict, Optional
+
+
+class DownloadManifest:
+    """Per-URL record of the last download (ETag, Last-Modified, size, hash, local path)"""
+
+    def __init__(self, manifest_path: str = "data/pdfs/download_manifest.json"):
+        self.manifest_path = manifest_path
+        self.entries = self._load()
+
+    def _load(self) -> Dict:
+        if not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Return the entry for a URL if its local file still exists"""
+        entry = self.entries.get(url)
+        if entry and os.path.exists(entry.get('path', '')):
+            return entry
+        return None
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        entry = self.get(url)
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def record(self, url: str, path: str, etag: str = None, last_modified: str = None,
+               size: int = 0, sha256: str = None) -> Dict:
+        entry = {
+            'path': path,
+            'etag': etag,
+            'last_modified': last_modified,
+            'size': size,
+            'sha256': sha256,
+            'checked_at': datetime.now().isoformat()
+        }
+        self.entries[url] = entry
+        self._save()
+        return entry
+
+    def touch(self, url: str):
+        """Mark an entry as revalidated without changing its content fields"""
+        self.entries[url]['checked_at'] = datetime.now().isoformat()
+        self._save()
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.manifest_path) or '.', exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
@@ -0,0 +1,67 @@
+import json
+import logging
+import os
+import subprocess
+from datetime import datetime
+from typing import Dict, Optional
+
+
+class DriverDiscoveryCache:
+    """Remembers the resolved browser binary and driver so startup skips probing.
+
+    Entries are revalidated with a stat of both files; a changed size or mtime
+    (e.g. after a browser upgrade) turns the entry into a miss.
+    """
+
+    def __init__(self, cache_path: str = "data/driver_cache.json"):
+        self.cache_path = cache_path
+        self.logger = logging.getLogger(__name__)
+
+    def load(self) -> Optional[Dict]:
+        if not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        for key in ('binary', 'driver_path'):
+            if self._signature(entry.get(key)) != entry.get(f"{key}_signature"):
+                self.logger.info(f"Driver cache stale ({key} changed), probing again")
+                return None
+
+        return entry
+
+    def store(self, entry: Dict) -> Dict:
+        entry = dict(entry)
+        entry['binary_signature'] = self._signature(entry.get('binary'))
+        entry['driver_path_signature'] = self._signature(entry.get('driver_path'))
+        entry['driver_version'] = self._driver_version(entry.get('driver_path'))
+        entry['resolved_at'] = datetime.now().isoformat()
+
+        os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, indent=2)
+        os.replace(tmp_path, self.cache_path)
+        return entry
+
+    def invalidate(self):
+        if os.path.exists(self.cache_path):
+            os.remove(self.cache_path)
+
+    @staticmethod
+    def _signature(path: str) -> Optional[list]:
+        try:
+            stat = os.stat(path)
+        except (OSError, TypeError):
+            return None
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def _driver_version(self, driver_path: str) -> Optional[str]:
+        try:
+            result = subprocess.run([driver_path, '--version'], capture_output=True, text=True, timeout=5)
+            return result.stdout.strip() or None
+        except (OSError, subprocess.SubprocessError, TypeError):
+            return None
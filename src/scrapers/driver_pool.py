@@ -0,0 +1,99 @@
+import logging
+import threading
+from typing import Callable, List
+
+
+class DriverPool:
+    """Keeps launched browsers alive across scrapers in one run.
+
+    acquire() hands out an idle driver (or launches one with the caller's factory),
+    release() wipes cookies/storage and keeps it for the next scraper. A browser is
+    quit after max_uses sessions, or as soon as it stops responding. Once the pool is
+    closed, a driver released by a straggling scraper is quit instead of kept.
+    """
+
+    def __init__(self, max_uses: int = 10, max_idle: int = 2):
+        self.max_uses = max_uses
+        self.max_idle = max_idle
+        self.logger = logging.getLogger(__name__)
+        self._idle: List = []
+        self._uses = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def acquire(self, factory: Callable):
+        while True:
+            with self._lock:
+                driver = self._idle.pop() if self._idle else None
+            if driver is None:
+                break
+            if self._is_alive(driver):
+                self.logger.info(f"Reusing pooled WebDriver (session {self._uses[id(driver)] + 1})")
+                return driver
+            self._discard(driver, "not responding")
+
+        driver = factory()
+        with self._lock:
+            self._uses[id(driver)] = 0
+        self.logger.info("Launched new pooled WebDriver")
+        return driver
+
+    def release(self, driver):
+        with self._lock:
+            self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+            uses = self._uses[id(driver)]
+            closed = self._closed
+
+        if closed:
+            self._discard(driver, "pool closed")
+            return
+
+        if uses >= self.max_uses:
+            self._discard(driver, f"recycled after {uses} uses")
+            return
+
+        try:
+            self._reset(driver)
+        except Exception as e:
+            self._discard(driver, f"reset failed: {e}")
+            return
+
+        with self._lock:
+            if not self._closed and len(self._idle) < self.max_idle:
+                self._idle.append(driver)
+                return
+        self._discard(driver, "pool full")
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self._discard(driver, "pool closed")
+
+    def _reset(self, driver):
+        driver.delete_all_cookies()
+        driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+        driver.get("about:blank")
+
+    def _is_alive(self, driver) -> bool:
+        try:
+            driver.window_handles
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, driver, reason: str):
+        with self._lock:
+            self._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception as e:
+            self.logger.warning(f"Error quitting pooled WebDriver: {e}")
+        self.logger.info(f"Pooled WebDriver closed ({reason})")
@@ -0,0 +1,129 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+from typing import Callable, Dict, List
+
+from ..utils.instrumentation import Tracer
+
+# A source receives a cancellation event it should check between slow steps
+Source = Callable[[threading.Event], List[Dict]]
+
+
+class ScraperOrchestrator:
+    """Run registered toll sources concurrently, each with its own deadline.
+
+    Sources are registered in priority order. Policies:
+      - 'fallback': run sources one at a time and stop at the first non-empty result
+      - 'primary':  run all at once, return the highest-priority non-empty result
+      - 'merge':    run all at once, combine results; higher priority wins on duplicate rows
+
+    Each source runs on its own daemon thread, so a stuck source can be abandoned at its
+    deadline without blocking interpreter exit. A cancelled source is told so through its
+    event, and whatever it returns afterwards is ignored.
+    """
+
+    POLICIES = ('fallback', 'primary', 'merge')
+    MERGE_KEY = ('route_segment', 'vehicle_type', 'validity_period')
+
+    def __init__(self, policy: str = 'fallback', tracer: Tracer = None):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown source policy '{policy}', expected one of {self.POLICIES}")
+        self.policy = policy
+        self.tracer = tracer or Tracer(enabled=False)
+        self.logger = logging.getLogger(__name__)
+        self.report: Dict[str, Dict] = {}
+        self._sources = []
+
+    def register(self, name: str, source: Source, timeout: float = 300):
+        self._sources.append({'name': name, 'source': source, 'timeout': timeout})
+
+    def run(self) -> List[Dict]:
+        self.report = {source['name']: {'status': 'skipped', 'records': 0, 'seconds': 0.0}
+                       for source in self._sources}
+
+        if self.policy == 'fallback':
+            for source in self._sources:
+                tariffs = self._wait(source, self._start(source))
+                if tariffs:
+                    return tariffs
+            return []
+
+        running = [(source, self._start(source)) for source in self._sources]
+
+        if self.policy == 'primary':
+            for index, (source, future) in enumerate(running):
+                tariffs = self._wait(source, future)
+                if tariffs:
+                    for other, other_future in running[index + 1:]:
+                        if other_future.done():
+                            self._wait(other, other_future)
+                            self.report[other['name']]['status'] = 'unused'
+                        else:
+                            self._cancel(other)
+                    return tariffs
+            return []
+
+        merged = {}
+        for source, future in running:
+            for tariff in self._wait(source, future):
+                merged.setdefault(tuple(tariff.get(key) for key in self.MERGE_KEY), tariff)
+        return list(merged.values())
+
+    def _start(self, source: Dict) -> Future:
+        future = Future()
+        future.set_running_or_notify_cancel()
+        source['cancel_event'] = threading.Event()
+        source['started_at'] = time.monotonic()
+        source['finished_at'] = None
+        self.report[source['name']]['status'] = 'running'
+
+        def target():
+            try:
+                with self.tracer.span(f"source.{source['name']}") as span:
+                    result = source['source'](source['cancel_event'])
+                    span.set(rows=len(result or []))
+            except BaseException as e:
+                source['finished_at'] = time.monotonic()
+                future.set_exception(e)
+            else:
+                source['finished_at'] = time.monotonic()
+                future.set_result(result)
+
+        self.logger.info(f"Starting source {source['name']} (timeout {source['timeout']}s)")
+        threading.Thread(target=self.tracer.wrap(target), name=f"source-{source['name']}", daemon=True).start()
+        return future
+
+    def _wait(self, source: Dict, future: Future) -> List[Dict]:
+        entry = self.report[source['name']]
+        remaining = source['started_at'] + source['timeout'] - time.monotonic()
+
+        try:
+            tariffs = future.result(timeout=max(0.0, remaining)) or []
+            if source['cancel_event'].is_set():
+                # Rows returned after cancellation may be partial; the status is already recorded
+                self.logger.info(f"Ignoring {len(tariffs)} records from cancelled source {source['name']}")
+                return []
+            entry['status'] = 'ok' if tariffs else 'empty'
+            entry['records'] = len(tariffs)
+        except TimeoutError:
+            self._cancel(source, 'timeout')
+            tariffs = []
+        except Exception as e:
+            entry['status'] = 'error'
+            entry['error'] = str(e)
+            tariffs = []
+
+        if entry['status'] != 'timeout':
+            entry['seconds'] = round(source['finished_at'] - source['started_at'], 3)
+        self.logger.info(f"Source {source['name']}: {entry['status']}, "
+                         f"{entry['records']} records in {entry['seconds']:.2f}s")
+        return tariffs
+
+    def _cancel(self, source: Dict, status: str = 'cancelled'):
+        source['cancel_event'].set()
+        entry = self.report[source['name']]
+        entry['status'] = status
+        entry['seconds'] = round(time.monotonic() - source['started_at'], 3)
+        if status == 'timeout':
+            self.logger.warning(f"Source {source['name']} exceeded its {source['timeout']}s deadline")
@@ -1,55 +1,94 @@
-import time
 from datetime import datetime
+from html.parser import HTMLParser
 from typing import Dict, List
 
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.common.by import By
 
+from ..utils.prices import normalize_prices
 from .base_scraper import BaseScraper
 
 
+# Returns every matching table as rows of cell texts in one WebDriver round trip
+EXTRACT_TABLES_JS = """
+return Array.from(document.querySelectorAll(arguments[0])).map(function (table) {
+    return Array.from(table.querySelectorAll('tr')).map(function (row) {
+        return Array.from(row.querySelectorAll('td')).map(function (cell) {
+            return cell.innerText;
+        });
+    });
+});
+"""
+
+
+class _TableCollector(HTMLParser):
+    """Collect <table> elements from static HTML as rows of <td> texts"""
+    
+    def __init__(self):
+        super().__init__()
+        self.tables: List[List[List[str]]] = []
+        self._stack = []
+        self._cell = None
+        
+    def handle_starttag(self, tag, attrs):
+        if tag in ('table', 'tr', 'td', 'th'):
+            self._close_cell()
+        if tag == 'table':
+            self._stack.append([])
+        elif tag == 'tr' and self._stack:
+            self._stack[-1].append([])
+        elif tag == 'td' and self._stack and self._stack[-1]:
+            self._cell = []
+            
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+            
+    def handle_endtag(self, tag):
+        if tag in ('td', 'tr', 'table'):
+            self._close_cell()
+        if tag == 'table' and self._stack:
+            self.tables.append(self._stack.pop())
+            
+    def _close_cell(self):
+        # Tolerates unclosed <td> elements, which browsers accept
+        if self._cell is not None:
+            self._stack[-1][-1].append(' '.join(''.join(self._cell).split()))
+            self._cell = None
+
+
 class PortugalTollsScraper(BaseScraper):
     
-    def __init__(self, headless: bool = True, timeout: int = 15):
-        super().__init__(headless, timeout)
+    TABLE_SELECTOR = "table, .tariff-table, .price-table"
+    READY_CONDITIONS = [
+        ('selector', TABLE_SELECTOR),
+        ('stable_count', 'table tr')
+    ]
+    
+    def __init__(self, headless: bool = True, timeout: int = 15, **driver_options):
+        super().__init__(headless, timeout, **driver_options)
         self.base_url = "https://www.portugaltolls.com/en/web/portal-de-portagens/tarifarios"
         
     def scrape(self) -> List[Dict]:
         tariffs = []
         
         try:
-            if not self.initialize_driver():
+            if self.cancelled() or not self.initialize_driver():
                 return []
                 
-            if not self.navigate_to_page(self.base_url):
+            if self.cancelled() or not self.navigate_to_page(self.base_url):
                 return []
                 
-            time.sleep(3)
-            
-            tables = self.driver.find_elements(By.CSS_SELECTOR, "table, .tariff-table, .price-table")
+            self.wait_until_ready()
+            if self.cancelled():
+                return []
             
-            for table in tables:
-                try:
-                    rows = table.find_elements(By.TAG_NAME, "tr")
-                    
-                    for row in rows[1:]:
-                        cells = row.find_elements(By.TAG_NAME, "td")
-                        
-                        if len(cells) >= 3:
-                            tariff = {
-                                'route_segment': cells[0].text.strip(),
-                                'vehicle_type': cells[1].text.strip() if len(cells) > 1 else 'Standard',
-                                'price': self._clean_price(cells[-2].text.strip()),
-                                'validity_period': self._extract_validity(cells[-1].text.strip()),
-                                'source': 'Portugal Tolls',
-                                'scraped_at': datetime.now().isoformat()
-                            }
-                            
-                            if tariff['route_segment'] and tariff['price']:
-                                tariffs.append(tariff)
-                                
-                except Exception as e:
-                    self.logger.warning(f"Error processing table row: {e}")
-                    continue
+            with self.tracer.span('tables.extract') as span:
+                tables = self._extract_tables()
+                tariffs = self._tables_to_tariffs(tables)
+                span.set(tables=len(tables), rows=len(tariffs))
+            if not tariffs:
+                self.logger.warning(f"No tariff rows found in {len(tables)} tables on {self.base_url}")
                     
         except Exception as e:
             self.logger.error(f"Error scraping Portugal Tolls: {e}")
@@ -58,18 +97,57 @@ class PortugalTollsScraper(BaseScraper):
             
         return tariffs
         
-    def _clean_price(self, price_text: str) -> str:
-        if not price_text:
-            return ""
+    def _extract_tables(self) -> List[List[List[str]]]:
+        """Fetch all tariff tables at once instead of one WebDriver call per table/row/cell"""
+        try:
+            return self.driver.execute_script(EXTRACT_TABLES_JS, self.TABLE_SELECTOR) or []
+        except WebDriverException as e:
+            self.logger.warning(f"Script extraction failed, parsing page source instead: {e}")
             
-        price = price_text.strip().replace('€', '').replace('EUR', '').strip()
+        tables = self._parse_tables_html(self.driver.page_source)
+        if not any(len(cells) >= 3 for table in tables for cells in table[1:]):
+            # The static parser only reads <table> markup; .tariff-table/.price-table containers need the browser
+            self.logger.warning("No tariff tables in the page source, reading the table elements through the browser")
+            return self._extract_tables_elements()
+        return tables
+        
+    def _extract_tables_elements(self) -> List[List[List[str]]]:
+        """Per-element WebDriver extraction: slow, but matches any TABLE_SELECTOR container"""
+        return [[[cell.text for cell in row.find_elements(By.TAG_NAME, 'td')]
+                 for row in table.find_elements(By.TAG_NAME, 'tr')]
+                for table in self.driver.find_elements(By.CSS_SELECTOR, self.TABLE_SELECTOR)]
+            
+    def _parse_tables_html(self, html: str) -> List[List[List[str]]]:
+        collector = _TableCollector()
+        collector.feed(html)
+        return collector.tables
+        
+    def _tables_to_tariffs(self, tables: List[List[List[str]]]) -> List[Dict]:
+        tariffs = []
+        scraped_at = datetime.now().isoformat()
+        
+        for table in tables:
+            for cells in table[1:]:
+                if len(cells) < 3:
+                    continue
+                    
+                tariffs.append({
+                    'route_segment': (cells[0] or '').strip(),
+                    'vehicle_type': (cells[1] or '').strip(),
+                    'price': cells[-2] or '',
+                    'validity_period': self._extract_validity((cells[-1] or '').strip()),
+                    'source': 'Portugal Tolls',
+                    'scraped_at': scraped_at
+                })
         
-        import re
-        match = re.search(r'(\d+[.,]\d+|\d+)', price)
-        if match:
-            return match.group(1).replace(',', '.')
+        # Price cells of every table are normalised in one batch; cells may annotate the amount ("from 2,50 €")
+        for tariff, price in zip(tariffs, normalize_prices((tariff['price'] for tariff in tariffs), search=True)):
+            tariff['price'] = price or ""
+            
+        return [tariff for tariff in tariffs if tariff['route_segment'] and tariff['price']]
         
-        return price
+    def _clean_price(self, price_text: str) -> str:
+        return normalize_prices([price_text], search=True)[0] or ""
         
     def _extract_validity(self, validity_text: str) -> str:
         if not validity_text:
@@ -1,23 +1,70 @@
 #!/usr/bin/env python3
 
 import requests
+import gzip
 import json
 import os
-from datetime import datetime
-from typing import Dict, List, Any
+import random
+import time
+import uuid
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterable, List, Any, Optional
 import logging
 
+from requests.adapters import HTTPAdapter
+
+from .delta_sync import row_key
+from .instrumentation import Tracer
+from .outbox import Outbox
+from .prices import parse_price, parse_prices
+from .tariff_table import TariffTable
+
 class TollAPIClient:
-    def __init__(self):
+    # Statuses worth retrying; 429/503 may carry a Retry-After header
+    RETRY_STATUSES = (429, 502, 503, 504)
+    # Chunk size for send_toll_stream when batch_size is not set
+    STREAM_BATCH_SIZE = 1000
+    
+    def __init__(self, batch_size: int = 0, max_workers: int = 4, compress: bool = False, timeout: int = 60,
+                 max_retries: int = 3, backoff_base: float = 1.0, backoff_max: float = 60.0,
+                 outbox: Outbox = None, tracer: Tracer = None):
         self.api_url = os.getenv('LARAVEL_API_URL')
         self.api_token = os.getenv('LARAVEL_API_TOKEN')
         self.logger = logging.getLogger(__name__)
         
         if not self.api_url or not self.api_token:
             raise ValueError("LARAVEL_API_URL and LARAVEL_API_TOKEN must be set in environment")
+        
+        self.batch_size = batch_size
+        self.max_workers = max(1, max_workers)
+        self.compress = compress
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.outbox = outbox
+        self.tracer = tracer or Tracer(enabled=False)
+        
+        # Keep-alive connection pool sized for the upload concurrency
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'Authorization': f'Bearer {self.api_token}',
+            'Content-Type': 'application/json',
+            'Accept': 'application/json'
+        })
     
     def send_toll_data(self, toll_data: List[Dict]) -> Dict[str, Any]:
-        """Send toll data to Laravel API via PUT request"""
+        """Send toll data to Laravel API via PUT request, in batches when batch_size is set"""
+        
+        if self.batch_size and len(toll_data) > self.batch_size:
+            return self.send_toll_data_batched(toll_data)
         
         # Prepare data for API
         api_data = {
@@ -26,57 +73,311 @@ class TollAPIClient:
             'total_records': len(toll_data)
         }
         
-        headers = {
-            'Authorization': f'Bearer {self.api_token}',
-            'Content-Type': 'application/json',
-            'Accept': 'application/json'
+        self.logger.info(f"Sending {len(toll_data)} toll records to {self.api_url}")
+        return self._full_send_done(self._put(api_data, len(toll_data)), toll_data)
+    
+    def send_toll_delta(self, upserts: List[Dict], deletes: List[Dict]) -> Dict[str, Any]:
+        """Send only changed rows: inserted/updated rows plus the keys of deleted rows"""
+        
+        if self.batch_size and len(upserts) + len(deletes) > self.batch_size:
+            return self.send_toll_delta_batched(upserts, deletes)
+        
+        api_data = {
+            'tolls': upserts,
+            'deleted': deletes,
+            'sync_mode': 'delta',
+            'scraped_at': datetime.now().isoformat(),
+            'total_records': len(upserts)
         }
         
-        try:
-            self.logger.info(f"Sending {len(toll_data)} toll records to {self.api_url}")
-            
-            response = requests.put(
-                f"{self.api_url}/tolls/update",
-                json=api_data,
-                headers=headers,
-                timeout=60
-            )
-            
-            response.raise_for_status()
-            
-            result = {
-                'success': True,
-                'status_code': response.status_code,
-                'response': response.json(),
-                'records_sent': len(toll_data),
-                'sent_at': datetime.now().isoformat()
-            }
+        self.logger.info(f"Sending delta to {self.api_url}: {len(upserts)} upserts, {len(deletes)} deletes")
+        return self._put(api_data, len(upserts) + len(deletes))
+    
+    def send_toll_data_batched(self, toll_data: List[Dict]) -> Dict[str, Any]:
+        """Send fixed-size chunks concurrently and aggregate them into one result"""
+        
+        scraped_at = datetime.now().isoformat()
+        chunks = [toll_data[i:i + self.batch_size] for i in range(0, len(toll_data), self.batch_size)]
+        payloads = [{
+            'tolls': chunk,
+            'scraped_at': scraped_at,
+            'total_records': len(toll_data),
+            'batch': {'index': index, 'count': len(chunks), 'size': len(chunk)}
+        } for index, chunk in enumerate(chunks)]
+        
+        self.logger.info(f"Sending {len(toll_data)} toll records to {self.api_url} "
+                         f"in {len(chunks)} batches of up to {self.batch_size}")
+        
+        return self._full_send_done(self._put_batches(payloads), toll_data)
+    
+    def send_toll_delta_batched(self, upserts: List[Dict], deletes: List[Dict]) -> Dict[str, Any]:
+        """Send a delta as fixed-size chunks of upserts, then of delete keys, concurrently.
+        
+        Upserted and deleted keys never overlap, so the batches may be applied in any order.
+        """
+        
+        scraped_at = datetime.now().isoformat()
+        chunks = [('tolls', upserts[i:i + self.batch_size]) for i in range(0, len(upserts), self.batch_size)]
+        chunks += [('deleted', deletes[i:i + self.batch_size]) for i in range(0, len(deletes), self.batch_size)]
+        payloads = [{
+            'tolls': chunk if field == 'tolls' else [],
+            'deleted': chunk if field == 'deleted' else [],
+            'sync_mode': 'delta',
+            'scraped_at': scraped_at,
+            'total_records': len(upserts),
+            'batch': {'index': index, 'count': len(chunks), 'size': len(chunk)}
+        } for index, (field, chunk) in enumerate(chunks)]
+        
+        self.logger.info(f"Sending delta to {self.api_url}: {len(upserts)} upserts, {len(deletes)} deletes "
+                         f"in {len(chunks)} batches of up to {self.batch_size}")
+        return self._put_batches(payloads)
+    
+    def _put_batches(self, payloads: List[Dict]) -> Dict[str, Any]:
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            put = self.tracer.wrap(lambda payload: self._put(payload, payload['batch']['size']))
+            results = list(executor.map(put, payloads))
+        return self._aggregate_results(results)
+    
+    def send_toll_stream(self, rows: Iterable[Dict], batch_size: int = None) -> Dict[str, Any]:
+        """Send rows from any iterable in chunks without materialising them all.
+        
+        Chunks are read one ahead so the final payload is flagged 'last' and carries
+        total_records. Only max_workers chunks in flight plus the read-ahead are in memory.
+        """
+        batch_size = batch_size or self.batch_size or self.STREAM_BATCH_SIZE
+        scraped_at = datetime.now().isoformat()
+        iterator = iter(rows)
+        results = []
+        in_flight = deque()
+        total = 0
+        sent_keys = set()
+        
+        def next_chunk():
+            chunk = list(itertools.islice(iterator, batch_size))
+            sent_keys.update(map(row_key, chunk))
+            return chunk
+        
+        self.logger.info(f"Streaming toll records to {self.api_url} in batches of {batch_size}")
+        
+        put = self.tracer.wrap(self._put)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            chunk, index = next_chunk(), 0
+            while chunk:
+                following = next_chunk()
+                total += len(chunk)
+                last = not following
+                payload = {
+                    'tolls': chunk,
+                    'scraped_at': scraped_at,
+                    'total_records': total if last else None,
+                    'batch': {'index': index, 'count': index + 1 if last else None, 'size': len(chunk), 'last': last}
+                }
+                if len(in_flight) >= self.max_workers:
+                    results.append(in_flight.popleft().result())
+                in_flight.append(executor.submit(put, payload, len(chunk)))
+                chunk, index = following, index + 1
             
-            self.logger.info(f"Successfully sent toll data. Response: {response.status_code}")
+            results.extend(future.result() for future in in_flight)
+        
+        if not results:
+            return {'success': True, 'status_code': None, 'response': 'No toll records to send',
+                    'records_sent': 0, 'sent_at': datetime.now().isoformat()}
+        return self._full_send_done(self._aggregate_results(results), keys=sent_keys)
+    
+    def _aggregate_results(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        failed = [result for result in results if not result['success']]
+        
+        aggregated = {
+            'success': not failed,
+            'status_code': failed[0]['status_code'] if failed else results[-1]['status_code'],
+            'response': [result['response'] for result in results],
+            'records_sent': sum(result['records_sent'] for result in results),
+            'sent_at': datetime.now().isoformat(),
+            'batches': [{
+                'index': index,
+                'success': result['success'],
+                'status_code': result['status_code'],
+                'records_sent': result['records_sent']
+            } for index, result in enumerate(results)]
+        }
+        
+        if failed:
+            aggregated['error'] = f"{len(failed)} of {len(results)} batches failed: {failed[0]['error']}"
+            self.logger.error(f"Batched send incomplete: {aggregated['error']}")
+        
+        return aggregated
+    
+    def _full_send_done(self, result: Dict[str, Any], toll_data: List[Dict] = (), keys: set = None) -> Dict[str, Any]:
+        """After a full upload the API accepted, drop the older payloads still in the outbox.
+        
+        Replaying them next run would overwrite the tariffs just sent with stale ones. The
+        deletes of an older delta payload are not part of a full upload, so those for rows
+        the upload did not contain are queued again on their own.
+        """
+        if not result['success'] or not self.outbox:
             return result
-            
-        except requests.exceptions.RequestException as e:
-            error_result = {
-                'success': False,
-                'error': str(e),
-                'status_code': getattr(e.response, 'status_code', None) if hasattr(e, 'response') else None,
-                'response': getattr(e.response, 'text', None) if hasattr(e, 'response') else None,
-                'records_sent': 0,
-                'sent_at': datetime.now().isoformat()
-            }
-            
-            self.logger.error(f"Failed to send toll data: {e}")
-            return error_result
+        
+        stale = self.outbox.pending()
+        if not stale:
+            return result
+        
+        keys = keys if keys is not None else set(map(row_key, toll_data))
+        deletes = [key for entry in stale for key in entry['payload'].get('deleted', []) if row_key(key) not in keys]
+        if deletes:
+            self.outbox.enqueue({'tolls': [], 'deleted': deletes, 'sync_mode': 'delta',
+                                 'scraped_at': datetime.now().isoformat(), 'total_records': 0})
+        self.outbox.supersede([entry['id'] for entry in stale])
+        self.outbox.compact()
+        self.logger.info(f"Dropped {len(stale)} outbox payloads superseded by this upload"
+                         + (f", kept {len(deletes)} of their deletes" if deletes else ""))
+        return result
+    
+    def replay_outbox(self) -> Dict[str, int]:
+        """Resend payloads left unacknowledged by earlier runs, oldest first"""
+        if not self.outbox:
+            return {}
+        
+        pending = self.outbox.pending()
+        summary = {'pending': len(pending), 'replayed': 0, 'remaining': 0}
+        if pending:
+            self.logger.info(f"Replaying {len(pending)} unsent payloads from the outbox")
+        
+        for entry in pending:
+            result = self._send(entry['payload'], len(entry['payload'].get('tolls', [])), entry['id'])
+            if not result['success']:
+                # Keep ordering: later payloads must not overtake an older one
+                break
+            self.outbox.ack(entry['id'])
+            summary['replayed'] += 1
+        
+        summary['remaining'] = summary['pending'] - summary['replayed']
+        self.outbox.compact()
+        return summary
+    
+    def _put(self, api_data: Dict[str, Any], record_count: int) -> Dict[str, Any]:
+        """Journal the payload (when an outbox is configured), send it and ack on success"""
+        entry_id = self.outbox.enqueue(api_data) if self.outbox else uuid.uuid4().hex
+        
+        result = self._send(api_data, record_count, entry_id)
+        if result['success'] and self.outbox:
+            self.outbox.ack(entry_id)
+        elif self.outbox:
+            self.logger.warning(f"Payload kept in outbox for the next run: {entry_id}")
+        return result
+    
+    def _send(self, api_data: Dict[str, Any], record_count: int, idempotency_key: str) -> Dict[str, Any]:
+        with self.tracer.span('api.request', rows=record_count) as span:
+            result = self._send_with_retries(api_data, record_count, idempotency_key, span)
+            span.set(status_code=result['status_code'])
+            if not result['success']:
+                span.set(error=result['error'])
+            return result
+    
+    def _send_with_retries(self, api_data: Dict[str, Any], record_count: int, idempotency_key: str,
+                           span) -> Dict[str, Any]:
+        body = json.dumps(api_data, ensure_ascii=False).encode('utf-8')
+        headers = {'Idempotency-Key': idempotency_key}
+        if self.compress:
+            body = gzip.compress(body)
+            headers['Content-Encoding'] = 'gzip'
+        span.set(bytes=len(body))
+        
+        attempt = 0
+        while True:
+            try:
+                response = self.session.put(
+                    f"{self.api_url}/tolls/update",
+                    data=body,
+                    headers=headers,
+                    timeout=self.timeout
+                )
+                
+                if response.status_code in self.RETRY_STATUSES and attempt < self.max_retries:
+                    delay = self._retry_delay(attempt, response)
+                    self.logger.warning(f"API returned {response.status_code}, retrying in {delay:.1f}s "
+                                        f"(attempt {attempt + 1}/{self.max_retries})")
+                    time.sleep(delay)
+                    attempt += 1
+                    span.set(retries=attempt)
+                    continue
+                
+                response.raise_for_status()
+                
+                result = {
+                    'success': True,
+                    'status_code': response.status_code,
+                    'response': response.json(),
+                    'records_sent': record_count,
+                    'sent_at': datetime.now().isoformat()
+                }
+                
+                self.logger.info(f"Successfully sent toll data. Response: {response.status_code}")
+                return result
+                
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt < self.max_retries:
+                    delay = self._retry_delay(attempt)
+                    self.logger.warning(f"API request failed ({e}), retrying in {delay:.1f}s "
+                                        f"(attempt {attempt + 1}/{self.max_retries})")
+                    time.sleep(delay)
+                    attempt += 1
+                    span.set(retries=attempt)
+                    continue
+                return self._error_result(e)
+                
+            except requests.exceptions.RequestException as e:
+                return self._error_result(e)
+    
+    def _retry_delay(self, attempt: int, response: requests.Response = None) -> float:
+        """Retry-After when the server sends one, else exponential backoff with full jitter"""
+        retry_after = self._parse_retry_after(response.headers.get('Retry-After')) if response is not None else None
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+    
+    @staticmethod
+    def _parse_retry_after(value: str) -> Optional[float]:
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+    
+    def _error_result(self, e: requests.exceptions.RequestException) -> Dict[str, Any]:
+        error_result = {
+            'success': False,
+            'error': str(e),
+            'status_code': getattr(e.response, 'status_code', None) if hasattr(e, 'response') else None,
+            'response': getattr(e.response, 'text', None) if hasattr(e, 'response') else None,
+            'records_sent': 0,
+            'sent_at': datetime.now().isoformat()
+        }
+        
+        self.logger.error(f"Failed to send toll data: {e}")
+        return error_result
     
     def format_toll_data(self, raw_data: List[Dict]) -> List[Dict]:
         """Format toll data for API"""
+        if isinstance(raw_data, TariffTable):
+            # Already normalised: every field is present and prices are floats
+            return raw_data.to_dicts()
+        
         formatted_data = []
+        raw_data = list(raw_data)
+        prices, valid = parse_prices([toll.get('price') for toll in raw_data])
         
-        for toll in raw_data:
+        for toll, price, is_price in zip(raw_data, prices.tolist(), valid.tolist()):
+            if not is_price:
+                continue
             formatted_toll = {
                 'route_segment': toll.get('route_segment', ''),
                 'vehicle_type': toll.get('vehicle_type', 'Class 1'),
-                'price': self._parse_price(toll.get('price', '0')),
+                'price': price,
                 'currency': toll.get('currency', 'EUR'),
                 'validity_period': toll.get('validity_period', '2025'),
                 'source': toll.get('source', 'Brisa PDF'),
@@ -84,15 +385,13 @@ class TollAPIClient:
             }
             formatted_data.append(formatted_toll)
         
+        if len(formatted_data) < len(raw_data):
+            # Sending them as 0.0 would publish free tolls
+            self.logger.warning(f"Dropped {len(raw_data) - len(formatted_data)} toll records "
+                                f"whose price could not be parsed")
         return formatted_data
     
     def _parse_price(self, price_str: str) -> float:
         """Parse price string to float"""
-        if isinstance(price_str, (int, float)):
-            return float(price_str)
-        
-        price_clean = str(price_str).replace('€', '').replace('EUR', '').replace(',', '.').strip()
-        try:
-            return float(price_clean)
-        except ValueError:
-            return 0.0
\ No newline at end of file
+        price = parse_price(price_str)
+        return price if price is not None else 0.0
\ No newline at end of file
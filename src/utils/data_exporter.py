@@ -1,57 +1,163 @@
+import bz2
 import csv
+import gzip
 import json
+import lzma
 import os
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, Iterable, List
+
+from .export_manifest import ExportManifest
+from .instrumentation import Tracer
+from .tariff_table import TariffTable
+
+# Fixed column order for streamed CSV exports
+TARIFF_FIELDS = ['route_segment', 'vehicle_type', 'price', 'currency', 'validity_period', 'source', 'scraped_at']
+
+# Standard-library codecs usable for streamed exports
+COMPRESSION = {
+    'gzip': ('.gz', gzip.open),
+    'bz2': ('.bz2', bz2.open),
+    'xz': ('.xz', lzma.open)
+}
 
 
 class DataExporter:
     
-    def __init__(self, output_dir: str = "data/exports"):
+    def __init__(self, output_dir: str = "data/exports", buffer_size: int = 1024 * 1024, tracer: Tracer = None):
         self.output_dir = output_dir
+        self.buffer_size = buffer_size
+        self.tracer = tracer or Tracer(enabled=False)
+        self.manifest = ExportManifest(output_dir)
         os.makedirs(output_dir, exist_ok=True)
         
     def export_to_csv(self, tariffs: List[Dict], filename: str = None) -> str:
         if not filename:
             filename = f"portuguese_tolls_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
         
-        filepath = os.path.join(self.output_dir, filename)
+        fieldnames = list(tariffs[0].keys()) if tariffs else TARIFF_FIELDS
+        return self.stream_to_csv(tariffs, filename, fieldnames=fieldnames)
+            
+    def export_to_json(self, tariffs: List[Dict], filename: str = None) -> str:
+        if not filename:
+            filename = f"portuguese_tolls_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        
+        return self.stream_to_json(tariffs, filename, total=len(tariffs))
         
-        try:
-            with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-                if tariffs:
-                    fieldnames = tariffs[0].keys()
-                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+    def stream_to_csv(self, rows: Iterable[Dict], filename: str = None, fieldnames: List[str] = None,
+                      compression: str = None) -> str:
+        """Write rows to CSV one at a time; columns outside the schema are dropped, missing ones left blank"""
+        if not filename:
+            filename = f"portuguese_tolls_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        
+        filepath = self._output_path(filename, compression)
+        
+        with self.tracer.span('export.csv') as span:
+            try:
+                with self._open(filepath, compression) as csvfile:
+                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames or TARIFF_FIELDS,
+                                            extrasaction='ignore', restval='')
                     writer.writeheader()
-                    writer.writerows(tariffs)
-                    
-            print(f"✓ CSV exported: {filepath}")
-            return filepath
+                    count = 0
+                    for row in self._rows(rows):
+                        writer.writerow(row)
+                        count += 1
+                        
+                self.manifest.record('csv', filepath, count)
+                span.set(rows=count, bytes=os.path.getsize(filepath))
+                print(f"✓ CSV exported: {filepath}")
+                return filepath
+                
+            except Exception as e:
+                print(f"Error exporting CSV: {e}")
+                span.set(error=str(e))
+                return None
             
-        except Exception as e:
-            print(f"Error exporting CSV: {e}")
-            return None
+    def stream_to_jsonl(self, rows: Iterable[Dict], filename: str = None, compression: str = None) -> str:
+        """Write one JSON object per line"""
+        if not filename:
+            filename = f"portuguese_tolls_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+        
+        filepath = self._output_path(filename, compression)
+        
+        with self.tracer.span('export.jsonl') as span:
+            try:
+                with self._open(filepath, compression) as jsonlfile:
+                    count = 0
+                    for row in self._rows(rows):
+                        jsonlfile.write(json.dumps(row, ensure_ascii=False))
+                        jsonlfile.write('\n')
+                        count += 1
+                        
+                self.manifest.record('jsonl', filepath, count)
+                span.set(rows=count, bytes=os.path.getsize(filepath))
+                print(f"✓ JSON Lines exported: {filepath}")
+                return filepath
+                
+            except Exception as e:
+                print(f"Error exporting JSON Lines: {e}")
+                span.set(error=str(e))
+                return None
             
-    def export_to_json(self, tariffs: List[Dict], filename: str = None) -> str:
+    def stream_to_json(self, rows: Iterable[Dict], filename: str = None, total: int = None,
+                       compression: str = None) -> str:
+        """Write the export_to_json document incrementally.
+        
+        Output matches json.dump(..., indent=2). When total is unknown the rows are
+        counted while writing and total_tariffs is emitted after the tariffs list.
+        """
         if not filename:
             filename = f"portuguese_tolls_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         
-        filepath = os.path.join(self.output_dir, filename)
+        filepath = self._output_path(filename, compression)
         
-        try:
-            with open(filepath, 'w', encoding='utf-8') as jsonfile:
-                json.dump({
-                    'scraped_at': datetime.now().isoformat(),
-                    'total_tariffs': len(tariffs),
-                    'tariffs': tariffs
-                }, jsonfile, indent=2, ensure_ascii=False)
+        with self.tracer.span('export.json') as span:
+            try:
+                with self._open(filepath, compression) as jsonfile:
+                    jsonfile.write('{\n  "scraped_at": ' + json.dumps(datetime.now().isoformat()) + ',\n')
+                    if total is not None:
+                        jsonfile.write(f'  "total_tariffs": {total},\n')
+                    jsonfile.write('  "tariffs": [')
+                    
+                    count = 0
+                    for row in self._rows(rows):
+                        item = json.dumps(row, indent=2, ensure_ascii=False).replace('\n', '\n    ')
+                        jsonfile.write((',\n    ' if count else '\n    ') + item)
+                        count += 1
+                        
+                    jsonfile.write('\n  ]' if count else ']')
+                    if total is None:
+                        jsonfile.write(f',\n  "total_tariffs": {count}')
+                    jsonfile.write('\n}')
+                    
+                self.manifest.record('json', filepath, count)
+                span.set(rows=count, bytes=os.path.getsize(filepath))
+                print(f"✓ JSON exported: {filepath}")
+                return filepath
                 
-            print(f"✓ JSON exported: {filepath}")
-            return filepath
+            except Exception as e:
+                print(f"Error exporting JSON: {e}")
+                span.set(error=str(e))
+                return None
             
-        except Exception as e:
-            print(f"Error exporting JSON: {e}")
-            return None
+    @staticmethod
+    def _rows(rows: Iterable[Dict]) -> Iterable[Dict]:
+        # TariffTable rows are materialised one at a time, only while being written
+        return rows.iter_dicts() if isinstance(rows, TariffTable) else rows
+        
+    def _output_path(self, filename: str, compression: str = None) -> str:
+        if compression:
+            if compression not in COMPRESSION:
+                raise ValueError(f"Unsupported compression '{compression}', expected one of {list(COMPRESSION)}")
+            suffix = COMPRESSION[compression][0]
+            if not filename.endswith(suffix):
+                filename += suffix
+        return os.path.join(self.output_dir, filename)
+        
+    def _open(self, filepath: str, compression: str = None):
+        if compression:
+            return COMPRESSION[compression][1](filepath, 'wt', encoding='utf-8', newline='')
+        return open(filepath, 'w', encoding='utf-8', newline='', buffering=self.buffer_size)
             
     def export_location_data(self, location_data: Dict, filename: str = None) -> str:
         if not filename:
@@ -59,13 +165,17 @@ class DataExporter:
         
         filepath = os.path.join(self.output_dir, filename)
         
-        try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(location_data, f, indent=2, ensure_ascii=False)
+        with self.tracer.span('export.locations') as span:
+            try:
+                with open(filepath, 'w', encoding='utf-8') as f:
+                    json.dump(location_data, f, indent=2, ensure_ascii=False)
+                    
+                self.manifest.record('locations', filepath, len(location_data))
+                span.set(rows=len(location_data), bytes=os.path.getsize(filepath))
+                print(f"✓ Location data exported: {filepath}")
+                return filepath
                 
-            print(f"✓ Location data exported: {filepath}")
-            return filepath
-            
-        except Exception as e:
-            print(f"Error exporting location data: {e}")
-            return None
\ No newline at end of file
+            except Exception as e:
+                print(f"Error exporting location data: {e}")
+                span.set(error=str(e))
+                return None
\ No newline at end of file
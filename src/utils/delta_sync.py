@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+ROW_KEY = ('route_segment', 'vehicle_type', 'validity_period')
+# Fields that change every run without the tariff itself changing
+VOLATILE_FIELDS = ('scraped_at',)
+
+
+def row_key(row: Dict) -> str:
+    return json.dumps([row.get(field) for field in ROW_KEY], ensure_ascii=False)
+
+
+def dedupe_rows(rows: List[Dict]) -> List[Dict]:
+    """One row per key, the last one seen winning, in first-seen key order"""
+    return list({row_key(row): row for row in rows}.values())
+
+
+def row_fingerprint(row: Dict) -> str:
+    stable = {k: v for k, v in row.items() if k not in VOLATILE_FIELDS}
+    return hashlib.sha1(json.dumps(stable, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class DeltaSync:
+    """Send only the tariff rows that changed since the last set the API acknowledged.
+
+    The snapshot maps row key -> row fingerprint for the last acknowledged set, plus a
+    checksum over those entries. A missing, corrupt or foreign snapshot forces a full sync.
+    """
+
+    def __init__(self, snapshot_path: str = "data/api_snapshot.json", api_url: str = None):
+        self.snapshot_path = snapshot_path
+        self.api_url = api_url
+        self.logger = logging.getLogger(__name__)
+        self.summary: Dict[str, Any] = {}
+
+    def sync(self, api_client, rows: List[Dict], full: bool = False) -> Dict[str, Any]:
+        unique = dedupe_rows(rows)
+        if len(unique) < len(rows):
+            self.logger.warning(f"Dropped {len(rows) - len(unique)} rows repeating an earlier row key, keeping the last")
+            rows = unique
+        fingerprints = self._fingerprints(rows)
+        snapshot = None if full else self._load_snapshot()
+
+        if snapshot is None:
+            reason = 'requested' if full else 'no valid snapshot'
+            self.summary = {'mode': 'full', 'reason': reason, 'rows': len(rows)}
+            self.logger.info(f"Full sync of {len(rows)} rows ({reason})")
+            result = api_client.send_toll_data(rows)
+        else:
+            upserts, deletes, counts = self.diff(snapshot['rows'], fingerprints, rows)
+            self.summary = {'mode': 'delta', **counts}
+            self.logger.info(f"Delta sync: {counts['inserts']} inserts, {counts['updates']} updates, "
+                             f"{counts['deletes']} deletes, {counts['unchanged']} unchanged")
+            if not upserts and not deletes:
+                return {
+                    'success': True,
+                    'status_code': None,
+                    'response': 'No tariff changes since last sync',
+                    'records_sent': 0,
+                    'sent_at': datetime.now().isoformat()
+                }
+            result = api_client.send_toll_delta(upserts, deletes)
+
+        if result.get('success'):
+            self._save_snapshot(fingerprints)
+        return result
+
+    @staticmethod
+    def diff(previous: Dict[str, str], current: Dict[str, str],
+             rows: List[Dict]) -> Tuple[List[Dict], List[Dict], Dict[str, int]]:
+        """Compare key -> fingerprint maps; returns (upserts, delete keys, counts)
+
+        rows repeating a key count once, the last one winning as it does in current.
+        """
+        upserts = []
+        counts = {'inserts': 0, 'updates': 0, 'deletes': 0, 'unchanged': 0}
+
+        for key, row in {row_key(row): row for row in rows}.items():
+            old = previous.get(key)
+            if old is None:
+                counts['inserts'] += 1
+                upserts.append(row)
+            elif old != current[key]:
+                counts['updates'] += 1
+                upserts.append(row)
+            else:
+                counts['unchanged'] += 1
+
+        deletes = [dict(zip(ROW_KEY, json.loads(key))) for key in previous if key not in current]
+        counts['deletes'] = len(deletes)
+        return upserts, deletes, counts
+
+    @staticmethod
+    def _fingerprints(rows: List[Dict]) -> Dict[str, str]:
+        return {row_key(row): row_fingerprint(row) for row in rows}
+
+    @staticmethod
+    def _checksum(fingerprints: Dict[str, str]) -> str:
+        # Order-independent sum of per-entry hashes, so no sort is needed
+        total = 0
+        for key, fingerprint in fingerprints.items():
+            entry = hashlib.sha256(f"{key}\t{fingerprint}".encode('utf-8')).digest()
+            total = (total + int.from_bytes(entry, 'big')) % (1 << 256)
+        return f"{total:064x}"
+
+    def _load_snapshot(self) -> Optional[Dict]:
+        if not os.path.exists(self.snapshot_path):
+            return None
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable snapshot {self.snapshot_path}: {e}")
+            return None
+
+        if snapshot.get('api_url') != self.api_url:
+            self.logger.info("Snapshot belongs to a different API, ignoring it")
+            return None
+        if snapshot.get('checksum') != self._checksum(snapshot.get('rows', {})):
+            self.logger.warning("Snapshot checksum mismatch, ignoring it")
+            return None
+        return snapshot
+
+    def _save_snapshot(self, fingerprints: Dict[str, str]):
+        os.makedirs(os.path.dirname(self.snapshot_path) or '.', exist_ok=True)
+        snapshot = {
+            'api_url': self.api_url,
+            'acknowledged_at': datetime.now().isoformat(),
+            'total_records': len(fingerprints),
+            'checksum': self._checksum(fingerprints),
+            'rows': fingerprints
+        }
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(tmp_path, self.snapshot_path)
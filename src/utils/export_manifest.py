@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import logging
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class ExportManifest:
+    """Latest file per export name, kept in manifest.json inside the export directory.
+
+    Exporters record each file they finish writing; readers ask for the latest one
+    instead of listing the directory. The manifest is rewritten atomically, so a reader
+    sees either the previous pointer or the new one. Updates are serialised per manifest
+    by a lock shared across instances and, where fcntl exists, a lock file shared across
+    processes, so concurrent exports do not drop each other's entries.
+    """
+
+    FILENAME = 'manifest.json'
+    _locks: Dict[str, threading.Lock] = {}
+    _locks_guard = threading.Lock()
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path = os.path.join(directory, self.FILENAME)
+        self.logger = logging.getLogger(__name__)
+
+    def record(self, name: str, path: str, records: int = None):
+        os.makedirs(self.directory, exist_ok=True)
+        with self._locked():
+            entries = self._load()
+            entries[name] = {
+                'file': os.path.relpath(path, self.directory),
+                'records': records,
+                'written_at': datetime.now().isoformat()
+            }
+            with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=self.directory, prefix=f".{self.FILENAME}.",
+                                             suffix='.tmp', delete=False) as f:
+                json.dump(entries, f, indent=2, ensure_ascii=False)
+            os.replace(f.name, self.path)
+
+    def entry(self, name: str) -> Optional[Dict]:
+        return self._load().get(name)
+
+    def latest(self, name: str) -> Optional[str]:
+        """Path of the last file recorded under name; None if unrecorded or since removed"""
+        entry = self.entry(name)
+        if not entry:
+            return None
+        path = os.path.join(self.directory, entry['file'])
+        return path if os.path.exists(path) else None
+
+    @contextmanager
+    def _locked(self):
+        with self._locks_guard:
+            lock = self._locks.setdefault(os.path.abspath(self.path), threading.Lock())
+        with lock:
+            if fcntl is None:
+                yield
+                return
+            with open(f"{self.path}.lock", 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load(self) -> Dict[str, Dict]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable export manifest {self.path}: {e}")
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record or look up the latest export file")
+    parser.add_argument('directory', help="Export directory holding manifest.json")
+    parser.add_argument('name', help="Export name, e.g. tolls_mysql")
+    parser.add_argument('file', nargs='?', help="File to record as the latest export (omit to print it)")
+    parser.add_argument('--records', type=int)
+    args = parser.parse_args()
+
+    manifest = ExportManifest(args.directory)
+    if args.file:
+        manifest.record(args.name, args.file, args.records)
+    else:
+        print(manifest.latest(args.name) or f"No export recorded for {args.name}")
+
+
+if __name__ == "__main__":
+    main()
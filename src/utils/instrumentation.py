@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes; the peak RSS where /proc is not available"""
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        pass
+    if resource is None:
+        return None
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if os.uname().sysname == 'Darwin' else peak * 1024
+
+
+class Span:
+    """One timed stage of a run, with counters (rows, bytes, ...) and nested stages"""
+
+    __slots__ = ('name', 'attrs', 'children', 'started_at', 'seconds', 'rss_start', 'rss_delta', 'error',
+                 '_start')
+
+    def __init__(self, name: str, attrs: Dict[str, Any] = None):
+        self.name = name
+        self.attrs = attrs or {}
+        self.children: List['Span'] = []
+        self.started_at = datetime.now().isoformat()
+        self.seconds = None
+        self.rss_start = current_rss()
+        self.rss_delta = None
+        self.error = None
+        self._start = time.perf_counter()
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def add(self, **counters):
+        """Increment numeric counters, e.g. span.add(rows=len(chunk))"""
+        for key, value in counters.items():
+            self.attrs[key] = self.attrs.get(key, 0) + value
+
+    def finish(self, error: BaseException = None):
+        self.seconds = round(time.perf_counter() - self._start, 6)
+        rss = current_rss()
+        if rss is not None and self.rss_start is not None:
+            self.rss_delta = rss - self.rss_start
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        span = {'name': self.name, 'started_at': self.started_at, 'seconds': self.seconds,
+                'rss_delta_bytes': self.rss_delta}
+        span.update(self.attrs)
+        if self.error:
+            span['error'] = self.error
+        if self.children:
+            span['children'] = [child.to_dict() for child in list(self.children)]
+        return span
+
+
+class _NullSpan:
+    """Stands in for a Span when tracing is off"""
+
+    def set(self, **attrs):
+        pass
+
+    def add(self, **counters):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """Tree of context-manager spans for one scraper run.
+
+    Spans nest per thread; a thread with no open span attaches to the run's root span,
+    and wrap() carries the current span over to work handed to another thread. A
+    disabled tracer hands out a shared no-op span and records nothing.
+    """
+
+    def __init__(self, name: str = 'run', enabled: bool = True):
+        self.enabled = enabled
+        self.root = Span(name) if enabled else None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = [self.root]
+        return stack
+
+    def current(self) -> Optional[Span]:
+        return self._stack()[-1] if self.enabled else None
+
+    @contextmanager
+    def span(self, name: str, **attrs) -> Iterator[Span]:
+        if not self.enabled:
+            yield _NULL_SPAN
+            return
+
+        stack = self._stack()
+        span = Span(name, attrs)
+        with self._lock:
+            stack[-1].children.append(span)
+        stack.append(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.finish(e)
+            raise
+        else:
+            span.finish()
+        finally:
+            stack.pop()
+
+    def record(self, name: str, seconds: float, **attrs):
+        """Add an already finished span, e.g. a page parsed in a worker process"""
+        if not self.enabled:
+            return
+        span = Span(name, attrs)
+        span.seconds = round(seconds, 6)
+        span.rss_start = None
+        with self._lock:
+            self.current().children.append(span)
+
+    def wrap(self, func: Callable) -> Callable:
+        """func with the caller's current span as the parent of spans it opens on other threads"""
+        if not self.enabled:
+            return func
+        parent = self.current()
+
+        def traced(*args, **kwargs):
+            previous = getattr(self._local, 'stack', None)
+            self._local.stack = [parent]
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._local.stack = previous
+        return traced
+
+    def finish(self) -> Optional[Dict[str, Any]]:
+        """Close the root span and return the span tree"""
+        if not self.enabled:
+            return None
+        if self.root.seconds is None:
+            self.root.finish()
+        return self.root.to_dict()
+
+    def write_prometheus(self, path: str, prefix: str = 'toll_scraper') -> Optional[str]:
+        """Write span totals for the node_exporter textfile collector.
+
+        Spans are keyed by their path ("run/source.brisa/pdf.parse/pdf.page"), so repeated
+        spans such as pages and API requests become one series with a count.
+        """
+        if not self.enabled:
+            return None
+        tree = self.finish()
+        totals: Dict[str, Dict[str, float]] = {}
+
+        def collect(span: Dict, parent: str = ''):
+            key = f"{parent}/{span['name']}" if parent else span['name']
+            total = totals.setdefault(key, {'count': 0})
+            total['count'] += 1
+            for metric in ('seconds', 'rss_delta_bytes', 'rows', 'bytes'):
+                if isinstance(span.get(metric), (int, float)):
+                    total[metric] = total.get(metric, 0) + span[metric]
+            if span.get('error'):
+                total['errors'] = total.get('errors', 0) + 1
+            for child in span.get('children', []):
+                collect(child, key)
+
+        collect(tree)
+
+        metrics = [
+            ('span_seconds', 'seconds', "Wall time spent in the span during the last run"),
+            ('span_count', 'count', "Times the span was entered during the last run"),
+            ('span_rss_delta_bytes', 'rss_delta_bytes', "Change in resident memory across the span"),
+            ('span_rows', 'rows', "Rows handled in the span"),
+            ('span_bytes', 'bytes', "Bytes read, written or sent in the span"),
+            ('span_errors', 'errors', "Spans that ended with an exception")
+        ]
+        lines = []
+        for metric, field, help_text in metrics:
+            samples = [(key, total[field]) for key, total in totals.items() if field in total]
+            if not samples:
+                continue
+            lines.append(f"# HELP {prefix}_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_{metric} gauge")
+            lines.extend(f'{prefix}_{metric}{{span="{_escape_label(key)}"}} {value}' for key, value in samples)
+        lines.append(f"# HELP {prefix}_last_run_timestamp_seconds Unix time the last run finished")
+        lines.append(f"# TYPE {prefix}_last_run_timestamp_seconds gauge")
+        lines.append(f"{prefix}_last_run_timestamp_seconds {time.time():.3f}")
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(temp_path, path)
+        return path
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_tree(span: Dict[str, Any], depth: int = 0) -> Iterator[str]:
+    """Indented one-line-per-span rendering of a span tree"""
+    counters = ' '.join(f"{key}={value}" for key, value in span.items()
+                        if key not in ('name', 'started_at', 'seconds', 'rss_delta_bytes', 'children'))
+    seconds = f"{span['seconds']:.3f}s" if span.get('seconds') is not None else 'running'
+    rss = span.get('rss_delta_bytes')
+    rss = f" rss{rss / 1024 / 1024:+.1f}MiB" if rss is not None else ''
+    yield f"{'  ' * depth}{span['name']}  {seconds}{rss}  {counters}".rstrip()
+    for child in span.get('children', []):
+        yield from format_tree(child, depth + 1)
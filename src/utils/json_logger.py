@@ -5,17 +5,31 @@ import os
 from datetime import datetime
 from typing import Dict, List, Any
 
+from .instrumentation import Tracer
+from .run_ledger import RunLedger
+from .tariff_table import TariffTable
+
 class TollJSONLogger:
-    def __init__(self):
+    def __init__(self, ledger: RunLedger = None, tracer: Tracer = None):
+        """With a ledger, runs are appended to it; otherwise each run gets its own JSON file.
+        
+        With an enabled tracer, the run's span tree is logged under 'spans'.
+        """
         self.output_dir = "data/logs"
+        self.ledger = ledger
+        self.tracer = tracer
         os.makedirs(self.output_dir, exist_ok=True)
     
-    def log_scraping_result(self, toll_data: List[Dict], api_result: Dict[str, Any]) -> str:
+    def log_scraping_result(self, toll_data: List[Dict], api_result: Dict[str, Any],
+                            run_info: Dict[str, Any] = None) -> str:
         """Log scraping and API results to JSON file"""
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         log_file = os.path.join(self.output_dir, f"toll_scraping_log_{timestamp}.json")
         
+        if isinstance(toll_data, TariffTable):
+            toll_data = toll_data.to_dicts()
+        
         log_data = {
             'scraping_info': {
                 'scraped_at': datetime.now().isoformat(),
@@ -30,9 +44,16 @@ class TollJSONLogger:
                 'error': api_result.get('error'),
                 'response': api_result.get('response')
             },
-            'toll_data': toll_data
+            'run_info': run_info or {},
         }
+        if self.tracer and self.tracer.enabled:
+            log_data['spans'] = self.tracer.finish()
         
+        if self.ledger:
+            run_id = self.ledger.append(dict(log_data, kind='result'), toll_data)
+            return f"{self.ledger.active_path}#{run_id}"
+        
+        log_data['toll_data'] = toll_data
         with open(log_file, 'w', encoding='utf-8') as f:
             json.dump(log_data, f, indent=2, ensure_ascii=False)
         
@@ -60,6 +81,12 @@ class TollJSONLogger:
                 'records_sent': 0
             }
         }
+        if self.tracer and self.tracer.enabled:
+            error_data['spans'] = self.tracer.finish()
+        
+        if self.ledger:
+            run_id = self.ledger.append(dict(error_data, kind='error'))
+            return f"{self.ledger.active_path}#{run_id}"
         
         with open(log_file, 'w', encoding='utf-8') as f:
             json.dump(error_data, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+import json
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, List, Any
+
+
+class Outbox:
+    """Append-only journal of API payloads that have not been acknowledged yet.
+
+    A payload is journalled before it is sent and an 'ack' record is appended once the
+    API accepts it, so a killed process leaves it pending instead of losing it. The
+    entry id doubles as the Idempotency-Key header, so a replay of a batch the API did
+    receive (but we never recorded) is not applied twice. A payload made obsolete by a
+    newer one the API accepted is marked 'superseded' and is not replayed.
+    """
+
+    def __init__(self, path: str = "data/outbox/outbox.jsonl"):
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    def enqueue(self, payload: Dict[str, Any]) -> str:
+        entry_id = uuid.uuid4().hex
+        self._append({'op': 'enqueue', 'id': entry_id, 'created_at': datetime.now().isoformat(), 'payload': payload})
+        return entry_id
+
+    def ack(self, entry_id: str):
+        self._append({'op': 'ack', 'id': entry_id, 'acked_at': datetime.now().isoformat()})
+
+    def supersede(self, entry_ids: List[str]):
+        """Drop pending entries without sending them, e.g. full payloads older than an accepted one"""
+        for entry_id in entry_ids:
+            self._append({'op': 'superseded', 'id': entry_id, 'superseded_at': datetime.now().isoformat()})
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Enqueued entries without an ack, in enqueue order"""
+        with self._lock:
+            return self._pending()
+
+    def compact(self):
+        """Rewrite the journal with only pending entries (atomic replace)"""
+        with self._lock:
+            pending = self._pending()
+            if not pending:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+                return
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for entry in pending:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+
+    def _pending(self) -> List[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return []
+
+        entries = {}
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, start=1):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A write torn by a crash; the payload was never sent, so skipping it is safe
+                    self.logger.warning(f"Skipping unreadable outbox record at line {line_number}")
+                    continue
+                if record.get('op') == 'enqueue':
+                    entries[record['id']] = record
+                elif record.get('op') in ('ack', 'superseded'):
+                    entries.pop(record['id'], None)
+
+        return list(entries.values())
+
+    def _append(self, record: Dict[str, Any]):
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            with open(self.path, 'a+b') as f:
+                # Start on a fresh line if a previous write was torn mid-record
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        line = '\n' + line
+                f.write(line.encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
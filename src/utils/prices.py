@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+
+import itertools
+import math
+import operator
+import re
+from array import array
+from typing import Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# "2,13", "2.13", "1.234,56", "1,234.56", "1.234.567": digit groups need a leading 1-9, groups of
+# three and either a second group or a decimal part with the other separator, so a lone "1,234"
+# or "1.234" stays a decimal amount. Groups may also be split by non-breaking spaces.
+NUMBER = (r'(?P<number>(?=[.,]?\d)\d*(?:[.,]\d*)?'
+          r'|[1-9]\d{0,2}(?P<group>[.,\u00a0\u202f])\d{3}'
+          r'(?:(?:(?P=group)\d{3})+(?:(?!(?P=group))[.,]\d*)?|(?!(?P=group))[.,]\d*))')
+# A whole cell: the amount with euro signs, "EUR" or whitespace on either side
+PRICE_VALUE_PATTERN = re.compile(r'(?:\s|€|EUR)*' + NUMBER + r'(?:\s|€|EUR)*')
+# The first amount in a cell with other text around it ("from 2,50 €", "2.50 € (Class 1)")
+PRICE_SEARCH_PATTERN = re.compile(r'(?<!\d)(?<!\d[.,])' + NUMBER + r'(?![.,]?\d)')
+# Euro amounts inside a line of text ("2,13€", "2.13 €", "€2,13"); the number is checked by the column parser
+PRICE_TOKEN_PATTERN = re.compile(r'(?<![\d.,])(?:(?<=€)|(?<=€\s)|(?=\d(?:[\d.,]*\d)?\s?€))(\d(?:[\d.,]*\d)?)(?![\d.,])')
+
+# Values converted per joined-string batch, which bounds the extra memory of a conversion
+CHUNK_SIZE = 4096
+# What a plain amount leaves per line once digits and whitespace are deleted: nothing or its decimal point
+_NOT_DIGIT_OR_SPACE = str.maketrans('', '', '0123456789 \t\r\x0b\x0c')
+_PLAIN_RESIDUES = frozenset(('', '.'))
+
+
+def canonical_price(value, search: bool = False) -> Optional[str]:
+    """Price as a plain decimal string ("1.234,56 €" -> "1234.56"), None if it is not a price.
+
+    By default the whole value must be the amount; with search, the first amount in a
+    value with other text around it is taken ("from 2,50 €/trip" -> "2.50").
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return repr(float(value)) if math.isfinite(value) else None
+    value = str(value)
+    match = PRICE_VALUE_PATTERN.fullmatch(value)
+    if match is None and search:
+        match = PRICE_SEARCH_PATTERN.search(value)
+    if match is None:
+        return None
+    number, group = match.group('number', 'group')
+    if group:
+        number = number.replace(group, '')
+    return number.replace(',', '.')
+
+
+def parse_price(value) -> Optional[float]:
+    """Single-value parse_prices(); None if value is not a price"""
+    number = canonical_price(value)
+    return float(number) if number is not None else None
+
+
+def parse_prices(values: Iterable, cents: bool = False, use_numpy: bool = None, search: bool = False) -> Tuple:
+    """Parse a column of raw prices.
+
+    Returns (prices, valid): floats, or integer cents rounded to the nearest cent, and a
+    mask that is false where a value is not a price (its price is 0). Both are NumPy arrays
+    when use_numpy is true (the default when NumPy is installed), otherwise array('d') /
+    array('q') and array('B'). search is passed on to canonical_price().
+    """
+    values = values if isinstance(values, list) else list(values)
+    prices, valid = array('d'), array('B')
+    for start in range(0, len(values), CHUNK_SIZE):
+        _parse_chunk(values[start:start + CHUNK_SIZE], prices, valid, search)
+
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy:
+        if np is None:
+            raise ImportError("use_numpy=True requires numpy")
+        prices, valid = np.frombuffer(prices, dtype=np.float64), np.frombuffer(valid, dtype=np.uint8).astype(bool)
+        return (np.rint(prices * 100).astype(np.int64) if cents else prices.copy()), valid
+
+    if cents:
+        prices = array('q', map(round, map((100.0).__mul__, prices)))
+    return prices, valid
+
+
+def _parse_chunk(chunk: list, prices: array, valid: array, search: bool = False):
+    # Plain amounts ("2,13 €", "€22.85", "7") are converted through one joined string:
+    # currency marks blanked, decimal commas swapped, then float() over the lines. Lines
+    # left with other characters or several points (digit groups, text) are found with one
+    # translate() and parsed by canonical_price() instead.
+    try:
+        text = '\n'.join(chunk)
+    except TypeError:
+        # Numbers, None: their str() takes the same route ("2.5" is plain, "None" is not)
+        text = '\n'.join(map(str, chunk))
+    if text.count('\n') != len(chunk) - 1:
+        for value in chunk:
+            _parse_value(value, prices, valid, search)
+        return
+
+    text = text.replace('€', ' ').replace('EUR', ' ').replace(',', '.')
+    lines = text.split('\n')
+    plain = list(map(_PLAIN_RESIDUES.__contains__, text.translate(_NOT_DIGIT_OR_SPACE).split('\n')))
+    unusual = list(itertools.compress(range(len(chunk)), map(operator.not_, plain)))
+    for i in unusual:
+        lines[i] = '0'
+
+    try:
+        converted = list(map(float, lines))
+    except ValueError:
+        # Blank or space-split lines; rare enough to redo the chunk value by value
+        for value in chunk:
+            _parse_value(value, prices, valid, search)
+        return
+
+    chunk_valid = array('B', plain)
+    for i in unusual:
+        number = canonical_price(chunk[i], search)
+        if number is not None:
+            converted[i] = float(number)
+            chunk_valid[i] = 1
+    prices.extend(converted)
+    valid.extend(chunk_valid)
+
+
+def _parse_value(value, prices: array, valid: array, search: bool = False):
+    number = canonical_price(value, search)
+    prices.append(float(number) if number is not None else 0.0)
+    valid.append(number is not None)
+
+
+def normalize_prices(values: Iterable, search: bool = False) -> List[Optional[str]]:
+    """Column of raw prices as decimal strings, None where not a price.
+
+    Amounts get at least two decimals ("2,1 €" -> "2.10"); finer amounts keep their
+    digits ("1.234" -> "1.234") instead of being rounded to the cent.
+    """
+    prices, valid = parse_prices(values, use_numpy=False, search=search)
+    normalized = list(map('{:.2f}'.format, prices))
+    for i in itertools.compress(range(len(normalized)), map(operator.ne, map(float, normalized), prices)):
+        normalized[i] = repr(prices[i])
+    for i in itertools.compress(range(len(normalized)), map(operator.not_, valid)):
+        normalized[i] = None
+    return normalized
+
+
+def find_price_tokens(line: str) -> List[str]:
+    """Raw euro amounts in a line of text, in order"""
+    return PRICE_TOKEN_PATTERN.findall(line)
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+
+import logging
+import os
+import threading
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import Dict, Iterable
+
+
+class StageProfiler:
+    """Opt-in cProfile / tracemalloc profiling of named run stages.
+
+    mode is 'cpu' (cProfile, a .prof file plus a top-N cumulative-time summary),
+    'memory' (tracemalloc, a top-N allocation report) or 'both'; an empty mode turns
+    profiling off and stage() returns a null context without importing either module.
+
+    Stages: 'run' (the whole run), 'scrape', 'parse', 'export' and 'upload'. cProfile
+    records only the thread it runs on: a CPU-profiled stage covers the thread that
+    entered it plus the calls made through wrap() while it is open (main.py wraps the
+    scraper sources, which run on orchestrator threads), merged into one .prof file.
+    One stage is CPU-profiled at a time, so a stage entered while another is being
+    CPU-profiled only gets its memory report. PDF pages parsed in worker processes and
+    batched API uploads are not CPU-profiled. tracemalloc is process wide: a memory
+    report includes allocations made by other threads during the stage.
+    """
+
+    MODES = ('cpu', 'memory', 'both')
+    STAGES = ('run', 'scrape', 'parse', 'export', 'upload')
+    # Frames kept per allocation traceback
+    TRACEBACK_FRAMES = 10
+
+    def __init__(self, mode: str = '', stages: Iterable[str] = ('run',), output_dir: str = "data/logs/profiles",
+                 top_n: int = 25):
+        if mode and mode not in self.MODES:
+            raise ValueError(f"Unknown profiling mode '{mode}', expected one of {self.MODES}")
+        stages = tuple(stages)
+        unknown = [stage for stage in stages if stage not in self.STAGES]
+        if unknown:
+            raise ValueError(f"Unknown profiling stages {unknown}, expected some of {self.STAGES}")
+
+        self.mode = mode
+        self.stages = stages
+        self.output_dir = output_dir
+        self.top_n = top_n
+        self.run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.reports: Dict[str, Dict[str, str]] = {}
+        self.logger = logging.getLogger(__name__)
+        self._cpu_lock = threading.Lock()
+        # Thread profiles of the open CPU stage, merged into its .prof file when it ends
+        self._thread_profiles = None
+        # Open memory stages, each with the highest peak seen while nested stages reset it
+        self._memory_stages = []
+        self._memory_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.mode)
+
+    def stage(self, name: str):
+        """Context manager profiling the named stage when it was selected"""
+        if not self.mode or name not in self.stages:
+            return nullcontext()
+        return self._profile(name)
+
+    def wrap(self, func):
+        """func, CPU-profiled on whatever thread calls it while a CPU stage is open"""
+        if self.mode not in ('cpu', 'both'):
+            return func
+
+        def profiled(*args, **kwargs):
+            profiles = self._thread_profiles
+            if profiles is None:
+                return func(*args, **kwargs)
+
+            import cProfile
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError as e:
+                # Interpreters where only one profiler may be active process wide
+                self.logger.warning(f"Cannot profile {getattr(func, '__name__', func)} on this thread: {e}")
+                return func(*args, **kwargs)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.disable()
+                profiles.append(profile)
+        return profiled
+
+    @contextmanager
+    def _profile(self, name: str):
+        os.makedirs(self.output_dir, exist_ok=True)
+        prefix = os.path.join(self.output_dir, f"profile_{self.run_id}_{name}")
+
+        profile = None
+        if self.mode in ('cpu', 'both') and self._cpu_lock.acquire(blocking=False):
+            import cProfile
+            profile = cProfile.Profile()
+            self._thread_profiles = []
+        elif self.mode in ('cpu', 'both'):
+            self.logger.warning(f"Another stage is being CPU-profiled; stage '{name}' gets no .prof file")
+
+        tracemalloc = before = memory_stage = None
+        started_tracing = False
+        if self.mode in ('memory', 'both'):
+            import tracemalloc
+            with self._memory_lock:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start(self.TRACEBACK_FRAMES)
+                    started_tracing = True
+                # Resetting the peak for this stage must not lose what the open stages reached so far
+                self._fold_peak(tracemalloc)
+                tracemalloc.reset_peak()
+                memory_stage = {'peak': 0}
+                self._memory_stages.append(memory_stage)
+            before = tracemalloc.take_snapshot()
+
+        if profile:
+            profile.enable()
+        try:
+            yield
+        finally:
+            report = self.reports.setdefault(name, {})
+            if profile:
+                profile.disable()
+            # Allocation report first, so dumping the CPU stats does not show up in it
+            if tracemalloc:
+                with self._memory_lock:
+                    self._fold_peak(tracemalloc)
+                    self._memory_stages.remove(memory_stage)
+                report['allocations'] = self._write_memory(tracemalloc, before, memory_stage['peak'], name, prefix)
+                if started_tracing:
+                    tracemalloc.stop()
+            if profile:
+                thread_profiles, self._thread_profiles = self._thread_profiles, None
+                report['prof'] = self._write_cpu(profile, thread_profiles, prefix)
+                self._cpu_lock.release()
+            self.logger.info(f"Profiled stage '{name}': {', '.join(report.values())}")
+
+    def _fold_peak(self, tracemalloc):
+        _, peak = tracemalloc.get_traced_memory()
+        for stage in self._memory_stages:
+            stage['peak'] = max(stage['peak'], peak)
+
+    def _write_cpu(self, profile, thread_profiles: list, prefix: str) -> str:
+        import pstats
+
+        prof_path = f"{prefix}.prof"
+        stats = pstats.Stats(profile)
+        for thread_profile in thread_profiles:
+            stats.add(thread_profile)
+        stats.dump_stats(prof_path)
+        with open(f"{prefix}_cpu.txt", 'w', encoding='utf-8') as f:
+            stats.stream = f
+            stats.sort_stats('cumulative').print_stats(self.top_n)
+        return prof_path
+
+    def _write_memory(self, tracemalloc, before, peak: int, name: str, prefix: str) -> str:
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__),
+                  tracemalloc.Filter(False, '<frozen importlib._bootstrap*>')]
+        after = tracemalloc.take_snapshot().filter_traces(ignore)
+        stats = after.compare_to(before.filter_traces(ignore), 'lineno')
+
+        report_path = f"{prefix}_allocations.txt"
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write(f"Stage '{name}' of run {self.run_id}\n")
+            f.write(f"Peak traced memory during the stage: {peak / 1024 / 1024:.1f} MiB\n")
+            f.write(f"Net change: {sum(stat.size_diff for stat in stats) / 1024 / 1024:+.1f} MiB\n\n")
+            f.write(f"Top {self.top_n} source lines by change in allocated memory over the stage:\n")
+            for index, stat in enumerate(stats[:self.top_n], 1):
+                frame = stat.traceback[0]
+                f.write(f"{index:3d}. {frame.filename}:{frame.lineno}: {stat.size_diff / 1024:+.1f} KiB "
+                        f"in {stat.count_diff:+d} blocks (now {stat.size / 1024:.1f} KiB)\n")
+        return report_path
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from .delta_sync import VOLATILE_FIELDS
+from .instrumentation import format_tree
+
+
+class RunLedger:
+    """Append-only JSON Lines log of scraper runs, one line per run.
+
+    The active segment (runs.jsonl) is rotated into a gzipped segment once it passes
+    max_bytes or its first run is older than max_age_days. Tariff payloads are stored
+    once under their SHA-256 in payloads/ and runs only reference them; the hash skips
+    per-run fields such as scraped_at, so runs with unchanged tariffs share one file, and
+    rotation deletes payloads no run references. index.json keeps a few fields and the
+    byte offset of every run, so lookups never scan the segments.
+    """
+
+    ACTIVE_SEGMENT = 'runs.jsonl'
+    INDEX_VERSION = 1
+
+    def __init__(self, ledger_dir: str = "data/logs/ledger", max_bytes: int = 5 * 1024 * 1024,
+                 max_age_days: int = 7):
+        self.ledger_dir = ledger_dir
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self.active_path = os.path.join(ledger_dir, self.ACTIVE_SEGMENT)
+        self.index_path = os.path.join(ledger_dir, 'index.json')
+        self.payload_dir = os.path.join(ledger_dir, 'payloads')
+        os.makedirs(self.payload_dir, exist_ok=True)
+
+    def append(self, record: Dict[str, Any], toll_data: List[Dict] = None) -> str:
+        """Write one run record (plus its payload reference) and return its run id"""
+        record = dict(record)
+        record.setdefault('run_id', uuid.uuid4().hex)
+        record.setdefault('logged_at', datetime.now().isoformat())
+
+        with self._lock:
+            # Stored under the lock, so a rotation cannot collect it before the run references it
+            if toll_data is not None:
+                record['toll_data_ref'] = self.store_payload(toll_data)
+            line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+
+            index = self._load_index()
+            self._rotate_if_due(index, keep=record.get('toll_data_ref', {}).get('sha256'))
+
+            with open(self.active_path, 'ab') as f:
+                offset = f.tell()
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+            entry = self._index_entry(record, offset)
+            index['runs'].append(entry)
+            if entry['api_success']:
+                index['last_api_success'] = entry['run_id']
+            if entry['error']:
+                index['last_error'] = entry['run_id']
+            self._save_index(index)
+
+        return record['run_id']
+
+    def store_payload(self, toll_data: List[Dict]) -> Dict[str, Any]:
+        """Store toll data once under its content hash; identical payloads share one file.
+
+        Volatile fields are left out of the stored body, so runs that only differ in them match.
+        """
+        canonical = [{key: value for key, value in row.items() if key not in VOLATILE_FIELDS} for row in toll_data]
+        body = json.dumps(canonical, ensure_ascii=False, sort_keys=True).encode('utf-8')
+        digest = hashlib.sha256(body).hexdigest()
+        relative_path = os.path.join('payloads', f"{digest}.json.gz")
+        path = os.path.join(self.ledger_dir, relative_path)
+
+        if not os.path.exists(path):
+            tmp_path = f"{path}.tmp"
+            with gzip.open(tmp_path, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+
+        return {'sha256': digest, 'records': len(toll_data), 'path': relative_path}
+
+    def load_payload(self, ref: Dict[str, Any]) -> Optional[List[Dict]]:
+        path = os.path.join(self.ledger_dir, ref['path'])
+        if not os.path.exists(path):
+            return None
+        with gzip.open(path, 'rb') as f:
+            return json.loads(f.read().decode('utf-8'))
+
+    def runs(self) -> List[Dict[str, Any]]:
+        """Index entries of every run, oldest first"""
+        with self._lock:
+            return self._load_index()['runs']
+
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        for entry in reversed(self.runs()):
+            if entry['run_id'] == run_id:
+                return self.read(entry)
+        return None
+
+    def read(self, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Full record for an index entry, read from its segment at the stored offset"""
+        path = os.path.join(self.ledger_dir, entry['segment'])
+        opener = gzip.open if path.endswith('.gz') else open
+        try:
+            with opener(path, 'rb') as f:
+                f.seek(entry['offset'])
+                return json.loads(f.readline().decode('utf-8'))
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Cannot read run {entry['run_id']} from {path}: {e}")
+            return None
+
+    def last_successful_send(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            run_id = self._load_index().get('last_api_success')
+        return self.get_run(run_id) if run_id else None
+
+    def runs_with_errors(self) -> List[Dict[str, Any]]:
+        """Index entries of runs that failed to scrape or send, oldest first"""
+        return [entry for entry in self.runs() if entry['error']]
+
+    def rotate(self) -> bool:
+        with self._lock:
+            return self._rotate(self._load_index())
+
+    def _rotate_if_due(self, index: Dict[str, Any], keep: str = None):
+        if not os.path.exists(self.active_path):
+            return
+        too_big = os.path.getsize(self.active_path) >= self.max_bytes
+        active = [entry for entry in index['runs'] if entry['segment'] == self.ACTIVE_SEGMENT]
+        too_old = bool(active) and time.time() - active[0]['logged_ts'] > self.max_age_days * 86400
+        if too_big or too_old:
+            self._rotate(index, keep)
+
+    def _rotate(self, index: Dict[str, Any], keep: str = None) -> bool:
+        """Compress the active segment into runs-<timestamp>.jsonl.gz and repoint its index entries"""
+        if not os.path.exists(self.active_path) or not os.path.getsize(self.active_path):
+            return False
+
+        segment = f"runs-{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.jsonl.gz"
+        segment_path = os.path.join(self.ledger_dir, segment)
+        with open(self.active_path, 'rb') as source, gzip.open(f"{segment_path}.tmp", 'wb') as target:
+            shutil.copyfileobj(source, target)
+        os.replace(f"{segment_path}.tmp", segment_path)
+
+        for entry in index['runs']:
+            if entry['segment'] == self.ACTIVE_SEGMENT:
+                entry['segment'] = segment
+        # Index first, so a crash in between leaves duplicates rather than dangling entries
+        self._save_index(index)
+        os.remove(self.active_path)
+
+        self.logger.info(f"Run ledger rotated into {segment}")
+        self._collect_payloads(index, keep)
+        return True
+
+    def _collect_payloads(self, index: Dict[str, Any], keep: str = None):
+        """Delete payload files that no indexed run (active or rotated) references"""
+        referenced = {entry.get('payload') for entry in index['runs']} | {keep}
+        removed = 0
+        for name in os.listdir(self.payload_dir):
+            if name.split('.', 1)[0] not in referenced:
+                os.remove(os.path.join(self.payload_dir, name))
+                removed += 1
+        if removed:
+            self.logger.info(f"Removed {removed} unreferenced payload files")
+
+    def _index_entry(self, record: Dict[str, Any], offset: int) -> Dict[str, Any]:
+        api_info = record.get('api_info', {})
+        scraping_info = record.get('scraping_info', {})
+        error = record.get('error_info', {}).get('error_message')
+        if not error and not scraping_info.get('scraping_success', True):
+            error = 'No toll data scraped'
+        if not error and api_info and not api_info.get('api_success'):
+            error = api_info.get('error') or 'API send failed'
+        return {
+            'run_id': record['run_id'],
+            'logged_at': record['logged_at'],
+            'logged_ts': time.time(),
+            'kind': record.get('kind'),
+            'records': scraping_info.get('total_records', 0),
+            'api_success': bool(api_info.get('api_success')),
+            'error': error,
+            'payload': record.get('toll_data_ref', {}).get('sha256'),
+            'segment': self.ACTIVE_SEGMENT,
+            'offset': offset
+        }
+
+    def _load_index(self) -> Dict[str, Any]:
+        empty = {'version': self.INDEX_VERSION, 'runs': [], 'last_api_success': None, 'last_error': None}
+        if not os.path.exists(self.index_path):
+            return empty
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Run ledger index unreadable ({e}), starting a new one")
+            return empty
+        return index if index.get('version') == self.INDEX_VERSION else empty
+
+    def _save_index(self, index: Dict[str, Any]):
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the scraper run ledger")
+    parser.add_argument('command', choices=['last-success', 'errors', 'tail', 'show', 'spans', 'rotate'])
+    parser.add_argument('run_id', nargs='?', help="Run to show (spans: defaults to the latest run)")
+    parser.add_argument('-n', type=int, default=10, help="Runs listed by tail/errors")
+    parser.add_argument('--ledger-dir', default="data/logs/ledger")
+    parser.add_argument('--payload', action='store_true', help="Include the tariff payload with show")
+    args = parser.parse_args()
+
+    ledger = RunLedger(args.ledger_dir)
+
+    if args.command == 'rotate':
+        ledger.rotate()
+        return
+
+    if args.command in ('tail', 'errors'):
+        entries = ledger.runs() if args.command == 'tail' else ledger.runs_with_errors()
+        for entry in entries[-args.n:]:
+            status = 'sent' if entry['api_success'] else 'FAILED'
+            print(f"{entry['logged_at']}  {entry['run_id']}  {entry['kind']:<6} {entry['records']:>6} records  "
+                  f"{status}  {entry['error'] or ''}")
+        return
+
+    if args.command == 'spans':
+        runs = ledger.runs()
+        record = ledger.get_run(args.run_id) if args.run_id else (ledger.read(runs[-1]) if runs else None)
+        if not record or not record.get('spans'):
+            print("No spans recorded for that run")
+            return
+        for line in format_tree(record['spans']):
+            print(line)
+        return
+
+    if args.command == 'show':
+        if not args.run_id:
+            parser.error("show needs a run_id")
+        record = ledger.get_run(args.run_id)
+    else:
+        record = ledger.last_successful_send()
+
+    if record is None:
+        print("No matching run")
+        return
+    if args.payload and record.get('toll_data_ref'):
+        record['toll_data'] = ledger.load_payload(record['toll_data_ref'])
+    print(json.dumps(record, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,58 +1,131 @@
 #!/usr/bin/env python3
 
+import gzip
 import json
 import os
 from datetime import datetime
+from typing import Dict, Iterator
 
-def export_clean_tolls():
+from .export_manifest import ExportManifest
+
+EXPORT_NAME = 'tolls_mysql'
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def latest_export(exports_dir: str) -> str:
+    """Latest tolls_mysql_* export, from the directory manifest when it has one"""
+    latest = ExportManifest(exports_dir).latest(EXPORT_NAME)
+    if latest:
+        return latest
+
+    # Exports written before the manifest existed: fall back to one directory scan
+    if not os.path.isdir(exports_dir):
+        return None
+    files = [entry.name for entry in os.scandir(exports_dir)
+             if entry.name.startswith(EXPORT_NAME + '_') and entry.name.endswith(('.json', '.jsonl', '.jsonl.gz'))]
+    return os.path.join(exports_dir, max(files)) if files else None
+
+
+def iter_export_rows(file_path: str, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Dict]:
+    """Rows of a JSON array or JSON Lines export, decoded one at a time"""
+    opener = gzip.open if file_path.endswith('.gz') else open
+    with opener(file_path, 'rt', encoding='utf-8') as f:
+        if file_path.endswith(('.jsonl', '.jsonl.gz')):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from iter_json_array(f, chunk_size)
+
+
+def iter_json_array(f, chunk_size: int = READ_CHUNK_SIZE) -> Iterator:
+    """Items of the top-level JSON array in f, read chunk by chunk"""
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = '', 0, False
+    started = False
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+            pos += 1
+
+        if pos < len(buffer):
+            if not started:
+                if buffer[pos] != '[':
+                    raise ValueError("Export is not a JSON array")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == ']':
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                end = None
+            # A value running to the end of the buffer may continue in the next chunk
+            if end is not None and (end < len(buffer) or eof):
+                yield item
+                pos = end
+                continue
+        elif eof:
+            raise ValueError("Export ended before the JSON array was closed")
+
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+
+def export_clean_tolls(exports_dir: str = "data/mysql_exports", output_dir: str = "data"):
     """Export clean toll data for external import"""
-    
+
     # Read latest MySQL export data
-    exports_dir = "data/mysql_exports"
-    files = [f for f in os.listdir(exports_dir) if f.startswith('tolls_mysql_') and f.endswith('.json')]
-    
-    if not files:
+    file_path = latest_export(exports_dir)
+
+    if not file_path:
         print("No toll data found")
         return
-    
-    latest_file = max(files)
-    file_path = os.path.join(exports_dir, latest_file)
-    
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    # Clean and format data
-    clean_tolls = []
-    
-    for toll in data:
-        # Skip page headers and empty data
-        if 'Página' in toll['route_segment'] or 'Dominio' in toll['route_segment']:
-            continue
-            
-        # Extract highway from route
-        route_parts = toll['route_segment'].split(' ')
-        highway = route_parts[0] if route_parts else 'Unknown'
-        
-        clean_tolls.append({
-            "highway": highway,
-            "route_segment": toll['route_segment'],
-            "vehicle_type": toll['vehicle_type'],
-            "price": toll['price'],
-            "currency": toll['currency'],
-            "validity_period": toll['validity_period'],
-            "source": toll['source'],
-            "scraped_at": toll['scraped_at'],
-            "status": "active"
-        })
-    
-    # Export to simple JSON
-    output_file = f"data/toll_import_{datetime.now().strftime('%Y%m%d')}.json"
-    
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(clean_tolls, f, indent=2, ensure_ascii=False)
-    
-    print(f"Exported {len(clean_tolls)} toll records to: {output_file}")
+
+    output_file = os.path.join(output_dir, f"toll_import_{datetime.now().strftime('%Y%m%d')}.json")
+    tmp_file = f"{output_file}.tmp"
+    count = 0
+
+    # Clean, format and write one row at a time, in the same layout as json.dump(indent=2)
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        f.write('[')
+
+        for toll in iter_export_rows(file_path):
+            # Skip page headers and empty data
+            if 'Página' in toll['route_segment'] or 'Dominio' in toll['route_segment']:
+                continue
+
+            # Extract highway from route
+            route_parts = toll['route_segment'].split(' ')
+            highway = route_parts[0] if route_parts else 'Unknown'
+
+            clean_toll = {
+                "highway": highway,
+                "route_segment": toll['route_segment'],
+                "vehicle_type": toll['vehicle_type'],
+                "price": toll['price'],
+                "currency": toll['currency'],
+                "validity_period": toll['validity_period'],
+                "source": toll['source'],
+                "scraped_at": toll['scraped_at'],
+                "status": "active"
+            }
+            item = json.dumps(clean_toll, indent=2, ensure_ascii=False).replace('\n', '\n  ')
+            f.write((',\n  ' if count else '\n  ') + item)
+            count += 1
+
+        f.write('\n]' if count else ']')
+
+    os.replace(tmp_file, output_file)
+    ExportManifest(output_dir).record('toll_import', output_file, count)
+
+    print(f"Exported {count} toll records to: {output_file}")
     return output_file
 
 if __name__ == "__main__":
-    export_clean_tolls()
\ No newline at end of file
+    export_clean_tolls()
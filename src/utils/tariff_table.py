@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+
+import logging
+import sys
+from array import array
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from .prices import parse_price
+
+logger = logging.getLogger(__name__)
+
+# Same column order as the CSV exports and the API payload
+FIELDS = ('route_segment', 'vehicle_type', 'price', 'currency', 'validity_period', 'source', 'scraped_at')
+STRING_FIELDS = ('route_segment', 'vehicle_type', 'currency', 'validity_period', 'source')
+DEFAULTS = {'route_segment': '', 'vehicle_type': '', 'currency': 'EUR', 'validity_period': '', 'source': ''}
+
+
+def _to_price(value) -> Optional[float]:
+    """float price, or None when value is not a price"""
+    return parse_price(value)
+
+
+class TariffRow(Mapping):
+    """Read-only dict-like view of one TariffTable row"""
+
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table: 'TariffTable', index: int):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, field: str):
+        return self._table.value(self._index, field)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(FIELDS)
+
+    def __len__(self) -> int:
+        return len(FIELDS)
+
+    def __repr__(self) -> str:
+        return f"TariffRow({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict:
+        return self._table.row_dict(self._index)
+
+
+class TariffTable:
+    """Column-oriented tariff rows in place of a list of dicts.
+
+    String columns hold array('I') codes into a shared pool of interned strings, prices
+    live in an array('d') and the whole table shares one scraped_at timestamp.
+    Rows are exposed as TariffRow views, which behave like the dicts they replace.
+    A row whose price cannot be parsed is not stored (it would read as a free toll);
+    dropped_rows counts them.
+    """
+
+    def __init__(self, scraped_at: str = None):
+        self.scraped_at = scraped_at or datetime.now().isoformat()
+        self._prices = array('d')
+        self._codes = {field: array('I') for field in STRING_FIELDS}
+        self._pool: List[str] = []
+        self._pool_index: Dict[str, int] = {}
+        self.dropped_rows = 0
+
+    @classmethod
+    def from_dicts(cls, rows: Iterable[Dict], scraped_at: str = None) -> 'TariffTable':
+        """Build a table from tariff dicts; the first row's scraped_at is kept for all rows"""
+        if isinstance(rows, TariffTable):
+            return rows
+
+        table = None
+        for row in rows:
+            if table is None:
+                table = cls(scraped_at or row.get('scraped_at'))
+            table.append_dict(row)
+        table = table if table is not None else cls(scraped_at)
+        table._log_dropped(table.dropped_rows)
+        return table
+
+    def append(self, route_segment: str, vehicle_type: str, price, currency: str = 'EUR',
+               validity_period: str = '', source: str = '') -> bool:
+        """Add a row; False (and nothing stored) if price is not a price"""
+        price = _to_price(price)
+        if price is None:
+            self.dropped_rows += 1
+            return False
+        values = (route_segment, vehicle_type, currency, validity_period, source)
+        for field, value in zip(STRING_FIELDS, values):
+            self._codes[field].append(self._intern(value))
+        self._prices.append(price)
+        return True
+
+    def append_dict(self, row: Dict) -> bool:
+        price = _to_price(row.get('price'))
+        if price is None:
+            self.dropped_rows += 1
+            return False
+        for field in STRING_FIELDS:
+            value = row.get(field)
+            self._codes[field].append(self._intern(DEFAULTS[field] if value is None else value))
+        self._prices.append(price)
+        return True
+
+    def extend(self, rows: Iterable[Dict]):
+        if isinstance(rows, TariffTable):
+            rows = rows.iter_dicts()
+        dropped = self.dropped_rows
+        for row in rows:
+            self.append_dict(row)
+        self._log_dropped(self.dropped_rows - dropped)
+
+    @staticmethod
+    def _log_dropped(count: int):
+        if count:
+            logger.warning(f"Dropped {count} tariff rows whose price could not be parsed")
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    def __iter__(self) -> Iterator[TariffRow]:
+        for index in range(len(self)):
+            yield TariffRow(self, index)
+
+    def __getitem__(self, index: int) -> TariffRow:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("TariffTable index out of range")
+        return TariffRow(self, index)
+
+    def value(self, index: int, field: str):
+        if field == 'price':
+            return self._prices[index]
+        if field == 'scraped_at':
+            return self.scraped_at
+        if field not in self._codes:
+            raise KeyError(field)
+        return self._pool[self._codes[field][index]]
+
+    def column(self, field: str) -> list:
+        if field == 'price':
+            return self._prices.tolist()
+        if field == 'scraped_at':
+            return [self.scraped_at] * len(self)
+        pool = self._pool
+        return [pool[code] for code in self._codes[field]]
+
+    def row_dict(self, index: int) -> Dict:
+        pool, codes = self._pool, self._codes
+        return {
+            'route_segment': pool[codes['route_segment'][index]],
+            'vehicle_type': pool[codes['vehicle_type'][index]],
+            'price': self._prices[index],
+            'currency': pool[codes['currency'][index]],
+            'validity_period': pool[codes['validity_period'][index]],
+            'source': pool[codes['source'][index]],
+            'scraped_at': self.scraped_at
+        }
+
+    def iter_dicts(self) -> Iterator[Dict]:
+        """Yield rows in the legacy dict format, one at a time"""
+        for index in range(len(self)):
+            yield self.row_dict(index)
+
+    def to_dicts(self) -> List[Dict]:
+        return list(self.iter_dicts())
+
+    def filter(self, predicate: Callable[[TariffRow], bool] = None, **equals) -> 'TariffTable':
+        """Rows matching every field=value given and the predicate, as a new table.
+
+        Equality on string fields compares pool codes, so no row strings are built.
+        """
+        wanted = {}
+        for field, value in equals.items():
+            if field not in self._codes:
+                raise KeyError(field)
+            code = self._pool_index.get(value)
+            if code is None:
+                return self._empty_like()
+            wanted[field] = code
+
+        result = self._empty_like()
+        for index in range(len(self)):
+            if any(self._codes[field][index] != code for field, code in wanted.items()):
+                continue
+            if predicate is not None and not predicate(TariffRow(self, index)):
+                continue
+            for field in STRING_FIELDS:
+                result._codes[field].append(self._codes[field][index])
+            result._prices.append(self._prices[index])
+        return result
+
+    def _empty_like(self) -> 'TariffTable':
+        # The pool is append-only, so a derived table can share it safely
+        table = TariffTable(self.scraped_at)
+        table._pool = self._pool
+        table._pool_index = self._pool_index
+        return table
+
+    def _intern(self, value) -> int:
+        value = sys.intern(str(value))
+        code = self._pool_index.get(value)
+        if code is None:
+            code = len(self._pool)
+            self._pool.append(value)
+            self._pool_index[value] = code
+        return code
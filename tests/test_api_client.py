@@ -0,0 +1,324 @@
+import gzip
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from src.utils.api_client import TollAPIClient
+from src.utils.instrumentation import Tracer
+from src.utils.delta_sync import DeltaSync
+from src.utils.outbox import Outbox
+
+
+class APIStandInHandler(BaseHTTPRequestHandler):
+    """Minimal stand-in for PUT /api/tolls/update"""
+    
+    protocol_version = 'HTTP/1.1'
+    received = []
+    fail_batches = set()
+    script = []
+    
+    def do_PUT(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        if self.script:
+            status, headers = self.script.pop(0)
+            self.received.append({'payload': None, 'headers': dict(self.headers), 'status': status})
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if self.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        payload = json.loads(body)
+        self.received.append({'payload': payload, 'headers': dict(self.headers)})
+        
+        batch = payload.get('batch', {}).get('index')
+        status = 500 if batch in self.fail_batches else 200
+        response = json.dumps({'success': status == 200, 'records_updated': len(payload['tolls'])}).encode()
+        
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+class TestTollAPIClient(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), APIStandInHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.env = {
+            'LARAVEL_API_URL': f"http://127.0.0.1:{cls.server.server_address[1]}/api",
+            'LARAVEL_API_TOKEN': 'test-token'
+        }
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+    
+    def setUp(self):
+        APIStandInHandler.received = []
+        APIStandInHandler.fail_batches = set()
+        APIStandInHandler.script = []
+        self.tmp_dir = tempfile.mkdtemp()
+        self.tolls = [{'route_segment': f'A1 {i:04d}', 'vehicle_type': 'Class 1', 'price': 1.5} for i in range(25)]
+    
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+    
+    def client(self, **kwargs):
+        with patch.dict(os.environ, self.env):
+            return TollAPIClient(**kwargs)
+    
+    def test_single_request(self):
+        result = self.client().send_toll_data(self.tolls)
+        
+        self.assertTrue(result['success'])
+        self.assertEqual(result['records_sent'], 25)
+        self.assertEqual(len(APIStandInHandler.received), 1)
+        self.assertEqual(APIStandInHandler.received[0]['headers']['Authorization'], 'Bearer test-token')
+    
+    def test_batched_gzip_upload(self):
+        result = self.client(batch_size=10, max_workers=2, compress=True).send_toll_data(self.tolls)
+        
+        self.assertTrue(result['success'])
+        self.assertEqual(result['records_sent'], 25)
+        self.assertEqual([batch['records_sent'] for batch in result['batches']], [10, 10, 5])
+        received = sorted(APIStandInHandler.received, key=lambda r: r['payload']['batch']['index'])
+        self.assertEqual([r['headers']['Content-Encoding'] for r in received], ['gzip'] * 3)
+        self.assertEqual(sum((r['payload']['tolls'] for r in received), []), self.tolls)
+    
+    def test_batched_delta(self):
+        deletes = [{'route_segment': f'A2 {i:04d}', 'vehicle_type': 'Class 1'} for i in range(12)]
+        result = self.client(batch_size=10, max_workers=2).send_toll_delta(self.tolls[:15], deletes)
+        
+        self.assertTrue(result['success'])
+        self.assertEqual(result['records_sent'], 27)
+        received = sorted(APIStandInHandler.received, key=lambda r: r['payload']['batch']['index'])
+        self.assertEqual([r['payload']['batch']['size'] for r in received], [10, 5, 10, 2])
+        self.assertTrue(all(r['payload']['sync_mode'] == 'delta' for r in received))
+        self.assertEqual(sum((r['payload']['tolls'] for r in received), []), self.tolls[:15])
+        self.assertEqual(sum((r['payload']['deleted'] for r in received), []), deletes)
+    
+    def test_batched_partial_failure(self):
+        APIStandInHandler.fail_batches = {1}
+        result = self.client(batch_size=10).send_toll_data(self.tolls)
+        
+        self.assertFalse(result['success'])
+        self.assertEqual(result['status_code'], 500)
+        self.assertEqual(result['records_sent'], 15)
+        self.assertIn('1 of 3 batches failed', result['error'])
+    
+    def test_batched_requests_are_traced_under_caller_span(self):
+        APIStandInHandler.fail_batches = {2}
+        tracer = Tracer()
+        with tracer.span('upload'):
+            self.client(batch_size=10, max_workers=3, tracer=tracer).send_toll_data(self.tolls)
+        
+        requests = tracer.finish()['children'][0]['children']
+        self.assertEqual(sorted(span['rows'] for span in requests), [5, 10, 10])
+        self.assertEqual(sorted(span['status_code'] for span in requests), [200, 200, 500])
+        self.assertTrue(all(span['bytes'] > 0 for span in requests))
+        self.assertEqual(sum(1 for span in requests if 'error' in span), 1)
+    
+    def test_stream_upload(self):
+        result = self.client(max_workers=2).send_toll_stream((toll for toll in self.tolls), batch_size=10)
+        
+        self.assertTrue(result['success'])
+        self.assertEqual(result['records_sent'], 25)
+        received = sorted(APIStandInHandler.received, key=lambda r: r['payload']['batch']['index'])
+        self.assertEqual([r['payload']['batch']['last'] for r in received], [False, False, True])
+        self.assertEqual(received[-1]['payload']['total_records'], 25)
+        self.assertEqual(sum((r['payload']['tolls'] for r in received), []), self.tolls)
+        self.assertEqual(self.client().send_toll_stream(iter([]))['records_sent'], 0)
+    
+    @patch('src.utils.api_client.time.sleep')
+    def test_retries_honour_retry_after(self, mock_sleep):
+        APIStandInHandler.script = [(503, {'Retry-After': '7'}), (429, {})]
+        
+        result = self.client(backoff_base=0.5).send_toll_data(self.tolls)
+        
+        self.assertTrue(result['success'])
+        self.assertEqual(mock_sleep.call_args_list[0][0][0], 7)
+        self.assertLessEqual(mock_sleep.call_args_list[1][0][0], 1.0)
+        keys = {r['headers']['Idempotency-Key'] for r in APIStandInHandler.received}
+        self.assertEqual(len(keys), 1)
+    
+    @patch('src.utils.api_client.time.sleep')
+    def test_gives_up_after_max_retries(self, mock_sleep):
+        APIStandInHandler.script = [(503, {})] * 3
+        
+        result = self.client(max_retries=2).send_toll_data(self.tolls)
+        
+        self.assertFalse(result['success'])
+        self.assertEqual(result['status_code'], 503)
+        self.assertEqual(mock_sleep.call_count, 2)
+    
+    @patch('src.utils.api_client.time.sleep')
+    def test_failed_payload_is_replayed_next_run(self, mock_sleep):
+        outbox = Outbox(os.path.join(self.tmp_dir, 'outbox.jsonl'))
+        APIStandInHandler.script = [(503, {})]
+        
+        first = self.client(max_retries=0, outbox=outbox).send_toll_data(self.tolls)
+        pending = outbox.pending()
+        summary = self.client(outbox=Outbox(outbox.path)).replay_outbox()
+        
+        self.assertFalse(first['success'])
+        self.assertEqual(len(pending), 1)
+        self.assertEqual(summary, {'pending': 1, 'replayed': 1, 'remaining': 0})
+        self.assertEqual(outbox.pending(), [])
+        self.assertEqual(APIStandInHandler.received[-1]['payload']['tolls'], self.tolls)
+        self.assertEqual(APIStandInHandler.received[-1]['headers']['Idempotency-Key'], pending[0]['id'])
+    
+    @patch('src.utils.api_client.time.sleep')
+    def test_accepted_full_send_supersedes_older_pending_payloads(self, mock_sleep):
+        outbox = Outbox(os.path.join(self.tmp_dir, 'outbox.jsonl'))
+        stale_delta = outbox.enqueue({'tolls': [{'route_segment': 'A1 0001', 'price': 9.9}], 'sync_mode': 'delta',
+                                      'deleted': [{'route_segment': 'A9', 'vehicle_type': 'Class 1'},
+                                                  {'route_segment': 'A1 0002', 'vehicle_type': 'Class 1'}]})
+        APIStandInHandler.script = [(503, {}), (503, {})]
+        
+        self.client(max_retries=0, outbox=outbox).send_toll_data(self.tolls[:5])
+        # Next run: the replay still fails, then the fresh upload goes through
+        client = self.client(max_retries=0, outbox=Outbox(outbox.path))
+        summary = client.replay_outbox()
+        result = client.send_toll_data(self.tolls)
+        
+        self.assertEqual(summary['replayed'], 0)
+        self.assertTrue(result['success'])
+        # The stale full payload and the delta's upserts are dropped; its delete of a row not in the upload stays
+        pending = outbox.pending()
+        self.assertEqual(len(pending), 1)
+        self.assertNotEqual(pending[0]['id'], stale_delta)
+        self.assertEqual(pending[0]['payload']['tolls'], [])
+        self.assertEqual(pending[0]['payload']['deleted'], [{'route_segment': 'A9', 'vehicle_type': 'Class 1'}])
+
+
+class TestOutbox(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.outbox = Outbox(os.path.join(self.tmp_dir, 'outbox', 'outbox.jsonl'))
+    
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+    
+    def test_ack_and_compact(self):
+        first = self.outbox.enqueue({'tolls': [1]})
+        second = self.outbox.enqueue({'tolls': [2]})
+        self.outbox.ack(first)
+        self.outbox.compact()
+        
+        self.assertEqual([entry['id'] for entry in self.outbox.pending()], [second])
+        self.outbox.ack(second)
+        self.outbox.compact()
+        self.assertFalse(os.path.exists(self.outbox.path))
+    
+    def test_torn_write_does_not_corrupt_later_records(self):
+        entry_id = self.outbox.enqueue({'tolls': [1]})
+        with open(self.outbox.path, 'a') as f:
+            f.write('{"op": "enqueue", "id": "torn", "payl')
+        later = self.outbox.enqueue({'tolls': [2]})
+        
+        self.assertEqual([entry['id'] for entry in self.outbox.pending()], [entry_id, later])
+
+
+class TestDeltaSync(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.snapshot_path = os.path.join(self.tmp_dir, 'api_snapshot.json')
+        self.api_client = Mock()
+        self.api_client.send_toll_data.return_value = {'success': True}
+        self.api_client.send_toll_delta.return_value = {'success': True}
+        self.rows = [
+            {'route_segment': 'A1', 'vehicle_type': 'Class 1', 'validity_period': '2025', 'price': 1.0, 'scraped_at': 't1'},
+            {'route_segment': 'A2', 'vehicle_type': 'Class 1', 'validity_period': '2025', 'price': 2.0, 'scraped_at': 't1'},
+            {'route_segment': 'A3', 'vehicle_type': 'Class 1', 'validity_period': '2025', 'price': 3.0, 'scraped_at': 't1'}
+        ]
+    
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+    
+    def sync(self, rows, **kwargs):
+        delta_sync = DeltaSync(self.snapshot_path, 'http://api')
+        result = delta_sync.sync(self.api_client, rows, **kwargs)
+        return delta_sync.summary, result
+    
+    def test_first_run_is_full_sync(self):
+        summary, _ = self.sync(self.rows)
+        
+        self.assertEqual(summary['mode'], 'full')
+        self.api_client.send_toll_data.assert_called_once_with(self.rows)
+    
+    def test_sends_only_changes(self):
+        self.sync(self.rows)
+        changed = [dict(self.rows[0], scraped_at='t2'), dict(self.rows[1], price=2.5),
+                   {'route_segment': 'A4', 'vehicle_type': 'Class 1', 'validity_period': '2025', 'price': 4.0}]
+        
+        summary, _ = self.sync(changed)
+        
+        self.assertEqual(summary, {'mode': 'delta', 'inserts': 1, 'updates': 1, 'deletes': 1, 'unchanged': 1})
+        upserts, deletes = self.api_client.send_toll_delta.call_args[0]
+        self.assertEqual([row['route_segment'] for row in upserts], ['A2', 'A4'])
+        self.assertEqual(deletes, [{'route_segment': 'A3', 'vehicle_type': 'Class 1', 'validity_period': '2025'}])
+    
+    def test_repeated_keys_keep_last_row(self):
+        self.sync(self.rows + [dict(self.rows[0], price=1.5)])
+        self.assertEqual(self.api_client.send_toll_data.call_args[0][0][0]['price'], 1.5)
+        
+        summary, _ = self.sync([dict(self.rows[0], price=9.0)] + self.rows)
+        
+        self.assertEqual(summary, {'mode': 'delta', 'inserts': 0, 'updates': 1, 'deletes': 0, 'unchanged': 2})
+        upserts, _ = self.api_client.send_toll_delta.call_args[0]
+        self.assertEqual(upserts, [self.rows[0]])
+    
+    def test_no_changes_skips_api(self):
+        self.sync(self.rows)
+        summary, result = self.sync(self.rows)
+        
+        self.assertTrue(result['success'])
+        self.assertEqual(result['records_sent'], 0)
+        self.api_client.send_toll_delta.assert_not_called()
+    
+    def test_failed_send_keeps_previous_snapshot(self):
+        self.sync(self.rows)
+        self.api_client.send_toll_delta.return_value = {'success': False}
+        self.sync(self.rows[:1])
+        self.api_client.send_toll_delta.return_value = {'success': True}
+        
+        summary, _ = self.sync(self.rows[:1])
+        
+        self.assertEqual(summary['deletes'], 2)
+    
+    def test_tampered_snapshot_forces_full_sync(self):
+        self.sync(self.rows)
+        with open(self.snapshot_path) as f:
+            snapshot = json.load(f)
+        snapshot['rows'].popitem()
+        with open(self.snapshot_path, 'w') as f:
+            json.dump(snapshot, f)
+        
+        summary, _ = self.sync(self.rows)
+        
+        self.assertEqual(summary['mode'], 'full')
+        self.assertEqual(self.sync(self.rows, full=True)[0]['reason'], 'requested')
+
+
+if __name__ == '__main__':
+    unittest.main()
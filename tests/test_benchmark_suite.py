@@ -0,0 +1,28 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from benchmarks.suite import compare_results
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+
+    @staticmethod
+    def _results(seconds, rss, rows=1000):
+        return {'stages': {'export_csv': {'params': {'export_rows': rows}, 'seconds': seconds, 'peak_rss_mib': rss}}}
+
+    def test_flags_slower_and_larger_stages(self):
+        baseline = self._results(1.0, 100.0)
+        self.assertEqual(compare_results(self._results(1.2, 110.0), baseline, 0.25), [])
+        self.assertEqual(compare_results(self._results(1.3, 130.0), baseline, 0.25),
+                         [('export_csv', 'seconds', 1.0, 1.3), ('export_csv', 'peak_rss_mib', 100.0, 130.0)])
+
+    def test_skips_stages_measured_differently(self):
+        self.assertEqual(compare_results(self._results(9.0, 900.0, rows=5000), self._results(1.0, 100.0), 0.25), [])
+        self.assertEqual(compare_results(self._results(9.0, 900.0), {'stages': {}}, 0.25), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
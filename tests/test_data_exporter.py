@@ -0,0 +1,82 @@
+import csv
+import gzip
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from src.utils.data_exporter import DataExporter, TARIFF_FIELDS
+from src.utils.instrumentation import Tracer
+
+
+class TestDataExporter(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.exporter = DataExporter(self.tmp_dir)
+        self.tariffs = [
+            {'route_segment': 'A1 Lisboa-Porto', 'vehicle_type': 'Class 1', 'price': '22.85', 'currency': 'EUR'},
+            {'route_segment': 'A2 Lisboa-Algarve', 'vehicle_type': 'Class 2', 'price': 27.9, 'pdf_path': 'x.pdf'}
+        ]
+    
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+    
+    def test_export_to_json_matches_json_dump(self):
+        path = self.exporter.export_to_json(self.tariffs, 'tolls.json')
+        
+        with open(path, encoding='utf-8') as f:
+            content = f.read()
+        document = json.loads(content)
+        expected = json.dumps({'scraped_at': document['scraped_at'], 'total_tariffs': 2, 'tariffs': self.tariffs},
+                              indent=2, ensure_ascii=False)
+        self.assertEqual(content, expected)
+    
+    def test_stream_to_json_counts_generator_rows(self):
+        path = self.exporter.stream_to_json((row for row in self.tariffs), 'tolls.json')
+        
+        with open(path, encoding='utf-8') as f:
+            document = json.load(f)
+        self.assertEqual(document['total_tariffs'], 2)
+        self.assertEqual(document['tariffs'], self.tariffs)
+    
+    def test_stream_to_csv_fixed_schema_handles_heterogeneous_rows(self):
+        path = self.exporter.stream_to_csv(iter(self.tariffs), 'tolls.csv')
+        
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(list(rows[0].keys()), TARIFF_FIELDS)
+        self.assertEqual(rows[1]['price'], '27.9')
+        self.assertEqual(rows[1]['currency'], '')
+    
+    def test_stream_to_jsonl_gzip(self):
+        path = self.exporter.stream_to_jsonl(iter(self.tariffs), 'tolls.jsonl', compression='gzip')
+        
+        self.assertTrue(path.endswith('.jsonl.gz'))
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            self.assertEqual([json.loads(line) for line in f], self.tariffs)
+
+    def test_exports_update_manifest(self):
+        self.exporter.stream_to_jsonl(iter(self.tariffs), 'first.jsonl')
+        latest = self.exporter.stream_to_jsonl(iter(self.tariffs[:1]), 'second.jsonl')
+
+        self.assertEqual(self.exporter.manifest.latest('jsonl'), latest)
+        self.assertEqual(self.exporter.manifest.entry('jsonl')['records'], 1)
+        self.assertIsNone(self.exporter.manifest.latest('csv'))
+
+    def test_exports_are_traced(self):
+        tracer = Tracer()
+        exporter = DataExporter(self.tmp_dir, tracer=tracer)
+        path = exporter.stream_to_csv(iter(self.tariffs), 'tolls.csv')
+
+        span = tracer.finish()['children'][0]
+        self.assertEqual(span['name'], 'export.csv')
+        self.assertEqual((span['rows'], span['bytes']), (2, os.path.getsize(path)))
+
+
+if __name__ == '__main__':
+    unittest.main()
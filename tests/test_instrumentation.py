@@ -0,0 +1,86 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from src.utils.instrumentation import Tracer, format_tree
+
+
+class TestTracer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_spans_nest_and_record_counters(self):
+        tracer = Tracer()
+        with tracer.span('export') as export:
+            with tracer.span('export.csv') as span:
+                span.set(bytes=120)
+                span.add(rows=2)
+                span.add(rows=3)
+        with self.assertRaises(RuntimeError):
+            with tracer.span('upload'):
+                raise RuntimeError("boom")
+
+        tree = tracer.finish()
+        self.assertEqual([child['name'] for child in tree['children']], ['export', 'upload'])
+        csv_span = tree['children'][0]['children'][0]
+        self.assertEqual((csv_span['rows'], csv_span['bytes']), (5, 120))
+        self.assertGreaterEqual(export.seconds, csv_span['seconds'])
+        self.assertIn('rss_delta_bytes', csv_span)
+        self.assertEqual(tree['children'][1]['error'], "RuntimeError: boom")
+
+    def test_wrap_carries_parent_to_other_threads(self):
+        tracer = Tracer()
+        with tracer.span('upload'):
+            worker = threading.Thread(target=tracer.wrap(lambda: self._traced_request(tracer)))
+            worker.start()
+            worker.join()
+        unwrapped = threading.Thread(target=lambda: self._traced_request(tracer))
+        unwrapped.start()
+        unwrapped.join()
+
+        tree = tracer.finish()
+        self.assertEqual([child['name'] for child in tree['children']], ['upload', 'api.request'])
+        self.assertEqual(tree['children'][0]['children'][0]['name'], 'api.request')
+
+    @staticmethod
+    def _traced_request(tracer):
+        with tracer.span('api.request', rows=10):
+            pass
+
+    def test_disabled_tracer_records_nothing(self):
+        tracer = Tracer(enabled=False)
+        with tracer.span('export') as span:
+            span.set(rows=1)
+            span.add(bytes=10)
+        tracer.record('pdf.page', 0.1)
+        self.assertIsNone(tracer.finish())
+        self.assertIsNone(tracer.write_prometheus(os.path.join(self.tmp_dir, 'run.prom')))
+
+    def test_prometheus_textfile_sums_repeated_spans(self):
+        tracer = Tracer()
+        with tracer.span('pdf.parse'):
+            tracer.record('pdf.page', 0.25, page=1, rows=10)
+            tracer.record('pdf.page', 0.5, page=2, rows=5)
+        path = tracer.write_prometheus(os.path.join(self.tmp_dir, 'textfile', 'toll_scraper.prom'))
+
+        with open(path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        self.assertIn('toll_scraper_span_seconds{span="run/pdf.parse/pdf.page"} 0.75', lines)
+        self.assertIn('toll_scraper_span_count{span="run/pdf.parse/pdf.page"} 2', lines)
+        self.assertIn('toll_scraper_span_rows{span="run/pdf.parse/pdf.page"} 15', lines)
+        self.assertIn('# TYPE toll_scraper_span_seconds gauge', lines)
+        self.assertFalse(os.path.exists(path + '.tmp'))
+        self.assertTrue(list(format_tree(tracer.finish()))[2].startswith('    pdf.page  0.250s'))
+
+
+if __name__ == '__main__':
+    unittest.main()
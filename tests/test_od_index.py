@@ -0,0 +1,77 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from src.parsers.od_index import ODIndex, split_location
+
+
+class TestODIndex(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.toll_data = {
+            'A1 0000: Lisboa-Leiria': [
+                {'route': 'A1 0000: Lisboa-Leiria', 'vehicle_class': 'Class 1', 'price': '2.13', 'currency': 'EUR'},
+                {'route': 'A1 0000: Lisboa-Leiria', 'vehicle_class': 'Class 2', 'price': '3.40', 'currency': 'EUR'}
+            ],
+            'A3 Porto-Valença': [
+                {'route': 'A3 Porto-Valença', 'vehicle_class': 'Class 1', 'price': '8.45', 'currency': 'EUR'}
+            ],
+            'A8 Lisboa - Leiria': [
+                {'route': 'A8 Lisboa - Leiria', 'vehicle_class': 'Class 1', 'price': '1.95', 'currency': 'EUR'}
+            ],
+            'A1 Coimbra': [
+                {'route': 'A1 Coimbra', 'vehicle_class': 'Class 1', 'price': '1.00', 'currency': 'EUR'}
+            ]
+        }
+        self.index = ODIndex.from_parsed(self.toll_data)
+    
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+    
+    def test_split_location(self):
+        self.assertEqual(split_location('A1 0000: Lisboa-Leiria'), ('A1', 'Lisboa', 'Leiria'))
+        self.assertEqual(split_location('A2 Lisboa - Algarve'), ('A2', 'Lisboa', 'Algarve'))
+        self.assertIsNone(split_location('A1 Coimbra'))
+        self.assertIsNone(split_location('Página 1 Dominio Brisa'))
+    
+    def test_point_lookup(self):
+        self.assertEqual(self.index.lookup('Lisboa', 'Leiria', 'Class 2', highway='A1'), 3.4)
+        self.assertEqual(self.index.lookup('porto', 'VALENCA', 1), 8.45)
+        self.assertIsNone(self.index.lookup('Lisboa', 'Leiria', 3, highway='A1'))
+        # Two highways price Lisboa-Leiria differently, so the highway is required
+        self.assertIsNone(self.index.lookup('Lisboa', 'Leiria', 1))
+        self.assertEqual(self.index.skipped, 1)
+    
+    def test_lookup_many(self):
+        queries = [('A1', 'Lisboa', 'Leiria', 1), ('a8', 'Lisboa', 'Leiria', 'Classe 1'),
+                   (None, 'Porto', 'Valença', 'Class 1'), ('A9', 'Faro', 'Lagos', 1)]
+        
+        self.assertEqual(self.index.lookup_many(queries), [2.13, 1.95, 8.45, None])
+    
+    def test_prefix_search(self):
+        self.assertEqual(self.index.search_plazas('le'), ['Leiria'])
+        self.assertEqual(self.index.search_plazas('L'), ['Leiria', 'Lisboa'])
+        self.assertEqual(self.index.search_plazas('val'), ['Valença'])
+        self.assertEqual(self.index.search_plazas('x'), [])
+    
+    def test_save_and_load(self):
+        path = self.index.save(os.path.join(self.tmp_dir, 'od_index.pickle'))
+        loaded = ODIndex.load(path)
+        
+        self.assertEqual(len(loaded), len(self.index))
+        self.assertEqual(loaded.lookup('Lisboa', 'Leiria', 1, highway='A8'), 1.95)
+        self.assertEqual(loaded.search_plazas('p'), ['Porto'])
+        self.assertIsNone(ODIndex.load(os.path.join(self.tmp_dir, 'missing.pickle')))
+        
+        with open(path, 'wb') as f:
+            f.write(b'not a pickle')
+        self.assertIsNone(ODIndex.load(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
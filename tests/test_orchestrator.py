@@ -0,0 +1,97 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from src.scrapers.orchestrator import ScraperOrchestrator
+
+
+def row(route, source):
+    return {'route_segment': route, 'vehicle_type': 'Class 1', 'validity_period': '2025', 'source': source}
+
+
+def source(result, delay=0.0, calls=None):
+    def run(cancel_event):
+        if calls is not None:
+            calls.append(result)
+        if cancel_event.wait(delay):
+            return []
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return run
+
+
+class TestScraperOrchestrator(unittest.TestCase):
+    
+    def test_fallback_runs_next_source_only_when_empty(self):
+        calls = []
+        orchestrator = ScraperOrchestrator('fallback')
+        orchestrator.register('brisa', source([row('A1', 'brisa')], calls=calls))
+        orchestrator.register('portugal_tolls', source([row('A2', 'pt')], calls=calls))
+        
+        self.assertEqual(orchestrator.run(), [row('A1', 'brisa')])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(orchestrator.report['portugal_tolls']['status'], 'skipped')
+        
+        orchestrator = ScraperOrchestrator('fallback')
+        orchestrator.register('brisa', source([]))
+        orchestrator.register('portugal_tolls', source([row('A2', 'pt')]))
+        
+        self.assertEqual(orchestrator.run(), [row('A2', 'pt')])
+        self.assertEqual(orchestrator.report['brisa']['status'], 'empty')
+    
+    def test_primary_returns_without_waiting_for_slow_fallback(self):
+        orchestrator = ScraperOrchestrator('primary')
+        orchestrator.register('brisa', source([row('A1', 'brisa')]))
+        orchestrator.register('portugal_tolls', source([row('A2', 'pt')], delay=5))
+        
+        start = time.monotonic()
+        result = orchestrator.run()
+        
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(result, [row('A1', 'brisa')])
+        self.assertEqual(orchestrator.report['portugal_tolls']['status'], 'cancelled')
+    
+    def test_stuck_source_times_out(self):
+        orchestrator = ScraperOrchestrator('primary')
+        orchestrator.register('brisa', source([row('A1', 'brisa')], delay=5), timeout=0.1)
+        orchestrator.register('portugal_tolls', source([row('A2', 'pt')]), timeout=1)
+        
+        self.assertEqual(orchestrator.run(), [row('A2', 'pt')])
+        self.assertEqual(orchestrator.report['brisa']['status'], 'timeout')
+    
+    def test_rows_from_cancelled_source_are_ignored(self):
+        release = threading.Event()
+        orchestrator = ScraperOrchestrator('merge')
+        orchestrator.register('brisa', lambda cancel_event: release.wait(5) and [row('A1', 'brisa')])
+        orchestrator.report = {'brisa': {'status': 'skipped', 'records': 0, 'seconds': 0.0}}
+        brisa = orchestrator._sources[0]
+        
+        future = orchestrator._start(brisa)
+        orchestrator._cancel(brisa)
+        release.set()
+        
+        self.assertEqual(orchestrator._wait(brisa, future), [])
+        self.assertEqual(orchestrator.report['brisa']['status'], 'cancelled')
+        self.assertEqual(orchestrator.report['brisa']['records'], 0)
+    
+    def test_merge_prefers_higher_priority_rows(self):
+        orchestrator = ScraperOrchestrator('merge')
+        orchestrator.register('brisa', source([row('A1', 'brisa')]))
+        orchestrator.register('portugal_tolls', source([row('A1', 'pt'), row('A2', 'pt')]))
+        orchestrator.register('broken', source(RuntimeError('boom')))
+        
+        self.assertEqual(orchestrator.run(), [row('A1', 'brisa'), row('A2', 'pt')])
+        self.assertEqual(orchestrator.report['broken']['status'], 'error')
+    
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            ScraperOrchestrator('fastest')
+
+
+if __name__ == '__main__':
+    unittest.main()
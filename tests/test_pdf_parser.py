@@ -0,0 +1,208 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from benchmarks.fixtures import write_tariff_pdf
+from src.parsers.layout_cache import TableLayoutCache
+from src.parsers.parse_cache import ParseCache
+from src.parsers.pdf_parser import PDFParser, classify_line
+
+
+class TestPDFParser(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        cls.pdf_path = write_tariff_pdf(os.path.join(cls.tmp_dir, 'tariffs.pdf'), pages=6, rows_per_page=5)
+    
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir, ignore_errors=True)
+    
+    def test_parse_fixture_pdf(self):
+        result = PDFParser().parse_brisa_pdf(self.pdf_path)
+        
+        self.assertIn('A1 0000: Lisboa-Leiria', result)
+        self.assertEqual(len(result['A1 0000: Lisboa-Leiria']), 5)
+        self.assertEqual(result['A1 0000: Lisboa-Leiria'][0]['price'], '2.13')
+    
+    def test_parallel_matches_serial(self):
+        serial = PDFParser().parse_brisa_pdf(self.pdf_path)
+        parallel = PDFParser(parallel=True, workers=2, chunk_size=2).parse_brisa_pdf(self.pdf_path)
+        
+        self.assertEqual(list(serial.keys()), list(parallel.keys()))
+        self.assertEqual(serial, parallel)
+    
+    def test_iter_brisa_pdf_streams_same_records(self):
+        parser = PDFParser()
+        page_path = write_tariff_pdf(os.path.join(self.tmp_dir, 'one_page.pdf'), pages=1, rows_per_page=5)
+        parsed = parser.parse_brisa_pdf(page_path)
+        streamed = list(parser.iter_brisa_pdf(page_path))
+        
+        self.assertEqual(streamed, [row for rows in parsed.values() for row in rows])
+        keys = [(row['route'], row['vehicle_class']) for row in streamed]
+        self.assertEqual(len(keys), len(set(keys)))
+        
+        # A location found by both the text and the table pass of a page is streamed once
+        text_rows = [{'route': 'A1 Lisboa', 'vehicle_class': 'Class 1', 'price': '2.00', 'currency': 'EUR'}]
+        table_rows = [{'route': 'A1 Lisboa', 'vehicle_class': 'Class 1', 'price': '2.05', 'currency': 'EUR'}]
+        with patch.object(parser, '_parse_page', return_value=[{'A1 Lisboa': text_rows}, {'A1 Lisboa': table_rows}]):
+            self.assertEqual(list(parser.iter_brisa_pdf(page_path)), table_rows)
+        
+        tariffs = list(parser.iter_tariffs(page_path))
+        self.assertEqual(len(tariffs), len(streamed))
+        self.assertEqual(tariffs[0]['route_segment'], 'A1 0000: Lisboa-Leiria')
+        self.assertEqual(tariffs[0]['source'], 'Brisa PDF')
+    
+    def test_cancelled_parallel_parse_returns_without_waiting(self):
+        cancel_event = threading.Event()
+        cancel_event.set()
+        parser = PDFParser(parallel=True, workers=2, chunk_size=2)
+        
+        with patch('src.parsers.pdf_parser.ProcessPoolExecutor') as executor:
+            self.assertEqual(parser.parse_brisa_pdf(self.pdf_path, cancel_event), {})
+        
+        executor.return_value.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+    
+    def test_iter_brisa_pdf_stops_when_cancelled(self):
+        cancel_event = threading.Event()
+        records = PDFParser().iter_brisa_pdf(self.pdf_path, cancel_event)
+        first = next(records)
+        cancel_event.set()
+        
+        self.assertLess(len([first] + list(records)), len(list(PDFParser().iter_brisa_pdf(self.pdf_path))))
+    
+    def test_table_only_reuses_cached_layouts(self):
+        layout_path = os.path.join(self.tmp_dir, 'table_layouts.json')
+        full = PDFParser().parse_brisa_pdf(self.pdf_path)
+        
+        cold = PDFParser(table_only=True, layout_cache=TableLayoutCache(layout_path))
+        result = cold.parse_brisa_pdf(self.pdf_path)
+        warm = PDFParser(table_only=True, layout_cache=TableLayoutCache(layout_path))
+        self.assertEqual(warm.parse_brisa_pdf(self.pdf_path), result)
+        
+        # Only table rows come back, identical to the full pass
+        self.assertTrue(result)
+        self.assertNotIn('A1 0000: Lisboa-Leiria', result)
+        self.assertEqual({location: full[location] for location in result}, result)
+        self.assertEqual([timing['mode'] for timing in cold.page_timings], ['detected'] + ['cropped'] * 5)
+        self.assertEqual([timing['mode'] for timing in warm.page_timings], ['cropped'] * 6)
+    
+    def test_table_only_falls_back_to_text(self):
+        pdf_path = write_tariff_pdf(os.path.join(self.tmp_dir, 'text_only.pdf'), pages=1, rows_per_page=3,
+                                    with_table=False)
+        parser = PDFParser(table_only=True)
+        
+        self.assertIn('A1 0000: Lisboa-Leiria', parser.parse_brisa_pdf(pdf_path))
+        self.assertEqual(parser.page_timings[0]['mode'], 'text')
+
+
+class TestLineClassifier(unittest.TestCase):
+    
+    def setUp(self):
+        self.parser = PDFParser()
+    
+    def test_classify_line(self):
+        self.assertEqual(classify_line('A1 0000: Lisboa-Leiria'), 'highway')
+        self.assertEqual(classify_line('A44 Gaia-Porto'), 'highway')
+        self.assertEqual(classify_line('CA15 Porto'), 'plaza')
+        self.assertEqual(classify_line('A100 Test'), 'plaza')
+        self.assertEqual(classify_line('Página 3 Dominio Brisa'), 'noise')
+        self.assertEqual(classify_line('Página 3 A1'), 'noise')
+        self.assertEqual(classify_line('2,13€ 3,40€'), 'prices')
+        self.assertEqual(classify_line('Lisboa Norte'), 'plaza')
+        self.assertEqual(classify_line(''), 'blank')
+    
+    def test_text_content_matches_previous_output(self):
+        text = "Página 1 Dominio Brisa\nA1 0000: Lisboa-Leiria\nLisboa Norte\n2,13€ 3,40€ 5€\n\nA2 0001: Porto-Faro\n€1,05 x€ 2.5€"
+        
+        self.assertEqual(self.parser._parse_text_content(text), {
+            'A1 0000: Lisboa-Leiria': [
+                {'route': 'A1 0000: Lisboa-Leiria', 'vehicle_class': 'Class 1', 'price': '2.13', 'currency': 'EUR'},
+                {'route': 'A1 0000: Lisboa-Leiria', 'vehicle_class': 'Class 2', 'price': '3.40', 'currency': 'EUR'},
+                {'route': 'A1 0000: Lisboa-Leiria', 'vehicle_class': 'Class 3', 'price': '5.00', 'currency': 'EUR'}
+            ],
+            'A2 0001: Porto-Faro': [
+                {'route': 'A2 0001: Porto-Faro', 'vehicle_class': 'Class 1', 'price': '1.05', 'currency': 'EUR'},
+                {'route': 'A2 0001: Porto-Faro', 'vehicle_class': 'Class 2', 'price': '2.50', 'currency': 'EUR'}
+            ]
+        })
+    
+    def test_text_content_fixes(self):
+        result = self.parser._parse_text_content("A12 Setúbal-Montijo\n2,13 € 3,40 €\nCA15 Porto\n1.234,56€ 7€")
+        
+        # A12 is its own highway, "CA15" is not one, spaced prices are read, digit groups are thousands
+        self.assertEqual(list(result), ['A12 Setúbal-Montijo'])
+        self.assertEqual([row['price'] for row in result['A12 Setúbal-Montijo']], ['2.13', '3.40', '1234.56', '7.00'])
+    
+    def test_table_content(self):
+        table = [
+            ['Plaza', 'Classe 1', 'Classe 2', 'Classe 3'],
+            ['A1 Lisboa', '2,13 €', 'n/a', '€ 4,20'],
+            ['A25 Aveiro', '1,10 €', '1.234,56 €', ''],
+            ['Total', '9,99 €', '', '']
+        ]
+        
+        result = self.parser._parse_table_content(table)
+        
+        self.assertEqual(list(result), ['A1 Lisboa', 'A25 Aveiro'])
+        self.assertEqual([(row['vehicle_class'], row['price']) for row in result['A1 Lisboa']],
+                         [('Class 1', '2.13'), ('Class 3', '4.20')])
+        self.assertEqual([row['price'] for row in result['A25 Aveiro']], ['1.10', '1234.56'])
+
+
+class TestParseCache(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.pdf_path = write_tariff_pdf(os.path.join(self.tmp_dir, 'tariffs.pdf'), pages=2, rows_per_page=3)
+        self.cache = ParseCache(cache_dir=os.path.join(self.tmp_dir, 'cache'), parser_version=PDFParser.VERSION)
+    
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+    
+    def test_repeat_parse_uses_cache(self):
+        parser = PDFParser(cache=self.cache)
+        first = parser.parse_brisa_pdf(self.pdf_path)
+        
+        with patch('src.parsers.pdf_parser.pdfplumber.open', side_effect=AssertionError('re-parsed')):
+            second = parser.parse_brisa_pdf(self.pdf_path)
+        
+        self.assertEqual(first, second)
+    
+    def test_invalidate(self):
+        digest = ParseCache.file_digest(self.pdf_path)
+        self.cache.put(digest, {'A1': []})
+        
+        self.assertEqual(self.cache.invalidate(digest), 1)
+        self.assertIsNone(self.cache.get(digest))
+    
+    def test_evicts_oldest_when_over_size(self):
+        self.cache.max_bytes = 100
+        self.cache.max_age_days = 10 ** 6
+        self.cache.put('old', {'A1': ['x' * 60]})
+        os.utime(self.cache._entry_path('old'), (0, 0))
+        self.cache.put('new', {'A2': ['y' * 60]})
+        
+        self.assertIsNone(self.cache.get('old'))
+        self.assertIsNotNone(self.cache.get('new'))
+    
+    def test_cli_defaults_to_configured_cache(self):
+        from config.settings import PARSE_CACHE_SETTINGS
+        from src.parsers import parse_cache
+        
+        with patch.object(sys, 'argv', ['parse_cache', 'evict']), \
+                patch.object(parse_cache, 'ParseCache') as cache_class, patch('builtins.print'):
+            parse_cache.main()
+        
+        cache_class.assert_called_once_with(**PARSE_CACHE_SETTINGS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from src.utils import prices
+from src.utils.prices import canonical_price, find_price_tokens, normalize_prices, parse_price, parse_prices
+
+
+class TestPrices(unittest.TestCase):
+
+    def test_separators(self):
+        cases = [
+            ('2,13', '2.13'),
+            ('2.13 €', '2.13'),
+            ('€ 4,20', '4.20'),
+            ('22,85 EUR', '22.85'),
+            ('1.234,56', '1234.56'),
+            ('1,234.56', '1234.56'),
+            ('1 234,56 €', '1234.56'),
+            ('1.234.567,89', '1234567.89'),
+            ('1.234.567', '1234567'),
+            ('1.234', '1.234'),
+            ('12,345', '12.345'),
+            ('0,125', '0.125'),
+            ('€€5,', '5.'),
+            ('7', '7'),
+            (3, '3.0'),
+            ('1.234.5', None),
+            ('1,234,56', None),
+            ('2€13', None),
+            ('1e5', None),
+            ('nan', None),
+            ('n/a', None),
+            ('', None),
+            (None, None)
+        ]
+        for value, expected in cases:
+            with self.subTest(value=value):
+                self.assertEqual(canonical_price(value), expected)
+
+    def test_search_finds_amount_in_annotated_cells(self):
+        cells = ['from 2,50 €', '2,50€/trip', '€ 2.50 (Class 1)', '2.50 €*', 'Price: 1.234,56 €.', 'n/a', '1.234.5']
+        self.assertEqual(normalize_prices(cells, search=True), ['2.50'] * 4 + ['1234.56', None, None])
+        self.assertEqual(normalize_prices(cells), [None] * 7)
+        self.assertEqual(canonical_price('from 2,50 €', search=True), '2.50')
+
+    def test_parse_prices_mask_and_cents(self):
+        values, valid = parse_prices(['2,13', 'n/a', '1.234,56 €', 2.5], use_numpy=False)
+        self.assertEqual(values.tolist(), [2.13, 0.0, 1234.56, 2.5])
+        self.assertEqual(valid.tolist(), [1, 0, 1, 1])
+
+        cents, _ = parse_prices(['2,13', '0,125', '19.99'], cents=True, use_numpy=False)
+        self.assertEqual(cents.tolist(), [213, 12, 1999])
+
+    def test_batched_chunks_match_single_values(self):
+        column = ['2,13 €', '€22.85', ' 7 ', '5.', '1.234,56 €', 'n/a', '', None, 3, '2€13', '1e5', '2,13\n']
+        # One odd value sends its chunk down the value-by-value path; plain chunks take the joined-string path
+        for chunk in ([value] for value in column):
+            values, valid = parse_prices(chunk, use_numpy=False)
+            expected = parse_price(chunk[0])
+            self.assertEqual((values[0], bool(valid[0])), (expected or 0.0, expected is not None))
+        values, valid = parse_prices(column * 1000, use_numpy=False)
+        self.assertEqual(values.tolist()[:len(column)], [parse_price(value) or 0.0 for value in column])
+        self.assertEqual(sum(valid), 7000)
+
+    @unittest.skipIf(prices.np is None, "numpy not installed")
+    def test_numpy_matches_pure_python(self):
+        column = ['2,13', 'n/a', '1.234,56 €', '€0,99'] * 300
+        for cents in (False, True):
+            values, valid = parse_prices(column, cents=cents, use_numpy=True)
+            expected, expected_valid = parse_prices(column, cents=cents, use_numpy=False)
+            self.assertEqual(values.tolist(), expected.tolist())
+            self.assertEqual([bool(ok) for ok in valid.tolist()], [bool(ok) for ok in expected_valid.tolist()])
+
+    def test_scalar_and_text_helpers(self):
+        self.assertEqual(parse_price('1.234,56 €'), 1234.56)
+        self.assertIsNone(parse_price('gratuito'))
+        self.assertEqual(normalize_prices(['2,1 €', 'x', 7]), ['2.10', None, '7.00'])
+        # Sub-cent amounts keep their digits rather than being rounded
+        self.assertEqual(normalize_prices(['1.234', '0,125 €', '19.99']), ['1.234', '0.125', '19.99'])
+        self.assertEqual(find_price_tokens('1.234,56€ 7 € €2,13 3,40'), ['1.234,56', '7', '2,13'])
+
+
+if __name__ == '__main__':
+    unittest.main()
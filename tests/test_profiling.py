@@ -0,0 +1,102 @@
+import os
+import pstats
+import shutil
+import sys
+import re
+import tempfile
+import threading
+import tracemalloc
+import unittest
+from contextlib import nullcontext
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from src.utils.profiling import StageProfiler
+
+
+def allocate():
+    return [bytearray(1024) for _ in range(2000)]
+
+
+class TestStageProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.output_dir = os.path.join(self.tmp_dir, 'profiles')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_off_is_a_null_context(self):
+        profiler = StageProfiler(output_dir=self.output_dir)
+        self.assertIsInstance(profiler.stage('run'), nullcontext)
+        self.assertIsInstance(StageProfiler('cpu', ['parse'], self.output_dir).stage('export'), nullcontext)
+        self.assertFalse(os.path.exists(self.output_dir))
+
+    def test_cpu_profile_of_one_stage(self):
+        profiler = StageProfiler('cpu', ['parse'], self.output_dir, top_n=5)
+        with profiler.stage('parse'):
+            allocate()
+
+        prof_path = profiler.reports['parse']['prof']
+        functions = {name for _, _, name in pstats.Stats(prof_path).stats}
+        self.assertIn('allocate', functions)
+        self.assertTrue(os.path.exists(prof_path.replace('.prof', '_cpu.txt')))
+
+    def test_cpu_stage_follows_wrapped_calls_on_other_threads(self):
+        profiler = StageProfiler('cpu', ['scrape'], self.output_dir)
+        with profiler.stage('scrape'):
+            worker = threading.Thread(target=profiler.wrap(allocate))
+            worker.start()
+            worker.join()
+
+        functions = {name for _, _, name in pstats.Stats(profiler.reports['scrape']['prof']).stats}
+        self.assertIn('allocate', functions)
+        # Outside a CPU stage wrapped calls run unprofiled
+        self.assertEqual(len(profiler.wrap(allocate)()), 2000)
+
+    def test_memory_report_lists_allocating_line(self):
+        profiler = StageProfiler('memory', ['export'], self.output_dir)
+        with profiler.stage('export'):
+            kept = allocate()
+
+        with open(profiler.reports['export']['allocations'], encoding='utf-8') as f:
+            report = f.read()
+        self.assertIn("Peak traced memory during the stage", report)
+        self.assertIn(f"test_profiling.py:{allocate.__code__.co_firstlineno + 1}", report)
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertEqual(len(kept), 2000)
+
+    def test_nested_stage_skips_second_cpu_profile(self):
+        profiler = StageProfiler('both', ['run', 'parse'], self.output_dir)
+        with profiler.stage('run'):
+            with profiler.stage('parse'):
+                allocate()
+
+        self.assertEqual(set(profiler.reports['run']), {'prof', 'allocations'})
+        self.assertEqual(set(profiler.reports['parse']), {'allocations'})
+
+    def test_nested_stage_keeps_outer_peak(self):
+        profiler = StageProfiler('memory', ['run', 'parse'], self.output_dir)
+        with profiler.stage('run'):
+            big = bytearray(8 * 1024 * 1024)
+            del big
+            with profiler.stage('parse'):
+                allocate()
+
+        peaks = {}
+        for stage in ('run', 'parse'):
+            with open(profiler.reports[stage]['allocations'], encoding='utf-8') as f:
+                peaks[stage] = float(re.search(r"Peak traced memory during the stage: ([\d.]+) MiB", f.read()).group(1))
+        self.assertGreaterEqual(peaks['run'], 8.0)
+        self.assertLess(peaks['parse'], 8.0)
+
+    def test_rejects_unknown_mode_or_stage(self):
+        with self.assertRaises(ValueError):
+            StageProfiler('gpu')
+        with self.assertRaises(ValueError):
+            StageProfiler('cpu', ['download'])
+
+
+if __name__ == '__main__':
+    unittest.main()
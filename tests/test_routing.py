@@ -0,0 +1,66 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from src.parsers.od_index import ODIndex
+from src.parsers.routing import TollRouter
+
+
+def rows(*prices):
+    return [{'vehicle_class': f'Class {i + 1}', 'price': price, 'currency': 'EUR'} for i, price in enumerate(prices)]
+
+
+class TestTollRouter(unittest.TestCase):
+    
+    def setUp(self):
+        # A1 Lisboa-Leiria-Coimbra, A8 Lisboa-Leiria (cheaper), A14 Coimbra-Figueira
+        toll_data = {
+            'A1 Lisboa-Leiria': rows('10.00', '15.00'),
+            'A1 Leiria-Coimbra': rows('5.00', '7.50'),
+            'A1 Lisboa-Coimbra': rows('16.00', '24.00'),
+            'A8 Lisboa-Leiria': rows('8.00', '16.00'),
+            'A14 Coimbra-Figueira da Foz': rows('3.20', '4.80')
+        }
+        self.router = TollRouter(ODIndex.from_parsed(toll_data))
+    
+    def test_cheapest_crosses_highways(self):
+        quote = self.router.cheapest('Lisboa', 'Figueira da Foz', 'Class 1')
+        
+        self.assertEqual(quote['total'], 16.2)
+        self.assertEqual([(leg['highway'], leg['to']) for leg in quote['legs']],
+                         [('A8', 'Leiria'), ('A1', 'Coimbra'), ('A14', 'Figueira da Foz')])
+    
+    def test_cheapest_per_vehicle_class(self):
+        # For class 2 the direct A1 tariff beats going through Leiria
+        quote = self.router.cheapest('Lisboa', 'Coimbra', 2)
+        
+        self.assertEqual(quote['total'], 22.5)
+        self.assertEqual(self.router.cheapest('Lisboa', 'Coimbra', 1)['total'], 13.0)
+    
+    def test_reverse_direction_and_unknown_plazas(self):
+        self.assertEqual(self.router.cheapest('figueira da foz', 'LISBOA', 1)['total'], 16.2)
+        self.assertIsNone(self.router.cheapest('Lisboa', 'Faro', 1))
+        self.assertIsNone(self.router.cheapest('Lisboa', 'Coimbra', 5))
+    
+    def test_canonical_route(self):
+        quote = self.router.canonical(['Lisboa', 'Leiria', 'Coimbra', 'Figueira da Foz'], 1, ['A1', 'A1', 'A14'])
+        
+        self.assertEqual(quote['total'], 18.2)
+        self.assertEqual(self.router.canonical(['Lisboa', 'Coimbra'], 1)['total'], 16.0)
+        # Lisboa-Leiria is priced differently on A1 and A8, so the highway is needed
+        self.assertIsNone(self.router.canonical(['Lisboa', 'Leiria'], 1))
+        with self.assertRaises(ValueError):
+            self.router.canonical(['Lisboa', 'Leiria'], 1, ['A1', 'A8'])
+    
+    def test_cheapest_many(self):
+        quotes = self.router.cheapest_many([
+            ('Lisboa', 'Coimbra', 1), ('Lisboa', 'Figueira da Foz', 1), ('Lisboa', 'Coimbra', 2), ('Faro', 'Lisboa', 1)
+        ])
+        
+        self.assertEqual([quote and quote['total'] for quote in quotes], [13.0, 16.2, 22.5, None])
+
+
+if __name__ == '__main__':
+    unittest.main()
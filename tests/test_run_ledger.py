@@ -0,0 +1,118 @@
+import gzip
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from src.utils.json_logger import TollJSONLogger
+from src.utils.run_ledger import RunLedger
+
+
+class TestRunLedger(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.ledger = RunLedger(self.tmp_dir)
+        self.logger = TollJSONLogger(self.ledger)
+        self.toll_data = [
+            {'route_segment': 'A1 Lisboa-Porto', 'vehicle_type': 'Class 1', 'price': 22.35, 'currency': 'EUR'},
+            {'route_segment': 'A2 Lisboa-Algarve', 'vehicle_type': 'Class 1', 'price': 20.80, 'currency': 'EUR'}
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_runs_are_appended_as_json_lines(self):
+        self.logger.log_scraping_result(self.toll_data, {'success': True, 'status_code': 200})
+        self.logger.log_error("No toll data was scraped")
+
+        with open(self.ledger.active_path, 'r', encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+
+        self.assertEqual([record['kind'] for record in records], ['result', 'error'])
+        self.assertNotIn('toll_data', records[0])
+        self.assertEqual(records[0]['toll_data_ref']['records'], 2)
+
+    def test_payload_is_stored_once_by_content_hash(self):
+        first = self.ledger.append({'kind': 'result'}, self.toll_data)
+        second = self.ledger.append({'kind': 'result'}, list(self.toll_data))
+
+        refs = [self.ledger.get_run(run_id)['toll_data_ref'] for run_id in (first, second)]
+        self.assertEqual(refs[0], refs[1])
+        self.assertEqual(len(os.listdir(self.ledger.payload_dir)), 1)
+        self.assertEqual(self.ledger.load_payload(refs[0]), self.toll_data)
+
+    def test_runs_with_new_timestamps_share_payload(self):
+        first = self.ledger.append({'kind': 'result'}, [dict(row, scraped_at='2025-01-01T06:00:00')
+                                                        for row in self.toll_data])
+        second = self.ledger.append({'kind': 'result'}, [dict(row, scraped_at='2025-01-02T06:00:00')
+                                                         for row in self.toll_data])
+
+        refs = [self.ledger.get_run(run_id)['toll_data_ref'] for run_id in (first, second)]
+        self.assertEqual(refs[0]['sha256'], refs[1]['sha256'])
+        self.assertEqual(len(os.listdir(self.ledger.payload_dir)), 1)
+        self.assertEqual(self.ledger.load_payload(refs[0]), self.toll_data)
+
+    def test_rotation_removes_unreferenced_payloads(self):
+        orphan = self.ledger.store_payload([{'route_segment': 'A9', 'price': 1.0}])
+        kept = self.ledger.append({'kind': 'result'}, self.toll_data)
+
+        self.assertTrue(self.ledger.rotate())
+
+        self.assertFalse(os.path.exists(os.path.join(self.tmp_dir, orphan['path'])))
+        self.assertEqual(self.ledger.load_payload(self.ledger.get_run(kept)['toll_data_ref']), self.toll_data)
+
+    def test_index_answers_queries(self):
+        sent = self.logger.log_scraping_result(self.toll_data, {'success': True, 'status_code': 200})
+        self.logger.log_scraping_result(self.toll_data, {'success': False, 'error': 'HTTP 500'})
+        self.logger.log_error("Configuration error: no token", {'error_type': 'configuration'})
+
+        last = self.ledger.last_successful_send()
+        self.assertEqual(f"{self.ledger.active_path}#{last['run_id']}", sent)
+        self.assertTrue(last['api_info']['api_success'])
+
+        errors = self.ledger.runs_with_errors()
+        self.assertEqual([entry['error'] for entry in errors], ['HTTP 500', 'Configuration error: no token'])
+
+    def test_rotation_by_size_compresses_segment(self):
+        ledger = RunLedger(self.tmp_dir, max_bytes=1)
+        first = ledger.append({'kind': 'result', 'api_info': {'api_success': True}}, self.toll_data)
+        second = ledger.append({'kind': 'result', 'api_info': {'api_success': True}}, self.toll_data)
+
+        segments = [name for name in os.listdir(self.tmp_dir) if name.endswith('.jsonl.gz')]
+        self.assertEqual(len(segments), 1)
+        with gzip.open(os.path.join(self.tmp_dir, segments[0]), 'rt', encoding='utf-8') as f:
+            self.assertEqual(json.loads(f.readline())['run_id'], first)
+
+        self.assertEqual(ledger.get_run(first)['run_id'], first)
+        self.assertEqual(ledger.last_successful_send()['run_id'], second)
+
+    def test_rotation_by_age(self):
+        self.ledger.append({'kind': 'result'}, self.toll_data)
+        index = self.ledger._load_index()
+        index['runs'][0]['logged_ts'] = time.time() - 8 * 86400
+        self.ledger._save_index(index)
+
+        self.ledger.append({'kind': 'result'}, self.toll_data)
+
+        segments = {entry['segment'] for entry in self.ledger.runs()}
+        self.assertEqual(len(segments), 2)
+        self.assertIn(RunLedger.ACTIVE_SEGMENT, segments)
+
+    def test_without_ledger_writes_one_file_per_run(self):
+        logger = TollJSONLogger()
+        log_file = logger.log_scraping_result(self.toll_data, {'success': True})
+        try:
+            with open(log_file, 'r', encoding='utf-8') as f:
+                self.assertEqual(json.load(f)['toll_data'], self.toll_data)
+        finally:
+            os.remove(log_file)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,17 +2,51 @@ import unittest
 from unittest.mock import Mock, patch
 import sys
 import os
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from src.scrapers.brisa_scraper import BrisaScraper
 from src.scrapers.portugal_tolls_scraper import PortugalTollsScraper
+from src.scrapers.driver_pool import DriverPool
+from src.scrapers.driver_discovery import DriverDiscoveryCache
+from selenium.common.exceptions import WebDriverException
+
+
+class PDFStandInHandler(BaseHTTPRequestHandler):
+    body = b'%PDF-1.4 fake pdf content'
+    etag = '"v1"'
+    requests_seen = []
+    
+    def do_GET(self):
+        self.requests_seen.append(dict(self.headers))
+        if self.headers.get('If-None-Match') == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/pdf')
+        self.send_header('Content-Length', str(len(self.body)))
+        self.send_header('ETag', self.etag)
+        self.send_header('Last-Modified', 'Wed, 01 Jan 2025 00:00:00 GMT')
+        self.end_headers()
+        self.wfile.write(self.body)
+    
+    def log_message(self, format, *args):
+        pass
 
 
 class TestBrisaScraper(unittest.TestCase):
     
     def setUp(self):
         self.scraper = BrisaScraper(headless=True)
+        self.scraper.pdf_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        shutil.rmtree(self.scraper.pdf_dir, ignore_errors=True)
     
     def test_initialization(self):
         self.assertEqual(self.scraper.base_url, "https://www.brisaconcessao.pt/en/clients/tolls/toll-rates")
@@ -22,13 +56,145 @@ class TestBrisaScraper(unittest.TestCase):
     @patch('src.scrapers.brisa_scraper.requests.get')
     def test_download_pdf(self, mock_get):
         mock_response = Mock()
-        mock_response.content = 'fake pdf content'
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_response.iter_content.return_value = [b'fake pdf ', b'content']
         mock_get.return_value = mock_response
         
         result = self.scraper._download_pdf('http://example.com/test.pdf')
         
         self.assertIsNotNone(result)
         self.assertTrue(result.endswith('.pdf'))
+        with open(result, 'rb') as f:
+            self.assertEqual(f.read(), b'fake pdf content')
+    
+    @patch('src.scrapers.brisa_scraper.requests.get')
+    def test_download_pdf_304_without_cached_copy(self, mock_get):
+        not_modified = Mock(status_code=304, headers={})
+        full = Mock(status_code=200, headers={})
+        full.iter_content.return_value = [b'%PDF fresh']
+        mock_get.side_effect = [not_modified, full]
+        
+        result = self.scraper._download_pdf('http://example.com/test.pdf')
+        
+        with open(result, 'rb') as f:
+            self.assertEqual(f.read(), b'%PDF fresh')
+        self.assertNotIn('headers', mock_get.call_args.kwargs)
+        
+        # A server that keeps answering 304 gives no PDF rather than an empty one
+        mock_get.side_effect = None
+        mock_get.return_value = Mock(status_code=304, headers={})
+        self.assertIsNone(self.scraper._download_pdf('http://example.com/other.pdf'))
+        self.assertEqual([name for name in os.listdir(self.scraper.pdf_dir) if name.endswith('.pdf')],
+                         [os.path.basename(result)])
+    
+    @patch('src.scrapers.brisa_scraper.requests.get')
+    def test_failed_download_leaves_no_partial_file(self, mock_get):
+        mock_response = Mock(status_code=200, headers={})
+        mock_response.iter_content.side_effect = IOError('connection reset')
+        mock_get.return_value = mock_response
+        
+        self.assertIsNone(self.scraper._download_pdf('http://example.com/test.pdf'))
+        self.assertFalse([name for name in os.listdir(self.scraper.pdf_dir) if name.endswith('.part')])
+    
+    @patch('src.scrapers.brisa_scraper.requests.get')
+    def test_static_discovery_finds_rates_link(self, mock_get):
+        mock_response = Mock()
+        mock_response.url = self.scraper.base_url
+        mock_response.text = (
+            '<html><body><a href="/en/other">Other 2025 news</a>'
+            '<p><a href="/files/rates-2025.pdf">Click here to <b>download the rates for 2025</b></a></p>'
+            '</body></html>'
+        )
+        mock_get.return_value = mock_response
+        
+        with patch.object(self.scraper, '_download_pdf', return_value='data/pdfs/rates.pdf'), \
+                patch.object(self.scraper, 'initialize_driver') as mock_init:
+            result = self.scraper.scrape()
+        
+        mock_init.assert_not_called()
+        self.assertEqual(self.scraper.discovery_method, 'static')
+        self.assertEqual(result[0]['discovery'], 'static')
+        self.assertEqual(self.scraper._discover_pdf_url_static(),
+                         'https://www.brisaconcessao.pt/files/rates-2025.pdf')
+    
+    @patch('src.scrapers.brisa_scraper.requests.get')
+    def test_static_discovery_falls_back_to_browser(self, mock_get):
+        mock_get.return_value = Mock(url=self.scraper.base_url, text='<html><body>No links</body></html>')
+        
+        with patch.object(self.scraper, '_discover_pdf_url_browser', return_value=None) as mock_browser:
+            self.assertEqual(self.scraper.scrape(), [])
+        
+        mock_browser.assert_called_once()
+    
+    @patch('src.scrapers.brisa_scraper.requests.get')
+    def test_static_discovery_ignores_loose_link_texts(self, mock_get):
+        mock_get.return_value = Mock(url=self.scraper.base_url, text=(
+            '<html><body><a href="/en/news/2025">2025 news</a><a href="/en/apps">Download our app</a></body></html>'
+        ))
+        self.assertIsNone(self.scraper._discover_pdf_url_static())
+        
+        mock_get.return_value = Mock(url=self.scraper.base_url, text=(
+            '<html><body><a href="/en/news/2025">2025 news</a><a href="/files/Tarifas.PDF?v=3">Tarifas</a></body></html>'
+        ))
+        self.assertEqual(self.scraper._discover_pdf_url_static(),
+                         'https://www.brisaconcessao.pt/files/Tarifas.PDF?v=3')
+    
+    def test_download_pdf_conditional_fetch(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), PDFStandInHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        PDFStandInHandler.requests_seen = []
+        url = f"http://127.0.0.1:{server.server_address[1]}/rates.pdf"
+        
+        try:
+            first = self.scraper._download_pdf(url)
+            second = self.scraper._download_pdf(url)
+        finally:
+            server.shutdown()
+            server.server_close()
+        
+        self.assertEqual(first, second)
+        self.assertEqual(len([f for f in os.listdir(self.scraper.pdf_dir) if f.endswith('.pdf')]), 1)
+        self.assertNotIn('If-None-Match', PDFStandInHandler.requests_seen[0])
+        self.assertEqual(PDFStandInHandler.requests_seen[1]['If-None-Match'], '"v1"')
+        with open(second, 'rb') as f:
+            self.assertEqual(f.read(), PDFStandInHandler.body)
+
+
+class TestReadinessWaits(unittest.TestCase):
+    
+    def setUp(self):
+        self.scraper = PortugalTollsScraper(headless=True, timeout=2)
+        self.scraper.POLL_INTERVAL = 0.01
+        self.scraper.driver = Mock()
+    
+    def test_wait_for_stable_count(self):
+        counts = iter([0, 3, 7, 7, 7, 7])
+        self.scraper.driver.find_elements.side_effect = lambda *args: [None] * next(counts)
+        
+        self.assertTrue(self.scraper.wait_for_stable_count('table tr', polls=3))
+        self.assertEqual(self.scraper.driver.find_elements.call_count, 5)
+    
+    def test_wait_for_network_idle(self):
+        self.scraper.driver.execute_script.side_effect = [
+            ['loading', 1], ['complete', 4], ['complete', 5], ['complete', 5], ['complete', 5]
+        ] + [['complete', 5]] * 100
+        
+        self.assertTrue(self.scraper.wait_for_network_idle(idle_time=0.02))
+    
+    def test_wait_timeout_does_not_raise(self):
+        self.scraper.driver.execute_script.return_value = False
+        
+        self.assertFalse(self.scraper.wait_for_js('return false;', timeout=0.05))
+    
+    def test_wait_until_ready_uses_scraper_defaults(self):
+        with patch.object(self.scraper, 'wait_for_selector', return_value=True) as mock_selector, \
+                patch.object(self.scraper, 'wait_for_stable_count', return_value=True) as mock_stable:
+            self.assertTrue(self.scraper.wait_until_ready())
+        
+        mock_selector.assert_called_once_with(PortugalTollsScraper.TABLE_SELECTOR)
+        mock_stable.assert_called_once_with('table tr')
 
 
 class TestPortugalTollsScraper(unittest.TestCase):
@@ -45,7 +211,12 @@ class TestPortugalTollsScraper(unittest.TestCase):
             ("22,85 EUR", "22.85"),
             ("  €15.50  ", "15.50"),
             ("", ""),
-            ("invalid", "invalid")
+            ("1.234,56 €", "1234.56"),
+            ("from 2,50 €", "2.50"),
+            ("2,50€/trip", "2.50"),
+            ("€ 2.50 (Class 1)", "2.50"),
+            ("2.50 €*", "2.50"),
+            ("invalid", "")
         ]
         
         for input_price, expected in test_cases:
@@ -53,6 +224,55 @@ class TestPortugalTollsScraper(unittest.TestCase):
                 result = self.scraper._clean_price(input_price)
                 self.assertEqual(result, expected)
     
+    def test_extract_tables_single_round_trip(self):
+        self.scraper.driver = Mock()
+        self.scraper.driver.execute_script.return_value = [[
+            ['Route', 'Class', 'Price', 'Validity'],
+            ['A1 Lisboa - Porto', 'Class 1', '€22,85', 'Valid until 2025'],
+            ['', 'Class 2', '€1,00', 'Current'],
+            ['A2 Lisboa', 'Short row']
+        ]]
+        
+        tariffs = self.scraper._tables_to_tariffs(self.scraper._extract_tables())
+        
+        self.scraper.driver.execute_script.assert_called_once()
+        self.scraper.driver.find_elements.assert_not_called()
+        self.assertEqual(len(tariffs), 1)
+        self.assertEqual(tariffs[0]['price'], '22.85')
+        self.assertEqual(tariffs[0]['validity_period'], 'Valid until 2025')
+    
+    def test_extract_tables_falls_back_to_page_source(self):
+        self.scraper.driver = Mock()
+        self.scraper.driver.execute_script.side_effect = WebDriverException('no js')
+        self.scraper.driver.page_source = (
+            '<table><tr><th>Route</th><th>Class</th><th>Price</th><th>Validity</th></tr>'
+            '<tr><td>A1 Lisboa - Porto<td>Class 1<td>22,85 EUR<td>Current</table>'
+        )
+        
+        tables = self.scraper._extract_tables()
+        
+        self.assertEqual(tables, [[[], ['A1 Lisboa - Porto', 'Class 1', '22,85 EUR', 'Current']]])
+        self.scraper.driver.find_elements.assert_not_called()
+    
+    def test_page_source_without_tables_falls_back_to_browser(self):
+        def element(text='', children=()):
+            node = Mock(text=text)
+            node.find_elements.return_value = list(children)
+            return node
+        
+        self.scraper.driver = Mock()
+        self.scraper.driver.execute_script.side_effect = WebDriverException('no js')
+        self.scraper.driver.page_source = '<div class="tariff-table"><div class="row">A1 Lisboa - Porto</div></div>'
+        rows = [element(), element(children=[element('A1 Lisboa - Porto'), element('Class 1'),
+                                             element('22,85 EUR'), element('Current')])]
+        self.scraper.driver.find_elements.return_value = [element(children=rows)]
+        
+        with self.assertLogs('PortugalTollsScraper', 'WARNING'):
+            tables = self.scraper._extract_tables()
+        
+        self.assertEqual(tables, [[[], ['A1 Lisboa - Porto', 'Class 1', '22,85 EUR', 'Current']]])
+        self.assertEqual(self.scraper._tables_to_tariffs(tables)[0]['price'], '22.85')
+    
     def test_extract_validity(self):
         test_cases = [
             ("Valid until 2025", "Valid until 2025"),
@@ -67,5 +287,108 @@ class TestPortugalTollsScraper(unittest.TestCase):
                 self.assertEqual(result, expected)
 
 
+class TestDriverPool(unittest.TestCase):
+    
+    def setUp(self):
+        self.factory = Mock(side_effect=lambda: Mock())
+        self.pool = DriverPool(max_uses=2)
+    
+    def test_reuses_driver_and_resets_session(self):
+        first = self.pool.acquire(self.factory)
+        self.pool.release(first)
+        second = self.pool.acquire(self.factory)
+        
+        self.assertIs(first, second)
+        self.assertEqual(self.factory.call_count, 1)
+        first.delete_all_cookies.assert_called_once()
+    
+    def test_recycles_after_max_uses(self):
+        driver = self.pool.acquire(self.factory)
+        self.pool.release(driver)
+        self.pool.release(self.pool.acquire(self.factory))
+        
+        driver.quit.assert_called_once()
+        self.assertIsNot(self.pool.acquire(self.factory), driver)
+    
+    def test_discards_crashed_driver(self):
+        driver = self.pool.acquire(self.factory)
+        driver.delete_all_cookies.side_effect = WebDriverException('crashed')
+        self.pool.release(driver)
+        
+        driver.quit.assert_called_once()
+        self.assertIsNot(self.pool.acquire(self.factory), driver)
+    
+    def test_release_after_close_quits_driver(self):
+        driver = self.pool.acquire(self.factory)
+        self.pool.close()
+        self.pool.release(driver)
+        
+        driver.quit.assert_called_once()
+        self.assertIsNot(self.pool.acquire(self.factory), driver)
+    
+    def test_cancelled_scraper_stops_before_launching_driver(self):
+        cancel_event = threading.Event()
+        cancel_event.set()
+        scraper = PortugalTollsScraper(driver_pool=self.pool, cancel_event=cancel_event)
+        
+        self.assertEqual(scraper.scrape(), [])
+        self.factory.assert_not_called()
+    
+    def test_scraper_cleanup_returns_driver_to_pool(self):
+        scraper = PortugalTollsScraper(driver_pool=self.pool)
+        
+        with patch.object(scraper, '_create_driver', side_effect=self.factory):
+            self.assertTrue(scraper.initialize_driver())
+            driver = scraper.driver
+            scraper.cleanup()
+        
+        driver.quit.assert_not_called()
+        self.assertIsNone(scraper.driver)
+        self.assertIs(self.pool.acquire(self.factory), driver)
+
+
+class TestDriverDiscovery(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.binary = os.path.join(self.tmp_dir, 'chromium')
+        self.driver_path = os.path.join(self.tmp_dir, 'chromedriver')
+        for path in (self.binary, self.driver_path):
+            with open(path, 'w') as f:
+                f.write('bin')
+        self.cache = DriverDiscoveryCache(os.path.join(self.tmp_dir, 'driver_cache.json'))
+    
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+    
+    def test_cache_hit_skips_probing(self):
+        self.cache.store({'browser': 'chrome', 'binary': self.binary, 'driver_path': self.driver_path})
+        scraper = BrisaScraper(discovery_cache=self.cache)
+        
+        with patch.object(scraper, '_probe_browser') as mock_probe:
+            browser = scraper._discover_browser()
+        
+        mock_probe.assert_not_called()
+        self.assertEqual(browser['driver_path'], self.driver_path)
+    
+    def test_cache_invalidated_when_driver_changes(self):
+        self.cache.store({'browser': 'chrome', 'binary': self.binary, 'driver_path': self.driver_path})
+        with open(self.driver_path, 'w') as f:
+            f.write('upgraded driver')
+        
+        self.assertIsNone(self.cache.load())
+    
+    @patch('src.scrapers.base_scraper.ChromeDriverManager')
+    @patch('src.scrapers.base_scraper.os.path.exists')
+    def test_offline_mode_never_calls_webdriver_manager(self, mock_exists, mock_manager):
+        mock_exists.side_effect = lambda path: path == '/usr/bin/chromium'
+        scraper = BrisaScraper(offline=True)
+        
+        with self.assertRaises(Exception):
+            scraper._probe_browser()
+        
+        mock_manager.assert_not_called()
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
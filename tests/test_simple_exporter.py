@@ -0,0 +1,98 @@
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from src.utils.export_manifest import ExportManifest
+from src.utils.simple_exporter import export_clean_tolls, iter_json_array, latest_export
+
+
+class TestSimpleExporter(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.exports_dir = os.path.join(self.tmp_dir, 'mysql_exports')
+        os.makedirs(self.exports_dir)
+        self.rows = [
+            self._row('A1 Lisboa-Porto', 22.35),
+            self._row('Página 1 Dominio Brisa', 0.0),
+            self._row('A2 Lisboa-Algarve', 20.8)
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    @staticmethod
+    def _row(route_segment, price):
+        return {'route_segment': route_segment, 'vehicle_type': 'Class 1', 'price': price, 'currency': 'EUR',
+                'validity_period': '2025', 'source': 'Brisa PDF', 'scraped_at': '2025-01-01T00:00:00'}
+
+    def _write_export(self, name, rows):
+        path = os.path.join(self.exports_dir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            if name.endswith('.jsonl'):
+                f.writelines(json.dumps(row, ensure_ascii=False) + '\n' for row in rows)
+            else:
+                json.dump(rows, f, indent=2, ensure_ascii=False)
+        return path
+
+    def test_iter_json_array_across_chunk_boundaries(self):
+        items = [{'n': i, 'text': 'Valença ' * i} for i in range(50)] + [12345, "]", []]
+        text = json.dumps(items, indent=2, ensure_ascii=False)
+        for chunk_size in (1, 7, 64, len(text)):
+            self.assertEqual(list(iter_json_array(io.StringIO(text), chunk_size)), items)
+        self.assertEqual(list(iter_json_array(io.StringIO('[]'))), [])
+        with self.assertRaises(ValueError):
+            list(iter_json_array(io.StringIO('[{"a": 1}, ')))
+
+    def test_manifest_pointer_wins_over_file_names(self):
+        self._write_export('tolls_mysql_20250102.json', [])
+        older = self._write_export('tolls_mysql_20250101.json', self.rows)
+        self.assertTrue(latest_export(self.exports_dir).endswith('tolls_mysql_20250102.json'))
+
+        ExportManifest(self.exports_dir).record('tolls_mysql', older, len(self.rows))
+        self.assertEqual(latest_export(self.exports_dir), older)
+
+    def test_concurrent_manifest_records_are_all_kept(self):
+        names = [f"export_{i}" for i in range(20)]
+        threads = [threading.Thread(target=ExportManifest(self.tmp_dir).record,
+                                    args=(name, os.path.join(self.tmp_dir, f"{name}.json"), 1)) for name in names]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        manifest = ExportManifest(self.tmp_dir)
+        self.assertEqual([name for name in names if manifest.entry(name)], names)
+        self.assertFalse([name for name in os.listdir(self.tmp_dir) if name.endswith('.tmp')])
+
+    def test_export_matches_json_dump_layout(self):
+        self._write_export('tolls_mysql_20250101.json', self.rows)
+        output_file = export_clean_tolls(self.exports_dir, self.tmp_dir)
+
+        with open(output_file, 'r', encoding='utf-8') as f:
+            text = f.read()
+        clean = json.loads(text)
+        self.assertEqual([row['highway'] for row in clean], ['A1', 'A2'])
+        self.assertEqual(text, json.dumps(clean, indent=2, ensure_ascii=False))
+        self.assertEqual(ExportManifest(self.tmp_dir).entry('toll_import')['records'], 2)
+
+    def test_export_reads_json_lines(self):
+        self._write_export('tolls_mysql_20250101.jsonl', self.rows)
+        output_file = export_clean_tolls(self.exports_dir, self.tmp_dir)
+
+        with open(output_file, 'r', encoding='utf-8') as f:
+            self.assertEqual(len(json.load(f)), 2)
+
+    def test_no_exports(self):
+        self.assertIsNone(export_clean_tolls(os.path.join(self.tmp_dir, 'missing'), self.tmp_dir))
+
+
+if __name__ == '__main__':
+    unittest.main()
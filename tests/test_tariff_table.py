@@ -0,0 +1,97 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from src.utils.api_client import TollAPIClient
+from src.utils.data_exporter import DataExporter
+from src.utils.tariff_table import TariffTable
+
+
+class TestTariffTable(unittest.TestCase):
+    
+    def setUp(self):
+        self.rows = [
+            {'route_segment': 'A1 Lisboa-Porto', 'vehicle_type': 'Class 1', 'price': '22,85 €',
+             'currency': 'EUR', 'validity_period': '2025', 'source': 'Portugal Tolls', 'scraped_at': '2025-01-01T00:00:00'},
+            {'route_segment': 'A2 Lisboa-Algarve', 'vehicle_type': 'Class 2', 'price': 27.9,
+             'validity_period': '2025', 'source': 'Portugal Tolls', 'scraped_at': '2025-01-01T00:00:05'},
+            {'route_segment': 'A1 Lisboa-Porto', 'vehicle_type': 'Class 2', 'price': '40.10',
+             'currency': 'EUR', 'validity_period': '2025', 'source': 'Portugal Tolls', 'scraped_at': '2025-01-01T00:00:09'}
+        ]
+        self.table = TariffTable.from_dicts(self.rows)
+    
+    def test_round_trip_to_dict_format(self):
+        dicts = self.table.to_dicts()
+        
+        self.assertEqual(len(self.table), 3)
+        self.assertEqual(dicts[0], {
+            'route_segment': 'A1 Lisboa-Porto', 'vehicle_type': 'Class 1', 'price': 22.85, 'currency': 'EUR',
+            'validity_period': '2025', 'source': 'Portugal Tolls', 'scraped_at': '2025-01-01T00:00:00'
+        })
+        # Missing currency gets the API default; the first row's timestamp is shared
+        self.assertEqual(dicts[1]['currency'], 'EUR')
+        self.assertEqual(dicts[2]['scraped_at'], '2025-01-01T00:00:00')
+        self.assertEqual(TariffTable.from_dicts(dicts).to_dicts(), dicts)
+    
+    def test_row_views_behave_like_dicts(self):
+        row = self.table[-1]
+        
+        self.assertEqual(row['price'], 40.1)
+        self.assertEqual(row.get('pdf_path', 'none'), 'none')
+        self.assertEqual(dict(row), self.table.row_dict(2))
+        with self.assertRaises(IndexError):
+            self.table[3]
+    
+    def test_strings_are_pooled(self):
+        self.assertEqual(self.table.column('route_segment'), ['A1 Lisboa-Porto', 'A2 Lisboa-Algarve', 'A1 Lisboa-Porto'])
+        self.assertIs(self.table[0]['route_segment'], self.table[2]['route_segment'])
+        self.assertEqual(len(self.table._pool), 7)
+    
+    def test_filter(self):
+        a1 = self.table.filter(route_segment='A1 Lisboa-Porto')
+        cheap = self.table.filter(lambda row: row['price'] < 30)
+        
+        self.assertEqual(a1.column('vehicle_type'), ['Class 1', 'Class 2'])
+        self.assertEqual(cheap.column('price'), [22.85, 27.9])
+        self.assertEqual(len(self.table.filter(route_segment='A9')), 0)
+        self.assertEqual(len(self.table.filter(route_segment='A1 Lisboa-Porto', vehicle_type='Class 9')), 0)
+    
+    def test_unparseable_prices_are_not_sent_as_free(self):
+        rows = self.rows + [dict(self.rows[0], route_segment='A9 CREL', price='See PDF'),
+                            dict(self.rows[0], route_segment='A8', price=None)]
+        with self.assertLogs('src.utils.tariff_table', 'WARNING'):
+            table = TariffTable.from_dicts(rows)
+        
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table.dropped_rows, 2)
+        self.assertFalse(table.append('A9 CREL', 'Class 1', 'n/a'))
+        self.assertTrue(table.append('A9 CREL', 'Class 1', 0.0))
+        
+        with patch.dict(os.environ, {'LARAVEL_API_URL': 'http://127.0.0.1:9', 'LARAVEL_API_TOKEN': 'token'}):
+            client = TollAPIClient()
+        with self.assertLogs('src.utils.api_client', 'WARNING'):
+            formatted = client.format_toll_data(rows)
+        self.assertEqual([toll['route_segment'] for toll in formatted], [row['route_segment'] for row in self.rows])
+    
+    def test_consumers_accept_table(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = DataExporter(tmp_dir).export_to_json(self.table, 'tolls.json')
+            with open(path, encoding='utf-8') as f:
+                self.assertEqual(json.load(f)['tariffs'], self.table.to_dicts())
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        
+        with patch.dict(os.environ, {'LARAVEL_API_URL': 'http://127.0.0.1:9', 'LARAVEL_API_TOKEN': 'token'}):
+            client = TollAPIClient()
+        self.assertEqual(client.format_toll_data(self.table), client.format_toll_data(self.table.to_dicts()))
+
+
+if __name__ == '__main__':
+    unittest.main()